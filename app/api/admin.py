@@ -0,0 +1,97 @@
+from typing import Any, List, Tuple
+import logging
+
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.security import get_current_admin_user
+from app.db.session import get_db
+from app.db.models import Topic, User
+from app.services.email_sender import send_confirmation_email
+from app.services.subscription_import import import_subscriptions
+from app.services.topic_catalog import add_topic_alias
+from app.services.topic_suggestions import topic_suggestions
+from app.api.base_dependencies import verify_csrf_token
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class TopicAliasRequest(BaseModel):
+    alias: str
+
+
+async def send_import_confirmations(confirmations: List[Tuple[str, str]]) -> None:
+    """Send the confirmation emails of imported users one after another."""
+    for email, token in confirmations:
+        await send_confirmation_email(email=email, token=token)
+
+
+@router.post("/subscriptions/import", dependencies=[Depends(verify_csrf_token)])
+async def import_subscriptions_csv(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(..., description="CSV with email, topic, preferred_time, timezone and optional difficulty columns"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Bulk-import subscriptions from a CSV upload (admin only)
+
+    Rows are validated like the subscribe form and written in batches;
+    invalid rows are skipped and listed in ``errors`` by data row number.
+    New users get a confirmation email and receive lessons once they confirm.
+    """
+    try:
+        report, confirmations = await run_in_threadpool(import_subscriptions, db, file.file)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    if confirmations:
+        background_tasks.add_task(send_import_confirmations, confirmations)
+    logger.info(f"Admin {current_user.email} imported {report.created + report.updated} subscriptions from {file.filename}")
+    return {
+        "rows": report.rows,
+        "created": report.created,
+        "updated": report.updated,
+        "users_created": report.users_created,
+        "error_count": report.error_count,
+        "errors": report.errors,
+    }
+
+
+@router.post("/topics/{topic_id}/aliases", dependencies=[Depends(verify_csrf_token)])
+def add_alias(
+    topic_id: int,
+    request: TopicAliasRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    Fold another topic into a canonical topic (admin only)
+
+    The alias resolves to the topic from now on; if it already had a topic
+    of its own, that topic's subscriptions join this one.
+    """
+    if db.get(Topic, topic_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Topic not found",
+        )
+
+    try:
+        moved = add_topic_alias(db, topic_id, request.alias)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    db.commit()
+    topic_suggestions.merged(topic_id, request.alias)
+
+    logger.info(f"Admin {current_user.email} added alias '{request.alias}' to topic {topic_id}, moving {moved} subscriptions")
+    return {"topic_id": topic_id, "subscriptions_moved": moved}
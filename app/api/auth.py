@@ -3,20 +3,27 @@ from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.security import (
-    authenticate_user,
+    authenticate_user_async,
     create_access_token,
+    get_password_hash_async,
     get_current_user,
     generate_reset_token,
+    confirm_user_email,
     get_reset_token_expiry,
+    hash_token,
 )
-from app.db.session import get_db
+from app.core.user_cache import invalidate_user_cache
+from app.core.signed_tokens import CONFIRMATION_PURPOSE, generate_confirmation_token, is_signed_token, verify_signed_token
+from app.db.session import get_db, get_async_db
 from app.db.models import User
 from app.schemas.user import Token, UserCreate, UserResponse, UserPasswordReset, UserResetToken, UserResetPassword, UserConfirmationToken, UserConfirmEmail
 from app.services.email_sender import send_password_reset_email, send_confirmation_email
+from app.services.scheduler.dispatcher import backfill_next_send_at
 from app.api.base_dependencies import verify_csrf_token
 from app.core.rate_limit import strict_rate_limit, standard_rate_limit
 
@@ -25,12 +32,12 @@ router = APIRouter()
 
 @router.post("/login", response_model=Token, dependencies=[Depends(verify_csrf_token), Depends(strict_rate_limit())])
 async def login_access_token(
-    db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
+    db: AsyncSession = Depends(get_async_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -71,15 +78,15 @@ async def register_user(
         )
     
     # Generate confirmation token
-    confirmation_token = generate_reset_token()  # Reuse token generation function
     confirmation_token_expires = get_reset_token_expiry()  # Reuse expiry function
+    confirmation_token = generate_confirmation_token(user_in.email, confirmation_token_expires)
     
     # Create new user with email confirmation fields
     user = User(
         email=user_in.email,
-        password_hash=User.get_password_hash(user_in.password),
+        password_hash=await get_password_hash_async(user_in.password),
         email_confirmed=0,  # Not confirmed yet
-        confirmation_token=confirmation_token,
+        confirmation_token=hash_token(confirmation_token),
         confirmation_token_expires=confirmation_token_expires
     )
     db.add(user)
@@ -128,7 +135,7 @@ async def forgot_password(
     
     # Update user data with SQLAlchemy updates for type safety
     db.query(User).filter(User.id == user.id).update({
-        "reset_token": reset_token,
+        "reset_token": hash_token(reset_token),
         "reset_token_expires": get_reset_token_expiry()
     })
     db.commit()
@@ -160,7 +167,7 @@ async def reset_password(
     
     # Find user by token
     user = db.query(User).filter(
-        User.reset_token == reset_data.token,
+        User.reset_token == hash_token(reset_data.token),
     ).first()
     
     if not user:
@@ -177,7 +184,7 @@ async def reset_password(
         )
     
     # Update password and clear token using SQLAlchemy update
-    new_password_hash = User.get_password_hash(reset_data.password)
+    new_password_hash = await get_password_hash_async(reset_data.password)
     db.query(User).filter(User.id == user.id).update({
         "password_hash": new_password_hash,
         "reset_token": None,
@@ -185,6 +192,7 @@ async def reset_password(
     })
     db.commit()
     db.refresh(user)
+    invalidate_user_cache(user.email)
     
     return user
 
@@ -202,7 +210,7 @@ async def send_confirmation(
     
     # Always return success even if email not found (to prevent email enumeration)
     if not user:
-        # Return a dummy token for non-existent users
+        # Return a random, unsigned dummy; a signed token would confirm the address once it registers
         dummy_token = generate_reset_token()
         return {"token": dummy_token}
     
@@ -211,12 +219,13 @@ async def send_confirmation(
         return {"token": "already_confirmed", "status": "success", "message": "Email already confirmed"}
     
     # Generate and store confirmation token for the user
-    confirmation_token = generate_reset_token()
+    confirmation_token_expires = get_reset_token_expiry()
+    confirmation_token = generate_confirmation_token(str(user.email), confirmation_token_expires)
     
     # Update user data with SQLAlchemy updates for type safety
     db.query(User).filter(User.id == user.id).update({
-        "confirmation_token": confirmation_token,
-        "confirmation_token_expires": get_reset_token_expiry()
+        "confirmation_token": hash_token(confirmation_token),
+        "confirmation_token_expires": confirmation_token_expires
     })
     db.commit()
     
@@ -245,31 +254,45 @@ async def confirm_email(
             detail="Missing confirmation token",
         )
     
-    # Find user by confirmation token
-    user = db.query(User).filter(
-        User.confirmation_token == token,
-    ).first()
+    email = verify_signed_token(token, CONFIRMATION_PURPOSE)
+    if email is None:
+        if is_signed_token(token):
+            # Forged or expired links are turned away without touching the database
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or expired confirmation token",
+            )
+        
+        # Links sent before tokens were signed are looked up by their stored hash
+        user = db.query(User).filter(
+            User.confirmation_token == hash_token(token),
+        ).first()
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid confirmation token",
+            )
+        
+        # Check if token is expired
+        if not user.confirmation_token_expires or user.confirmation_token_expires < datetime.utcnow():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Confirmation token expired",
+            )
+        email = str(user.email)
+    
+    # Update user as confirmed and clear token
+    confirm_user_email(db, email)
     
+    user = db.query(User).filter(User.email == email).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid confirmation token",
         )
     
-    # Check if token is expired
-    if not user.confirmation_token_expires or user.confirmation_token_expires < datetime.utcnow():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Confirmation token expired",
-        )
-    
-    # Update user as confirmed and clear token
-    db.query(User).filter(User.id == user.id).update({
-        "email_confirmed": 1,  # Confirmed
-        "confirmation_token": None,
-        "confirmation_token_expires": None
-    })
-    db.commit()
-    db.refresh(user)
+    # Deliveries of the user's subscriptions start now that the address is confirmed
+    backfill_next_send_at(db, user_id=user.id)
     
     return user
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Streaming export of a user's lesson history.
+
+Every lesson of the user's subscriptions, archived ones included, is
+streamed as NDJSON or CSV from a server-side cursor, ``EXPORT_BATCH_SIZE``
+rows at a time, so an export of any length runs in constant memory.
+Lessons come in (subscription, sent_at, id) order, read straight from the
+history indexes. Every record carries its id: a download that breaks off
+resumes with ``after_id`` set to the last id received, which continues the
+stream from that lesson's index position rather than counting past the
+lessons already delivered.
+"""
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.compression import decompress
+from app.core.security import get_current_user
+from app.db.session import AsyncSessionLocal, get_async_db
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive, LessonContent
+
+router = APIRouter()
+
+# Rows fetched from the cursor per round trip, and written per response chunk
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_FIELDS = ("id", "subscription_id", "topic", "sent_at", "content")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_query(subscription_ids: List[int], after: Optional[Tuple]):
+    """Lessons of some subscriptions from both history tables, in export order."""
+    tables = []
+    for model in (EmailHistory, EmailHistoryArchive):
+        query = select(
+            model.id.label("id"),
+            model.subscription_id.label("subscription_id"),
+            model.sent_at.label("sent_at"),
+            model.inline_content.label("inline_content"),
+            LessonContent.codec,
+            LessonContent.data,
+        ).outerjoin(
+            LessonContent, LessonContent.hash == model.content_hash
+        ).where(model.subscription_id.in_(subscription_ids))
+        if after:
+            query = query.where(tuple_(model.subscription_id, model.sent_at, model.id) > after)
+        tables.append(query)
+
+    merged = union_all(*tables)
+    return merged.order_by(*(merged.selected_columns[name] for name in ("subscription_id", "sent_at", "id")))
+
+
+def export_record(row, topics: Dict[int, str]) -> Dict[str, Any]:
+    """One exported lesson, with its body decompressed."""
+    return {
+        "id": row.id,
+        "subscription_id": row.subscription_id,
+        "topic": topics[row.subscription_id],
+        "sent_at": row.sent_at.isoformat() if row.sent_at else None,
+        "content": decompress(row.codec, row.data) if row.data is not None else row.inline_content,
+    }
+
+
+def encode_ndjson(records: List[Dict[str, Any]], header: bool = False) -> str:
+    """One JSON object per line; NDJSON has no header."""
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+
+def encode_csv(records: List[Dict[str, Any]], header: bool = False) -> str:
+    """CSV rows, preceded by the column names if ``header``."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    if header:
+        writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
+
+
+async def stream_lessons(subscription_ids: List[int], topics: Dict[int, str],
+                         after: Optional[Tuple], export_format: str,
+                         session_factory: Callable[[], AsyncSession] = AsyncSessionLocal) -> AsyncIterator[str]:
+    """
+    Encode lessons chunk by chunk as they are fetched.
+
+    Runs after the request's own session is gone, so it reads through a
+    session of its own, held for the length of the download.
+    """
+    encode = ENCODERS[export_format]
+    # A resumed CSV export is appended to the first part, which has the header
+    header = after is None
+    async with session_factory() as db:
+        result = await db.stream(
+            export_query(subscription_ids, after).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for rows in result.partitions():
+            yield encode([export_record(row, topics) for row in rows], header=header)
+            header = False
+    if header:
+        # No lessons: a CSV export still gets its header row
+        yield encode([], header=True)
+
+
+@router.get("/lessons")
+async def export_lessons(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    subscription_id: Optional[int] = None,
+    after_id: Optional[int] = Query(None, description="Resume after the lesson with this id"),
+) -> Any:
+    """
+    Export all of the current user's lessons as NDJSON or CSV, streamed
+
+    Lessons are ordered by subscription, then oldest first. Restrict the
+    export to one subscription with ``subscription_id``; continue an
+    interrupted export with ``after_id``.
+    """
+    query = select(Subscription.id, Subscription.topic).where(Subscription.user_id == current_user.id)
+    if subscription_id is not None:
+        query = query.where(Subscription.id == subscription_id)
+    topics = {row.id: row.topic for row in await db.execute(query)}
+    if subscription_id is not None and not topics:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subscription not found",
+        )
+    subscription_ids = sorted(topics)
+
+    after = None
+    if after_id is not None:
+        # The lesson's place in the export order, wherever it is stored
+        for model in (EmailHistory, EmailHistoryArchive):
+            after = (await db.execute(
+                select(model.subscription_id, model.sent_at, model.id).where(
+                    model.id == after_id,
+                    model.subscription_id.in_(subscription_ids)
+                )
+            )).first()
+            if after:
+                after = tuple(after)
+                break
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid after_id",
+            )
+
+    return StreamingResponse(
+        stream_lessons(subscription_ids, topics, after, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="lessons.{format}"'},
+    )
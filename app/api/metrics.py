@@ -0,0 +1,64 @@
+from typing import Any
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.security import get_current_admin_user
+from app.db.session import get_db
+from app.db.models import User
+from app.services.scheduler import get_scheduler_service
+from app.services.scheduler.dispatcher import count_overdue
+from app.services.delivery_rollups import summarize_rollups
+from app.services.scheduler.metrics import load_timings, send_metrics, summarize_timings
+
+router = APIRouter()
+
+
+@router.get("/scheduler")
+async def get_scheduler_metrics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+    window_seconds: int = settings.SCHEDULER_METRICS_WINDOW_SECONDS,
+) -> Any:
+    """
+    Scheduler lag and throughput (admin only)
+
+    ``sends`` covers every scheduler process, read from the recorded send
+    timings; ``process`` is this process's in-memory window and dispatch state.
+    """
+    window_seconds = max(60, min(window_seconds, 7 * 24 * 3600))
+    now = datetime.utcnow()
+    scheduler_service = get_scheduler_service()
+    processor = getattr(scheduler_service, "processor", None)
+
+    return {
+        "generated_at": now.isoformat(),
+        "overdue": count_overdue(db, now),
+        "sends": summarize_timings(load_timings(db, now - timedelta(seconds=window_seconds)), window_seconds),
+        "process": {
+            "owner": scheduler_service.leases.owner,
+            "shards": scheduler_service.owned_shards,
+            "last_tick_at": scheduler_service.last_tick_at.isoformat() if scheduler_service.last_tick_at else None,
+            "backlog": processor.backlog if processor else 0,
+            "sends": send_metrics.snapshot(now),
+        },
+    }
+
+
+@router.get("/deliveries")
+async def get_delivery_metrics(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_admin_user),
+    days: int = Query(30, ge=1, le=366),
+    top_topics: int = Query(10, ge=1, le=100),
+) -> Any:
+    """
+    Daily delivery outcomes, provider failure rates and top topics (admin only)
+
+    Served from the delivery rollups, so the cost grows with the number of
+    days asked for rather than with the lesson history.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    return summarize_rollups(db, since, top_topics=top_topics)
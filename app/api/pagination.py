@@ -0,0 +1,85 @@
+"""
+Keyset pagination helpers for list endpoints.
+
+A cursor encodes the sort key of the last row of a page, so the next page is
+read with ``WHERE key < :last`` straight from an index instead of counting
+past every earlier row with OFFSET. Cursors are opaque to clients and are
+returned in the ``X-Next-Cursor`` response header, which keeps the response
+bodies plain lists.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Iterable, Optional, Set, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key of a row as an opaque, URL-safe cursor."""
+    payload = json.dumps(
+        [value.isoformat() if isinstance(value, datetime) else value for value in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> Tuple[Any, ...]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: The cursor sent by the client
+        types: Expected type of each value, e.g. (datetime, int)
+
+    Raises:
+        HTTPException: If the cursor is malformed
+    """
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return tuple(
+            datetime.fromisoformat(value) if expected is datetime else expected(value)
+            for value, expected in zip(values, types)
+        )
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    """Advertise the next page, if there is one."""
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], required: Iterable[str] = ()) -> Set[str]:
+    """
+    Parse a comma-separated field projection.
+
+    Args:
+        fields: Requested fields, or None for all of them
+        allowed: Fields the endpoint can return
+        required: Fields that are always returned (e.g. those the cursor is built from)
+
+    Raises:
+        HTTPException: If an unknown field is requested
+    """
+    allowed = set(allowed)
+    if not fields:
+        return allowed
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    return requested | set(required)
@@ -1,47 +1,103 @@
 from typing import Any, List
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, time
 from typing import List, Optional
 import logging
 
+from app.core.compression import decompress
 from app.core.security import get_current_user
-from app.db.session import get_db
-from app.db.models import User, Subscription, EmailHistory
+from app.core.topics import clean_topic, topic_error
+from app.db.session import get_async_db
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive, LessonContent
 from app.schemas.subscription import (
     SubscriptionCreate,
     SubscriptionResponse,
     SubscriptionUpdate,
+    SubscriptionPause,
     EmailHistoryResponse
 )
 from app.services.scheduler import get_scheduler_service, APSchedulerService
 from app.services.email_sender import send_educational_email_task
+from app.services.subscription_deletes import delete_subscriptions
+from app.services.topic_catalog import resolve_topic
+from app.services.topic_suggestions import topic_suggestions
 from app.api.base_dependencies import verify_csrf_token
+from app.api.pagination import decode_cursor, encode_cursor, parse_fields, set_next_cursor
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Fields of a history entry that can be requested with ?fields=
+HISTORY_FIELDS = ("id", "subscription_id", "sent_at", "content")
+
+
+def history_page(model, selected, subscription_id: int, after: Optional[tuple], limit: int):
+    """
+    One table's share of a history page: the requested fields of up to ``limit``
+    lessons, newest first, sent before the ``after`` cursor position.
+    """
+    columns = [getattr(model, name).label(name) for name in HISTORY_FIELDS if name in selected and name != "content"]
+    if "content" in selected:
+        columns += [model.inline_content.label("inline_content"), LessonContent.codec, LessonContent.data]
+    query = (
+        select(*columns)
+        .where(model.subscription_id == subscription_id)
+        .order_by(model.sent_at.desc(), model.id.desc())
+        .limit(limit)
+    )
+    if "content" in selected:
+        query = query.outerjoin(LessonContent, LessonContent.hash == model.content_hash)
+    if after:
+        query = query.where(tuple_(model.sent_at, model.id) < after)
+    return select(query.subquery())
+
+
+def history_entry(row) -> dict:
+    """A history response entry from a projected row, decompressing the lesson if it was selected."""
+    entry = row._asdict()
+    if "codec" in entry:
+        codec, data, inline_content = entry.pop("codec"), entry.pop("data"), entry.pop("inline_content")
+        entry["content"] = decompress(codec, data) if data is not None else inline_content
+    return entry
+
 
 @router.get("/", response_model=List[SubscriptionResponse])
 async def get_subscriptions(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    skip: int = Query(0, ge=0, deprecated=True),
 ) -> Any:
     """
-    Retrieve all subscriptions for the current user
+    Retrieve the current user's subscriptions, oldest first
+
+    When there are more, the X-Next-Cursor response header holds the
+    ``cursor`` for the next page.
     """
-    subscriptions = (
-        db.query(Subscription)
-        .filter(Subscription.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-        .all()
+    query = (
+        select(Subscription)
+        .where(Subscription.user_id == current_user.id)
+        .order_by(Subscription.id)
     )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.where(Subscription.id > last_id)
+    elif skip:
+        query = query.offset(skip)
+    
+    # One extra row tells whether there is a next page
+    subscriptions = (await db.execute(query.limit(limit + 1))).scalars().all()
+    if len(subscriptions) > limit:
+        subscriptions = subscriptions[:limit]
+        set_next_cursor(response, encode_cursor(subscriptions[-1].id))
     return subscriptions
 
 
@@ -49,7 +105,7 @@ async def get_subscriptions(
 async def create_subscription(
     subscription_in: SubscriptionCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     scheduler_service: APSchedulerService = Depends(get_scheduler_service)
 ) -> Any:
@@ -63,12 +119,18 @@ async def create_subscription(
             detail="Please confirm your email address before creating subscriptions",
         )
     
-    # Check if subscription already exists
-    existing = db.query(Subscription).filter(
+    error = topic_error(subscription_in.topic)
+    if error:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+    subscription_in.topic = clean_topic(subscription_in.topic)
+    topic_id = await db.run_sync(lambda session: resolve_topic(session, subscription_in.topic))
+    
+    # Check if subscription already exists, under any spelling of its topic
+    existing = (await db.execute(select(Subscription.id).where(
         Subscription.email == subscription_in.email,
-        Subscription.topic == subscription_in.topic,
+        Subscription.topic_id == topic_id,
         Subscription.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if existing:
         raise HTTPException(
@@ -83,22 +145,26 @@ async def create_subscription(
     # Create subscription
     subscription = Subscription(
         **subscription_in.model_dump(),
+        topic_id=topic_id,
         user_id=current_user.id
     )
     
     db.add(subscription)
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    if current_user.email_confirmed == 1:
+        topic_suggestions.subscribed(topic_id, subscription_in.topic)
     
     # Schedule the email job
     try:
         # Convert preferred_time back to string format HH:MM for the scheduler
         time_str = subscription.preferred_time.strftime("%H:%M")
-        job_info = scheduler_service.schedule_email_job(
+        job_info = await run_in_threadpool(
+            scheduler_service.schedule_email_job,
             subscription_id=int(subscription.id),
             delivery_time=time_str,
             timezone=subscription.timezone
         )
+        await db.refresh(subscription)
         logger.info(f"API: Scheduled recurring job for subscription {subscription.id}: {job_info}")
     except Exception as e:
         logger.error(f"API: Error scheduling recurring job for sub {subscription.id}: {str(e)}")
@@ -119,16 +185,16 @@ async def create_subscription(
 @router.get("/{subscription_id}", response_model=SubscriptionResponse)
 async def get_subscription(
     subscription_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Any:
     """
     Get a specific subscription by ID
     """
-    subscription = db.query(Subscription).filter(
+    subscription = (await db.execute(select(Subscription).where(
         Subscription.id == subscription_id,
         Subscription.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not subscription:
         raise HTTPException(
@@ -144,17 +210,17 @@ async def update_subscription(
     subscription_id: int,
     subscription_in: SubscriptionUpdate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     scheduler_service: APSchedulerService = Depends(get_scheduler_service)
 ) -> Any:
     """
     Update a subscription
     """
-    subscription = db.query(Subscription).filter(
+    subscription = (await db.execute(select(Subscription).where(
         Subscription.id == subscription_id,
         Subscription.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not subscription:
         raise HTTPException(
@@ -164,11 +230,22 @@ async def update_subscription(
     
     # Update fields
     update_data = subscription_in.model_dump(exclude_unset=True)
+    if update_data.get("topic") is not None:
+        error = topic_error(update_data["topic"])
+        if error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+        update_data["topic"] = clean_topic(update_data["topic"])
+        update_data["topic_id"] = await db.run_sync(lambda session: resolve_topic(session, update_data["topic"]))
+    left_topic_id = subscription.topic_id
+    joined_topic = update_data.get("topic_id", left_topic_id) != left_topic_id
+    counted = current_user.email_confirmed == 1 and subscription.paused_until is None
     for field, value in update_data.items():
         setattr(subscription, field, value)
     
-    db.commit()
-    db.refresh(subscription)
+    await db.commit()
+    if joined_topic and counted:
+        topic_suggestions.unsubscribed(left_topic_id)
+        topic_suggestions.subscribed(update_data["topic_id"], update_data["topic"])
     
     # Reschedule job with new settings if time or timezone changed
     needs_reschedule = False
@@ -178,16 +255,20 @@ async def update_subscription(
     if needs_reschedule:
         try:
             # Remove existing job first
-            remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
+            remove_info = await run_in_threadpool(
+                scheduler_service.remove_jobs_for_subscription, subscription_id=int(subscription.id)
+            )
             logger.info(f"API: Removed job for subscription {subscription.id} before update: {remove_info}")
             
             # Convert preferred_time back to string format HH:MM for the scheduler
             time_str = subscription.preferred_time.strftime("%H:%M")
-            job_info = scheduler_service.schedule_email_job(
+            job_info = await run_in_threadpool(
+                scheduler_service.schedule_email_job,
                 subscription_id=int(subscription.id),
                 delivery_time=time_str,
                 timezone=subscription.timezone
             )
+            await db.refresh(subscription)
             logger.info(f"API: Rescheduled job for subscription {subscription.id}: {job_info}")
         except Exception as e:
             logger.error(f"API: Error rescheduling job for sub {subscription.id}: {str(e)}")
@@ -198,18 +279,43 @@ async def update_subscription(
 @router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_subscription(
     subscription_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user)
+) -> None:
+    """
+    Delete a subscription with its lesson history
+    """
+    # One statement per table; the dispatcher reads due rows from the table, so there is no job to remove
+    owned = select(Subscription.id).where(
+        Subscription.id == subscription_id,
+        Subscription.user_id == current_user.id
+    )
+    deleted = await db.run_sync(lambda session: delete_subscriptions(session, owned))
+    
+    if not deleted:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subscription not found",
+        )
+    await db.commit()
+
+
+@router.post("/{subscription_id}/pause", response_model=SubscriptionResponse, dependencies=[Depends(verify_csrf_token)])
+async def pause_subscription(
+    subscription_id: int,
+    pause_in: SubscriptionPause,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     scheduler_service: APSchedulerService = Depends(get_scheduler_service)
-) -> None:
+) -> Any:
     """
-    Delete a subscription
+    Pause a subscription, optionally until a resume date
     """
-    subscription = db.query(Subscription).filter(
+    subscription = (await db.execute(select(Subscription).where(
         Subscription.id == subscription_id,
         Subscription.user_id == current_user.id
-    ).first()
+    ))).scalars().first()
     
     if not subscription:
         raise HTTPException(
@@ -217,34 +323,88 @@ async def delete_subscription(
             detail="Subscription not found",
         )
     
-    # Remove the email job first
-    try:
-        remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
-        logger.info(f"API: Removed job for deleted subscription {subscription.id}: {remove_info}")
-    except Exception as e:
-        logger.error(f"API: Error removing job for deleted sub {subscription.id}: {str(e)}")
+    # The scheduler service commits the change in its own session
+    pause_info = await run_in_threadpool(
+        scheduler_service.pause_jobs_for_subscription,
+        subscription_id=int(subscription.id),
+        resume_date=pause_in.resume_date
+    )
+    if not pause_info.get("success"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=pause_info.get("message") or pause_info.get("user_message", "Could not pause subscription"),
+        )
+    
+    await db.refresh(subscription)
+    logger.info(f"API: Paused subscription {subscription.id}: {pause_info}")
+    return subscription
+
+
+@router.post("/{subscription_id}/resume", response_model=SubscriptionResponse, dependencies=[Depends(verify_csrf_token)])
+async def resume_subscription(
+    subscription_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+    scheduler_service: APSchedulerService = Depends(get_scheduler_service)
+) -> Any:
+    """
+    Resume a paused subscription
+    """
+    subscription = (await db.execute(select(Subscription).where(
+        Subscription.id == subscription_id,
+        Subscription.user_id == current_user.id
+    ))).scalars().first()
+    
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Subscription not found",
+        )
+    
+    resume_info = await run_in_threadpool(
+        scheduler_service.resume_jobs_for_subscription,
+        subscription_id=int(subscription.id)
+    )
+    if not resume_info.get("success"):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=resume_info.get("user_message", "Could not resume subscription"),
+        )
     
-    # Delete the subscription
-    db.delete(subscription)
-    db.commit()
+    await db.refresh(subscription)
+    logger.info(f"API: Resumed subscription {subscription.id}: {resume_info}")
+    return subscription
 
 
-@router.get("/{subscription_id}/history", response_model=List[EmailHistoryResponse])
+@router.get(
+    "/{subscription_id}/history",
+    response_model=List[EmailHistoryResponse],
+    response_model_exclude_unset=True
+)
 async def get_email_history(
     subscription_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-    skip: int = 0,
-    limit: int = 10,
+    cursor: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,sent_at"),
+    skip: int = Query(0, ge=0, deprecated=True),
 ) -> Any:
     """
-    Get email history for a subscription
+    Get email history for a subscription, newest first, archived lessons included
+
+    When there are more, the X-Next-Cursor response header holds the
+    ``cursor`` for the next page. Leave ``content`` out of ``fields`` to page
+    through lesson dates without reading the lessons themselves.
     """
+    selected = parse_fields(fields, HISTORY_FIELDS, required=("id", "subscription_id", "sent_at"))
+    
     # First check if subscription exists and belongs to user
-    subscription = db.query(Subscription).filter(
+    subscription = (await db.execute(select(Subscription.id).where(
         Subscription.id == subscription_id,
         Subscription.user_id == current_user.id
-    ).first()
+    ))).first()
     
     if not subscription:
         raise HTTPException(
@@ -252,14 +412,24 @@ async def get_email_history(
             detail="Subscription not found",
         )
     
-    # Get email history
-    history = (
-        db.query(EmailHistory)
-        .filter(EmailHistory.subscription_id == subscription_id)
-        .order_by(EmailHistory.sent_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
+    # Get email history from the hot table and the archive; each is read in (sent_at, id)
+    # index order up to the page size, so deep pages cost the same as the first
+    after = decode_cursor(cursor, datetime, int) if cursor else None
+    offset = 0 if cursor else skip
+    tables = [
+        history_page(model, selected, subscription_id, after, limit + 1 + offset)
+        for model in (EmailHistory, EmailHistoryArchive)
+    ]
+    merged = union_all(*tables).subquery()
+    query = (
+        select(merged)
+        .order_by(merged.c.sent_at.desc(), merged.c.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
     )
     
-    return history
\ No newline at end of file
+    rows = (await db.execute(query)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        set_next_cursor(response, encode_cursor(rows[-1].sent_at, rows[-1].id))
+    return [history_entry(row) for row in rows]
\ No newline at end of file
@@ -0,0 +1,30 @@
+from typing import Any
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.rate_limit import standard_rate_limit
+from app.services.topic_suggestions import topic_suggestions
+
+router = APIRouter()
+
+
+@router.get("/suggest", dependencies=[Depends(standard_rate_limit())])
+async def suggest_topics(
+    background_tasks: BackgroundTasks,
+    q: str = Query(..., max_length=200, description="What has been typed so far"),
+    limit: int = Query(8, ge=1, le=20),
+) -> Any:
+    """
+    Suggest existing topics for a partly typed one, most subscribed first
+
+    Answered from the in-memory index; a stale index is reloaded after the
+    response, so only the first request of a process waits for the database.
+    Open to the anonymous subscribe form, so rate limited; topics only count
+    active subscriptions of confirmed users.
+    """
+    if not topic_suggestions.loaded:
+        await run_in_threadpool(topic_suggestions.reload)
+    elif topic_suggestions.stale:
+        background_tasks.add_task(topic_suggestions.reload)
+    return topic_suggestions.suggest(q, limit)
@@ -0,0 +1,67 @@
+"""
+Compression codecs for stored lesson bodies.
+
+Blobs are tagged with the codec that wrote them, so the codec can change
+(or zstandard can be installed later) without rewriting existing rows.
+"""
+
+import hashlib
+import zlib
+from typing import Tuple
+
+from app.core.config import settings
+
+# zstandard is optional; zlib is always available
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def content_hash(body: str) -> str:
+    """SHA-256 hex digest of a body, its key in the content store."""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def preferred_codec() -> str:
+    """The codec new bodies are written with."""
+    if settings.LESSON_COMPRESSION == ZSTD and ZSTD_AVAILABLE:
+        return ZSTD
+    return ZLIB
+
+
+def compress(body: str, codec: str = None) -> Tuple[str, bytes]:
+    """
+    Compress a body.
+
+    Returns:
+        (codec, data) tuple; store the codec alongside the data
+    """
+    codec = codec or preferred_codec()
+    raw = body.encode("utf-8")
+    if codec == ZSTD:
+        return ZSTD, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return ZLIB, zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    """
+    Decompress a body written by compress.
+
+    Raises:
+        ValueError: If the codec is unknown or zstandard is needed but not installed
+    """
+    if codec == ZLIB:
+        return zlib.decompress(data).decode("utf-8")
+    if codec == ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstandard is required to read zstd-compressed lessons")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    raise ValueError(f"Unknown lesson codec: {codec}")
@@ -26,7 +26,12 @@ class Settings(BaseSettings):
         return self.API_SECRET_KEY
         
     ALGORITHM: str = "HS256"
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # Existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))  # Threads for bcrypt, off the event loop
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
+    UNSUBSCRIBE_TOKEN_EXPIRE_DAYS: int = int(os.getenv("UNSUBSCRIBE_TOKEN_EXPIRE_DAYS", "365"))  # Lifetime of the link in each lesson
+    USER_CACHE_TTL_SECONDS: int = int(os.getenv("USER_CACHE_TTL_SECONDS", "30"))  # Reuse of users resolved from tokens, 0 disables
+    USER_CACHE_MAX_ENTRIES: int = int(os.getenv("USER_CACHE_MAX_ENTRIES", "1024"))  # Most recently used tokens kept
     
     # Cookie security settings
     COOKIE_SAMESITE: str = os.getenv("COOKIE_SAMESITE", "lax")  # 'lax', 'strict', or 'none'
@@ -43,6 +48,20 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./learnbyemail.db")
+    ASYNC_DATABASE_URL: Optional[str] = os.getenv("ASYNC_DATABASE_URL")  # Defaults to DATABASE_URL with its async driver
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT_SECONDS: int = int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))  # -1 = never recycle
+    LESSON_COMPRESSION: str = os.getenv("LESSON_COMPRESSION", "zstd")  # 'zstd' (zlib when zstandard is not installed) or 'zlib'
+    
+    # SQLite connection profile, applied on every new connection
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")  # WAL lets reads run alongside the writer
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # NORMAL is durable across app crashes in WAL mode
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))  # Wait for locks instead of failing
+    SQLITE_CACHE_SIZE_KB: int = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))  # Page cache per connection
+    SQLITE_MMAP_SIZE_BYTES: int = int(os.getenv("SQLITE_MMAP_SIZE_BYTES", str(256 * 1024 * 1024)))  # 0 = disabled
+    SQLITE_FOREIGN_KEYS: str = os.getenv("SQLITE_FOREIGN_KEYS", "ON")  # Enforce foreign keys and run ON DELETE CASCADE
     
     # GitHub Webhook
     GITHUB_WEBHOOK_SECRET: str = os.getenv("GITHUB_WEBHOOK_SECRET", "")
@@ -70,6 +89,30 @@ class Settings(BaseSettings):
     # Content generation
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     
+    # Scheduler
+    SCHEDULER_ENABLED: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")  # Set false on web-only instances
+    SCHEDULER_SHARD_COUNT: int = int(os.getenv("SCHEDULER_SHARD_COUNT", "16"))
+    SCHEDULER_LEASE_TTL_SECONDS: int = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "180"))
+    SCHEDULER_DISPATCH_INTERVAL_SECONDS: int = int(os.getenv("SCHEDULER_DISPATCH_INTERVAL_SECONDS", "60"))
+    SCHEDULER_DISPATCH_BATCH_SIZE: int = int(os.getenv("SCHEDULER_DISPATCH_BATCH_SIZE", "500"))
+    SCHEDULER_MAX_CONCURRENT_SENDS: int = int(os.getenv("SCHEDULER_MAX_CONCURRENT_SENDS", "5"))
+    SCHEDULER_MAX_SENDS_PER_MINUTE: int = int(os.getenv("SCHEDULER_MAX_SENDS_PER_MINUTE", "60"))  # 0 = unlimited
+    SCHEDULER_MISFIRE_GRACE_SECONDS: int = int(os.getenv("SCHEDULER_MISFIRE_GRACE_SECONDS", str(24 * 3600)))  # Skip lessons later than this
+    SCHEDULER_METRICS_WINDOW_SECONDS: int = int(os.getenv("SCHEDULER_METRICS_WINDOW_SECONDS", "900"))  # Rolling window for lag/throughput metrics
+    SCHEDULER_WRITE_BATCH_SIZE: int = int(os.getenv("SCHEDULER_WRITE_BATCH_SIZE", "100"))  # Scheduled sends recorded per commit, 1 writes each send through
+    SCHEDULER_WRITE_FLUSH_MS: int = int(os.getenv("SCHEDULER_WRITE_FLUSH_MS", "500"))  # Longest a recorded send waits for its commit
+    
+    # History archival
+    HISTORY_ARCHIVE_AFTER_DAYS: int = int(os.getenv("HISTORY_ARCHIVE_AFTER_DAYS", "180"))  # Older lessons move to the archive table, 0 disables
+    HISTORY_HOT_LESSONS: int = int(os.getenv("HISTORY_HOT_LESSONS", "30"))  # Latest lessons per subscription always kept hot for continuity
+    HISTORY_ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("HISTORY_ARCHIVE_INTERVAL_SECONDS", "3600"))
+    HISTORY_ARCHIVE_BATCH_SIZE: int = int(os.getenv("HISTORY_ARCHIVE_BATCH_SIZE", "200"))  # Subscriptions per archive transaction
+    HISTORY_ORPHAN_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("HISTORY_ORPHAN_SWEEP_INTERVAL_SECONDS", "21600"))  # 0 disables
+    HISTORY_ORPHAN_SWEEP_CHUNK_SIZE: int = int(os.getenv("HISTORY_ORPHAN_SWEEP_CHUNK_SIZE", "500"))  # Rows deleted per transaction
+
+    # Topic suggestions
+    TOPIC_SUGGEST_REFRESH_SECONDS: int = int(os.getenv("TOPIC_SUGGEST_REFRESH_SECONDS", "300"))  # Full reload of the in-memory index, picks up other workers' changes
+    
     class Config:
         case_sensitive = True
         env_file = ".env" if not is_replit else None
@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union, Optional
+from typing import Any, Union, Optional, Tuple
+import asyncio
+import hashlib
 import secrets
 import logging
 import uuid
@@ -9,15 +12,36 @@ from passlib.context import CryptContext
 from fastapi import Depends, FastAPI, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from app.core.config import settings
-from app.db.session import get_db
+from app.core.user_cache import user_cache, invalidate_user_cache
+from app.db.session import get_async_db
 from app.schemas.user import TokenPayload
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def build_password_context(rounds: int) -> CryptContext:
+    """Password context whose hashes need an update whenever their bcrypt cost differs from rounds."""
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+    )
+
+
+pwd_context = build_password_context(settings.BCRYPT_ROUNDS)
+
+# bcrypt releases the GIL, so a few threads keep hashing off the event loop
+# while bounding how much CPU a burst of logins can take
+_password_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS), thread_name_prefix="password-hash"
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
@@ -48,12 +72,61 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def _run_in_password_executor(func, *args):
+    """Run a blocking password function on the hashing thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, func, *args)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Get password hash without blocking the event loop"""
+    return await _run_in_password_executor(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password without blocking the event loop.
+
+    Returns:
+        (valid, new_hash) where new_hash is set when the stored hash should be
+        replaced, e.g. because BCRYPT_ROUNDS changed
+    """
+    def verify():
+        try:
+            return pwd_context.verify_and_update(plain_password, hashed_password)
+        except ValueError:
+            # Empty or unrecognised hash, e.g. users created by subscribing without a password
+            return False, None
+
+    return await _run_in_password_executor(verify)
+
+
+async def _resolve_token_user(db: AsyncSession, token_data: TokenPayload) -> Optional[Any]:
+    """
+    Load the user a validated token belongs to, reusing a recent lookup when possible.
+
+    Cached users are merged into the request's session without a query, so
+    each request still gets its own instance.
+    """
+    from app.db.models import User
+
+    cached = user_cache.get(token_data.sub, token_data.exp)
+    if cached is not None:
+        return await db.merge(cached, load=False)
+
+    user = (await db.execute(select(User).where(User.email == token_data.sub))).scalars().first()
+    if user:
+        # Cache a detached copy so a rollback or later change in this session can't leak into it
+        snapshot = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+        make_transient_to_detached(snapshot)
+        user_cache.set(token_data.sub, token_data.exp, snapshot)
+    return user
+
+
 async def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: str = Depends(oauth2_scheme)
 ) -> Any:
     """Get current user from token"""
-    from app.db.models import User
-
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -73,7 +146,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.email == token_data.sub).first()
+    user = await _resolve_token_user(db, token_data)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -82,6 +155,17 @@ async def get_current_user(
     return user
 
 
+async def get_current_admin_user(current_user: Any = Depends(get_current_user)) -> Any:
+    """Get current user from token and require admin access"""
+    if not getattr(current_user, "is_admin", 0):
+        logger.warning(f"Unauthorized admin access attempt by user {current_user.email}")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
+
+
 # Create a new security scheme that doesn't require authentication and checks cookies
 class OptionalOAuth2PasswordBearer(OAuth2PasswordBearer):
     async def __call__(self, request: Request) -> Optional[str]:
@@ -100,11 +184,9 @@ class OptionalOAuth2PasswordBearer(OAuth2PasswordBearer):
 optional_oauth2_scheme = OptionalOAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 async def get_current_user_optional(
-    db: Session = Depends(get_db), token: Optional[str] = Depends(optional_oauth2_scheme)
+    db: AsyncSession = Depends(get_async_db), token: Optional[str] = Depends(optional_oauth2_scheme)
 ) -> Optional[Any]:
     """Get current user or None if not authenticated"""
-    from app.db.models import User
-
     if not token:
         return None
 
@@ -119,8 +201,7 @@ async def get_current_user_optional(
     except (JWTError, ValidationError):
         return None
 
-    user = db.query(User).filter(User.email == token_data.sub).first()
-    return user
+    return await _resolve_token_user(db, token_data)
 
 
 def authenticate_user(db: Session, email: str, password: str) -> Optional[Any]:
@@ -140,6 +221,49 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[Any]:
     return user
 
 
+async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[Any]:
+    """Authenticate user by email and password using an async session"""
+    from app.db.models import User
+
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password(password, str(user.password_hash))
+    if not valid:
+        return None
+    if new_hash:
+        await rehash_user_password(db, user, new_hash)
+    if not user.email_confirmed:
+        return None
+    return user
+
+
+async def rehash_user_password(db: AsyncSession, user: Any, new_hash: str) -> None:
+    """Store an upgraded password hash produced by verify_and_update_password"""
+    user.password_hash = new_hash
+    await db.commit()
+    invalidate_user_cache(user.email)
+    logger.info(f"Upgraded password hash for user {user.id} to {settings.BCRYPT_ROUNDS} rounds")
+
+
+def confirm_user_email(db: Session, email: str) -> bool:
+    """Mark a user's email as confirmed and clear their confirmation token
+
+    Returns:
+        False if there was no unconfirmed user with that email
+    """
+    from app.db.models import User
+
+    updated = db.query(User).filter(User.email == email, User.email_confirmed == 0).update({
+        "email_confirmed": 1,
+        "confirmation_token": None,
+        "confirmation_token_expires": None
+    }, synchronize_session=False)
+    db.commit()
+    invalidate_user_cache(email)
+    return bool(updated)
+
+
 def generate_secret_key(length: int = 64) -> str:
     """Generate a cryptographically secure random key.
 
@@ -161,6 +285,21 @@ def generate_reset_token() -> str:
     return f"{uuid.uuid4().hex}{secrets.token_urlsafe(16)}"
 
 
+def hash_token(token: str) -> str:
+    """Hash a reset or confirmation token for storage and lookup.
+
+    Only the hash is stored, so the emailed token can't be recovered from the
+    database. The tokens are random, so a single unsalted SHA-256 is enough.
+
+    Args:
+        token: The token as sent to the user
+
+    Returns:
+        64-character hex digest
+    """
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
 def get_reset_token_expiry():
     """Get token expiry datetime"""
     return datetime.utcnow() + timedelta(days=7)  # Extend to 7 days
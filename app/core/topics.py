@@ -0,0 +1,70 @@
+"""
+Rules for subscription topics, shared by the web forms, the bulk import and
+content generation.
+
+Topics are free text, so "Python", "python " and "PYTHON" are all entered.
+``normalize_topic`` maps them to one key; the topics table is indexed by it,
+and anything that caches or groups by topic should use it too.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+
+TOPIC_MIN_LENGTH = 3
+TOPIC_MAX_LENGTH = 50
+TOPIC_PATTERN = re.compile(r'^[A-Za-z0-9\s\-_,.&+\'()]+$')
+# Characters that only separate words; "Node.js", "node-js" and "Node JS" are one topic
+TOPIC_SEPARATORS = re.compile(r'[\s\-_,.]+')
+
+
+def clean_topic(topic: str) -> str:
+    """The topic as stored and shown: trimmed, with single spaces between words."""
+    return " ".join(topic.split())
+
+
+def sanitize_topic(topic: str) -> str:
+    """
+    The topic reduced to letters, digits, spaces and - _ . , for use in prompts.
+
+    Stricter than TOPIC_PATTERN: quotes, brackets and & + are dropped too.
+    """
+    return clean_topic(''.join(c for c in topic if c.isalnum() or c.isspace() or c in '-_.,'))
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Canonical key of a topic.
+
+    Topics that differ only in case, spacing or word separators share a key.
+
+    Args:
+        topic: The topic as entered
+
+    Returns:
+        The key, empty if the topic has no words
+    """
+    folded = unicodedata.normalize("NFKC", topic).casefold()
+    return TOPIC_SEPARATORS.sub(" ", folded).strip()
+
+
+def topic_error(topic: str) -> Optional[str]:
+    """
+    Check a topic against the subscription rules.
+
+    Args:
+        topic: The topic as entered
+
+    Returns:
+        The message to show if the topic is invalid, otherwise None
+    """
+    if len(normalize_topic(topic)) < TOPIC_MIN_LENGTH:
+        return f"Topic must be at least {TOPIC_MIN_LENGTH} characters long"
+
+    if not TOPIC_PATTERN.match(topic):
+        return "Topic contains invalid characters. Please use only letters, numbers, spaces, and common punctuation."
+
+    if len(topic) > TOPIC_MAX_LENGTH:
+        return f"Topic must be less than {TOPIC_MAX_LENGTH} characters"
+
+    return None
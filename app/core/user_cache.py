@@ -0,0 +1,90 @@
+"""
+Short-lived cache of users resolved from access tokens.
+
+Almost every page resolves the signed-in user from its token. Entries are
+keyed by the token's subject and expiry, live for a few seconds and are
+dropped whenever the user's password or confirmation status changes, so
+authenticated page views can skip the user lookup.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+
+CacheKey = Tuple[str, int]
+
+
+class UserCache:
+    """Bounded, thread-safe LRU cache of user records with a per-entry TTL."""
+
+    def __init__(self, ttl_seconds: float = 30, max_entries: int = 1024, clock=time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_seconds: How long a resolved user is reused; 0 disables the cache
+            max_entries: Upper bound on cached users, least recently used go first
+            clock: Monotonic time source, injectable for tests
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, subject: str, expires: int) -> Optional[Any]:
+        """Return the cached user for a token, or None if missing or stale."""
+        if not self.enabled:
+            return None
+        key = (subject, expires)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cached_until, user = entry
+            if cached_until <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def set(self, subject: str, expires: int, user: Any) -> None:
+        """Cache the user resolved for a token."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[(subject, expires)] = (self._clock() + self.ttl_seconds, user)
+            self._entries.move_to_end((subject, expires))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, subject: str) -> None:
+        """Drop every cached token of a user."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == subject]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    max_entries=settings.USER_CACHE_MAX_ENTRIES
+)
+
+
+def invalidate_user_cache(email: str) -> None:
+    """Forget cached lookups for a user after their password or confirmation status changed."""
+    user_cache.invalidate(email)
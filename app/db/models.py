@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Time, ForeignKey, Text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, Time, ForeignKey, Text, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from functools import cached_property
 
+from app.core.compression import decompress
 from app.core.security import get_password_hash, verify_password
 from app.db.session import Base
 
@@ -13,11 +15,11 @@ class User(Base):
     email = Column(String(120), unique=True, nullable=False, index=True)
     password_hash = Column(String(256), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    reset_token = Column(String(256), nullable=True)
+    reset_token = Column(String(64), nullable=True, index=True)  # hash_token() of the emailed token
     reset_token_expires = Column(DateTime, nullable=True)
     is_admin = Column(Integer, default=0, nullable=False)  # 0=false, 1=true
     email_confirmed = Column(Integer, default=0, nullable=False)  # 0=false, 1=true
-    confirmation_token = Column(String(256), nullable=True)
+    confirmation_token = Column(String(64), nullable=True, index=True)  # hash_token() of the emailed token
     confirmation_token_expires = Column(DateTime, nullable=True)
     
     subscriptions = relationship("Subscription", back_populates="user")
@@ -41,22 +43,140 @@ class Subscription(Base):
     difficulty = Column(String(10), default="medium", nullable=False)  # 'easy', 'medium', 'hard'
     created_at = Column(DateTime, default=datetime.utcnow)
     last_sent = Column(DateTime, nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    next_send_at = Column(DateTime, nullable=True, index=True)  # UTC; NULL when not scheduled
+    paused_until = Column(DateTime, nullable=True, index=True)  # UTC; NULL when active
+    # Kept in step with every history insert (see lesson_store.record_lesson), archived lessons included
+    lesson_count = Column(Integer, default=0, server_default="0", nullable=False)
+    last_history_id = Column(Integer, nullable=True)  # No FK: the row may since have moved to the archive
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    topic_id = Column(Integer, ForeignKey("topics.id"), nullable=True, index=True)  # Canonical topic (cohort)
     
     user = relationship("User", back_populates="subscriptions")
-    email_history = relationship("EmailHistory", back_populates="subscription")
+    # History and claims go with the subscription in the database (ON DELETE CASCADE), not row by row
+    email_history = relationship("EmailHistory", back_populates="subscription", passive_deletes=True)
     
+    # The unique constraint's index also serves lookups by email alone
     __table_args__ = (
         UniqueConstraint('email', 'topic', 'user_id', name='unique_email_topic_user'),
     )
 
 
-class EmailHistory(Base):
+class LessonBodyMixin:
+    """Read access to the lesson body of a history row."""
+
+    @property
+    def content(self):
+        """The lesson body, decompressed from the content store."""
+        if self.lesson_content is not None:
+            return self.lesson_content.body
+        return self.inline_content
+
+
+class EmailHistory(LessonBodyMixin, Base):
     __tablename__ = "email_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    subscription_id = Column(Integer, ForeignKey("subscriptions.id"), nullable=False)
-    content = Column(Text, nullable=False)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), ForeignKey("lesson_contents.hash"), nullable=True, index=True)
+    # Bodies written before the content store; migrations/dedupe_lesson_content.py moves them
+    inline_content = Column("content", Text, nullable=True)
     sent_at = Column(DateTime, default=datetime.utcnow)
     
-    subscription = relationship("Subscription", back_populates="email_history")
\ No newline at end of file
+    subscription = relationship("Subscription", back_populates="email_history")
+    # Loaded in the same query, since history rows are read for their content
+    lesson_content = relationship("LessonContent", lazy="joined")
+    
+    # History is always read per subscription in sent_at order
+    __table_args__ = (
+        Index('ix_email_history_subscription_sent_at', 'subscription_id', 'sent_at'),
+    )
+
+
+class EmailHistoryArchive(LessonBodyMixin, Base):
+    __tablename__ = "email_history_archive"
+
+    # Old lessons moved out of email_history by the archival job, keeping their ids
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+    content_hash = Column(String(64), ForeignKey("lesson_contents.hash"), nullable=True)
+    inline_content = Column("content", Text, nullable=True)
+    sent_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    lesson_content = relationship("LessonContent", lazy="joined")
+
+    __table_args__ = (
+        Index('ix_email_history_archive_subscription_sent_at', 'subscription_id', 'sent_at'),
+    )
+
+
+class LessonContent(Base):
+    __tablename__ = "lesson_contents"
+
+    # Lessons are stored once per distinct body and shared by every history row that sent it
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the uncompressed body
+    codec = Column(String(10), nullable=False)  # 'zstd', 'zlib'
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed bytes
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    @cached_property
+    def body(self) -> str:
+        # Stored bodies never change, and history rows sharing one get the same instance
+        return decompress(self.codec, self.data)
+
+
+class DeliveryClaim(Base):
+    __tablename__ = "delivery_claims"
+
+    id = Column(Integer, primary_key=True, index=True)
+    subscription_id = Column(Integer, ForeignKey("subscriptions.id", ondelete="CASCADE"), nullable=False)
+    delivery_date = Column(Date, nullable=False)  # Local date in the subscription's timezone
+    status = Column(String(10), default="claimed", nullable=False)  # 'claimed', 'sent'
+    # Send timings (UTC) for lag metrics
+    scheduled_at = Column(DateTime, nullable=True)  # Intended delivery time; NULL for unscheduled sends
+    claimed_at = Column(DateTime, default=datetime.utcnow)  # Send started
+    generated_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True, index=True)  # History committed
+    
+    __table_args__ = (
+        UniqueConstraint('subscription_id', 'delivery_date', name='unique_subscription_delivery_date'),
+    )
+
+
+class SchedulerLease(Base):
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(100), primary_key=True)  # 'shard:<n>' or 'worker:<owner>'
+    owner = Column(String(200), nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class DeliveryRollup(Base):
+    __tablename__ = "delivery_rollups"
+
+    # Delivery attempts counted per UTC day and dimension, kept up to date by the sender
+    day = Column(Date, primary_key=True)
+    topic = Column(String(200), primary_key=True)
+    difficulty = Column(String(10), primary_key=True)
+    provider = Column(String(20), primary_key=True)  # 'sendgrid', 'smtp', 'none', 'unknown' (backfilled)
+    outcome = Column(String(20), primary_key=True)  # 'sent', 'failed', 'generation_failed'
+    count = Column(Integer, default=0, nullable=False)
+
+
+class Topic(Base):
+    __tablename__ = "topics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String(200), unique=True, nullable=False)  # normalize_topic() of the name
+    name = Column(String(200), nullable=False)  # As first entered
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TopicAlias(Base):
+    __tablename__ = "topic_aliases"
+
+    # Further keys that resolve to a topic, e.g. 'python programming' for Python
+    key = Column(String(200), primary_key=True)
+    topic_id = Column(Integer, ForeignKey("topics.id", ondelete="CASCADE"), nullable=False, index=True)
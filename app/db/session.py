@@ -1,12 +1,102 @@
-from sqlalchemy import create_engine
+from typing import AsyncIterator
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {})
+
+def sqlite_pragmas() -> dict:
+    """PRAGMAs applied to every new SQLite connection, from settings."""
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,  # Negative values are KiB rather than pages
+        "mmap_size": settings.SQLITE_MMAP_SIZE_BYTES,
+        "foreign_keys": settings.SQLITE_FOREIGN_KEYS,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Connect event handler that applies the SQLite connection profile."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def engine_options(database_url: str) -> dict:
+    """
+    Engine keyword arguments for a database URL.
+
+    File-backed databases get an explicitly sized connection pool; in-memory
+    SQLite keeps SQLAlchemy's default single-connection pool.
+    """
+    url = make_url(database_url)
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            return options
+
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=True,
+    )
+    return options
+
+
+def create_db_engine(database_url: str) -> Engine:
+    """Create an engine with the configured pool and, for SQLite, connection profile."""
+    db_engine = create_engine(database_url, **engine_options(database_url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine, "connect", apply_sqlite_pragmas)
+    return db_engine
+
+
+# Async drivers for the sync URLs in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+    "mysql": "aiomysql",
+}
+
+
+def async_database_url(database_url: str) -> str:
+    """Switch a database URL to the async driver for its backend, if it names none."""
+    scheme, sep, rest = database_url.partition("://")
+    driver = ASYNC_DRIVERS.get(scheme)
+    if not sep or not driver:
+        return database_url  # Already names a driver (e.g. sqlite+aiosqlite) or unknown backend
+    return f"{scheme}+{driver}://{rest}"
+
+
+def create_async_db_engine(database_url: str) -> AsyncEngine:
+    """Create an async engine with the same pool and SQLite profile as the sync one."""
+    async_url = async_database_url(database_url)
+    db_engine = create_async_engine(async_url, **engine_options(async_url))
+    if db_engine.dialect.name == "sqlite":
+        event.listen(db_engine.sync_engine, "connect", apply_sqlite_pragmas)
+    return db_engine
+
+
+# Sync engine: scheduler, email sender, migrations and routes not yet ported
+engine = create_db_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers on the hot paths
+async_engine = create_async_db_engine(settings.ASYNC_DATABASE_URL or settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -18,4 +108,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Dependency function that yields async db sessions
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,23 +3,49 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 from typing import List, Optional
 from datetime import datetime, timedelta
 from starlette.middleware.sessions import SessionMiddleware
-import re
 import urllib.parse
+import pytz
 
 from app.core.config import settings
-from app.db.session import get_db, engine
-from app.db.models import Base, User, Subscription, EmailHistory
-from app.api import auth, subscriptions, content_preview, webhooks
+from app.db.session import get_db, get_async_db, engine
+from app.db.models import Base, User, Subscription
+from app.api import auth, subscriptions, content_preview, webhooks, metrics, exports, admin, topics
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.services.scheduler import get_scheduler_service, APSchedulerService
-from app.core.security import get_current_user_optional, get_current_user, create_access_token, verify_password, get_password_hash
+from app.services.scheduler.dispatcher import backfill_next_send_at, compute_next_send_at, get_timezone
+from app.core.security import (
+    get_current_user_optional,
+    get_current_user,
+    create_access_token,
+    get_password_hash_async,
+    confirm_user_email,
+    hash_token,
+    rehash_user_password,
+    verify_and_update_password,
+)
+from app.core.user_cache import invalidate_user_cache
+from app.core.signed_tokens import (
+    CONFIRMATION_PURPOSE,
+    generate_confirmation_token,
+    is_signed_token,
+    verify_signed_token,
+    verify_unsubscribe_token,
+)
 from app.core.csrf import CSRFMiddleware, csrf_protect, get_csrf_token, CSRF_FORM_FIELD
 from app.core.rate_limit import standard_rate_limit, strict_rate_limit, configure_rate_limiting
+from app.core.topics import clean_topic, normalize_topic, topic_error
 from app.services.email_sender import send_password_reset_email, send_confirmation_email
+from app.services.subscription_deletes import delete_subscriptions
+from app.services.topic_catalog import resolve_topic
+from app.services.topic_suggestions import topic_suggestions
 
 # Setup logging
 import os
@@ -52,6 +78,7 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
 # Add session middleware for flash messages
@@ -136,7 +163,9 @@ def url_for(name: str, **path_params) -> str:
         "terms_page": "/terms",
         "contact_page": "/contact",
         "confirm_email_page": "/confirm-email",
-        "resend_confirmation_page": "/resend-confirmation"
+        "resend_confirmation_page": "/resend-confirmation",
+        "unsubscribe_page": "/unsubscribe",
+        "unsubscribe_submit": "/unsubscribe"
     }
     
     url = paths.get(name, "/")
@@ -154,7 +183,7 @@ def url_for(name: str, **path_params) -> str:
         url = f"/delete-subscription/{path_params['subscription_id']}"
 
     # Add query params for reset-password and confirm-email
-    if name in ["reset_password_page", "confirm_email_page"] and "token" in path_params:
+    if name in ["reset_password_page", "confirm_email_page", "unsubscribe_page", "unsubscribe_submit"] and "token" in path_params:
         url = f"{url}?token={path_params['token']}"
         
     return url
@@ -199,6 +228,30 @@ app.include_router(
     tags=["webhooks"],
 )
 
+app.include_router(
+    metrics.router,
+    prefix=f"{settings.API_V1_STR}/metrics",
+    tags=["metrics"],
+)
+
+app.include_router(
+    exports.router,
+    prefix=f"{settings.API_V1_STR}/export",
+    tags=["export"],
+)
+
+app.include_router(
+    admin.router,
+    prefix=f"{settings.API_V1_STR}/admin",
+    tags=["admin"],
+)
+
+app.include_router(
+    topics.router,
+    prefix=f"{settings.API_V1_STR}/topics",
+    tags=["topics"],
+)
+
 
 # Create static and templates directories if they don't exist
 import os
@@ -214,25 +267,9 @@ def validate_topic(topic, request, current_user, template_name="index.html", tem
     """Validate topic and return response if invalid"""
     context = template_context or {"request": request, "current_user": current_user}
     
-    # Check minimum length
-    if len(topic.strip()) < 3:
-        flash(request, "Topic must be at least 3 characters long", "danger")
-        if current_user:
-            return RedirectResponse(url="/dashboard", status_code=303)
-        else:
-            return templates.TemplateResponse(template_name, context)
-    
-    # Check if topic contains only valid characters
-    if not re.match(r'^[A-Za-z0-9\s\-_,.&+\'()]+$', topic):
-        flash(request, "Topic contains invalid characters. Please use only letters, numbers, spaces, and common punctuation.", "danger")
-        if current_user:
-            return RedirectResponse(url="/dashboard", status_code=303)
-        else:
-            return templates.TemplateResponse(template_name, context)
-    
-    # Check maximum length
-    if len(topic) > 50:
-        flash(request, "Topic must be less than 50 characters", "danger")
+    error = topic_error(topic)
+    if error:
+        flash(request, error, "danger")
         if current_user:
             return RedirectResponse(url="/dashboard", status_code=303)
         else:
@@ -313,9 +350,8 @@ async def subscribe(
     preferred_time: str = Form(...),
     timezone: str = Form(...),
     difficulty: str = Form(default="medium"),
-    db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    scheduler_service: APSchedulerService = Depends(get_scheduler_service)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Handle subscription form submission"""
     # Validate input
@@ -339,6 +375,8 @@ async def subscribe(
     )
     if invalid_response:
         return invalid_response
+    topic = clean_topic(topic)
+    topic_key = normalize_topic(topic)
     
     # Parse preferred time
     try:
@@ -359,26 +397,25 @@ async def subscribe(
     # If user is not logged in, we need to create or get a user account
     if not current_user:
         # Check if user exists
-        user = db.query(User).filter(User.email == email).first()
+        user = (await db.execute(select(User).where(User.email == email))).scalars().first()
         if not user:
             # Create new user without password but with email confirmation
-            from app.core.security import generate_reset_token, get_reset_token_expiry
+            from app.core.security import get_reset_token_expiry
             
             # Generate confirmation token
-            confirmation_token = generate_reset_token()
             confirmation_token_expires = get_reset_token_expiry()
+            confirmation_token = generate_confirmation_token(email, confirmation_token_expires)
             
             # Create user without password
             user = User(
                 email=email,
                 password_hash="",  # Will be set during registration
                 email_confirmed=0,
-                confirmation_token=confirmation_token,
+                confirmation_token=hash_token(confirmation_token),
                 confirmation_token_expires=confirmation_token_expires
             )
             db.add(user)
-            db.commit()
-            db.refresh(user)
+            await db.commit()
             
             # Send confirmation email in background using FastAPI BackgroundTasks
             from app.services.email_sender import send_confirmation_email
@@ -386,32 +423,38 @@ async def subscribe(
 
         elif not user.email_confirmed:
             # User exists but hasn't confirmed email - check if they need a new confirmation token
-            from app.core.security import generate_reset_token, get_reset_token_expiry
+            from app.core.security import get_reset_token_expiry
             from app.services.email_sender import send_confirmation_email
             
             # If token is expired or doesn't exist, generate a new one
             if not user.confirmation_token or not user.confirmation_token_expires or user.confirmation_token_expires < datetime.utcnow():
-                confirmation_token = generate_reset_token()
                 confirmation_token_expires = get_reset_token_expiry()
+                confirmation_token = generate_confirmation_token(str(user.email), confirmation_token_expires)
                 
-                user.confirmation_token = confirmation_token
+                user.confirmation_token = hash_token(confirmation_token)
                 user.confirmation_token_expires = confirmation_token_expires
-                db.commit()
-                db.refresh(user)
+                await db.commit()
                 
                 # Send a new confirmation email using FastAPI BackgroundTasks
                 background_tasks.add_task(send_confirmation_email, email=str(user.email), token=confirmation_token)
         
         user_id = user.id
+        owner_confirmed = user.email_confirmed == 1
     else:
         user_id = current_user.id
+        owner_confirmed = current_user.email_confirmed == 1
+    
+    # Every check and message below works from this address's subscriptions: their
+    # topics, the accounts they belong to and whether those accounts still exist
+    email_subscriptions = (await db.execute(
+        select(Subscription.topic, Subscription.user_id, User.id.label("owner_id"))
+        .outerjoin(User, User.id == Subscription.user_id)
+        .where(Subscription.email == email)
+        .order_by(Subscription.id)
+    )).all()
     
     # Check if subscription already exists for this user
-    existing = db.query(Subscription).filter(
-        Subscription.email == email,
-        Subscription.topic == topic,
-        Subscription.user_id == user_id
-    ).first()
+    existing = any(normalize_topic(row.topic) == topic_key and row.user_id == user_id for row in email_subscriptions)
     
     if existing:
         flash(request, "You are already subscribed to this topic", "warning")
@@ -423,63 +466,48 @@ async def subscribe(
                 {"request": request, "current_user": current_user}
             )
     
-    # Check if this email is subscribed to this topic under a different user account
-    other_user_subscription = db.query(Subscription).filter(
-        Subscription.email == email,
-        Subscription.topic == topic,
-        Subscription.user_id != user_id
-    ).first()
+    # Check if this email is subscribed to this topic under a different (existing) user account
+    other_user_subscription = any(
+        normalize_topic(row.topic) == topic_key and row.user_id != user_id and row.owner_id is not None
+        for row in email_subscriptions
+    )
     
     if other_user_subscription:
-        # Get the user associated with this subscription
-        other_user = db.query(User).filter(User.id == other_user_subscription.user_id).first()
-        
-        if other_user:
-            flash(request, f"This email is already subscribed to {topic}. <a href='/login' class='alert-link'>Log in</a> to manage your subscriptions.", "warning")
-            return templates.TemplateResponse(
-                "index.html", 
-                {"request": request, "current_user": current_user}
-            )
+        flash(request, f"This email is already subscribed to {topic}. <a href='/login' class='alert-link'>Log in</a> to manage your subscriptions.", "warning")
+        return templates.TemplateResponse(
+            "index.html", 
+            {"request": request, "current_user": current_user}
+        )
     
     # Get all topics this email is already subscribed to (for informational purposes)
-    existing_topics = db.query(Subscription.topic).filter(
-        Subscription.email == email
-    ).distinct().all()
-    
-    existing_topics = [t[0] for t in existing_topics if t[0] != topic]  # Exclude current topic
+    existing_topics = list(dict.fromkeys(
+        row.topic for row in email_subscriptions if normalize_topic(row.topic) != topic_key  # Exclude current topic
+    ))
     
     
     # Validate difficulty level
     if difficulty not in ["easy", "medium", "hard"]:
         difficulty = "medium"  # Default to medium if invalid
     
-    # Create subscription
+    # Create subscription in its topic's cohort, scheduled in the same insert;
+    # an unconfirmed user's subscription is scheduled when they confirm
+    topic_id = await db.run_sync(lambda session: resolve_topic(session, topic))
     subscription = Subscription(
         email=email,
         topic=topic,
+        topic_id=topic_id,
         preferred_time=preferred_time_obj,
         timezone=timezone,
         difficulty=difficulty,
-        user_id=user_id
+        user_id=user_id,
+        next_send_at=compute_next_send_at(preferred_time_obj, timezone) if owner_confirmed else None
     )
     
     db.add(subscription)
-    db.commit()
-    db.refresh(subscription)
-    
-    # Schedule email job
-    try:
-        # Convert preferred_time back to string format HH:MM for the scheduler
-        time_str = subscription.preferred_time.strftime("%H:%M")
-        job_info = scheduler_service.schedule_email_job(
-            subscription_id=int(subscription.id),
-            delivery_time=time_str,
-            timezone=subscription.timezone
-        )
-        # TODO: Check job_info for success/failure
-        logger.info(f"Scheduled recurring email job for subscription {subscription.id}: {job_info}")
-    except Exception as e:
-        logger.error(f"Error scheduling recurring email job for subscription {subscription.id}: {str(e)}")
+    await db.commit()
+    if owner_confirmed:
+        topic_suggestions.subscribed(topic_id, topic)
+    logger.info(f"Subscription {subscription.id} next delivery at {subscription.next_send_at}")
     
     # Send an immediate first email
     from app.services.email_sender import send_educational_email_task
@@ -494,18 +522,15 @@ async def subscribe(
         flash(request, f"Subscription to {topic} confirmed! You'll receive your first email shortly.", "success")
     else:
         # Check if this is an unconfirmed user subscribing to an additional topic
-        user_needs_confirmation = db.query(User).filter(User.email == email, User.email_confirmed == 0).first()
+        # (user is the account looked up or created for this email above)
+        user_needs_confirmation = not user.email_confirmed
         
         if user_needs_confirmation:
             # Message for users who still need to confirm their email
             base_message = f"You need to confirm your email address before your subscriptions become active. We've sent a confirmation email to {email}."
             
-            # Get all topics this user has subscribed to
-            all_topics = db.query(Subscription.topic).filter(
-                Subscription.email == email,
-                Subscription.user_id == user_needs_confirmation.id
-            ).all()
-            all_topics = [t[0] for t in all_topics]
+            # Get all topics this user has subscribed to, including the new one
+            all_topics = [row.topic for row in email_subscriptions if row.user_id == user_id] + [topic]
             
             if len(all_topics) > 1:
                 topics_list = ", ".join(all_topics)
@@ -516,42 +541,22 @@ async def subscribe(
             
             flash(request, base_message, "warning")
         else:
-            # Check if this user already has a confirmed account
-            existing_user = db.query(User).filter(User.email == email, User.email_confirmed == 1).first()
+            # The account is confirmed; the user just isn't logged in
+            base_message = f"Your subscription to {topic} has been added to your account."
+            
+            # Add information about existing subscriptions if any
+            if existing_topics:
+                topics_list = ", ".join(existing_topics)
+                if len(existing_topics) == 1:
+                    base_message += f" You're also subscribed to {topics_list}."
+                else:
+                    base_message += f" You're also subscribed to these topics: {topics_list}."
+            
+            # Add login link instead of registration link
+            base_message += f" <a href='/login?email={urllib.parse.quote(email)}' class='alert-link'>Log in to your account</a> to manage your subscriptions and customize delivery preferences."
+            
+            flash(request, base_message, "success")
             
-            if existing_user:
-                # Message for users who already have an account but aren't logged in
-                base_message = f"Your subscription to {topic} has been added to your account."
-                
-                # Add information about existing subscriptions if any
-                if existing_topics:
-                    topics_list = ", ".join(existing_topics)
-                    if len(existing_topics) == 1:
-                        base_message += f" You're also subscribed to {topics_list}."
-                    else:
-                        base_message += f" You're also subscribed to these topics: {topics_list}."
-                
-                # Add login link instead of registration link
-                base_message += f" <a href='/login?email={urllib.parse.quote(email)}' class='alert-link'>Log in to your account</a> to manage your subscriptions and customize delivery preferences."
-                
-                flash(request, base_message, "success")
-            else:
-                # Standard message for new users
-                base_message = f"We've sent a confirmation email to {email}. Please confirm your email address to activate your subscription to {topic}."
-                
-                # Add information about existing subscriptions if any
-                if existing_topics:
-                    topics_list = ", ".join(existing_topics)
-                    if len(existing_topics) == 1:
-                        base_message += f" You're also subscribed to {topics_list}."
-                    else:
-                        base_message += f" You're also subscribed to these topics: {topics_list}."
-                
-                # Add registration link
-                base_message += f" <a href='/register?email={urllib.parse.quote(email)}' class='alert-link'>Create an account</a> to manage your subscriptions and customize delivery preferences."
-                
-                flash(request, base_message, "info")
-    
     # Always redirect to dashboard if logged in, otherwise show index page
     if current_user:
         return RedirectResponse(url="/dashboard", status_code=303)
@@ -589,17 +594,26 @@ async def login_submit(
     response: Response,
     email: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle login form submission"""
-    # First check if the user exists and has the correct password but email is not confirmed
     from app.db.models import User
-    from app.core.security import verify_password
     
-    user_exists = db.query(User).filter(User.email == email).first()
-    if user_exists and verify_password(password, str(user_exists.password_hash)) and not user_exists.email_confirmed:
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
+    
+    # Verify the password once, off the event loop; a changed BCRYPT_ROUNDS yields a new hash
+    password_valid, new_hash = (False, None)
+    if user:
+        password_valid, new_hash = await verify_and_update_password(password, str(user.password_hash))
+        if password_valid and new_hash:
+            await rehash_user_password(db, user, new_hash)
+    
+    # Check if the user has the correct password but email is not confirmed
+    if user and password_valid and not user.email_confirmed:
         # Get subscription information for better messaging
-        subscriptions = db.query(Subscription).filter(Subscription.user_id == user_exists.id).all()
+        subscriptions = (await db.execute(
+            select(Subscription).where(Subscription.user_id == user.id)
+        )).scalars().all()
         subscription_count = len(subscriptions)
         
         if subscription_count > 0:
@@ -612,7 +626,6 @@ async def login_submit(
         return RedirectResponse(url=f"/resend-confirmation?email={email}", status_code=303)
     
     # Check if user exists first
-    user = db.query(User).filter(User.email == email).first()
     if not user:
         flash(request, "We couldn't find an account with those credentials. Please check your email and password or register for a new account.", "danger")
         return templates.TemplateResponse(
@@ -621,7 +634,7 @@ async def login_submit(
         )
 
     # Check if password is correct
-    if not user.verify_password(password):
+    if not password_valid:
         flash(request, "Invalid password. Please try again.", "danger")
         return templates.TemplateResponse(
             "login.html", 
@@ -706,15 +719,16 @@ async def register_submit(
             return RedirectResponse(url="/resend-confirmation?email=" + urllib.parse.quote(email), status_code=303)
             
         # Unconfirmed user without password (from subscription)
-        from app.core.security import generate_reset_token, get_reset_token_expiry
-        confirmation_token = generate_reset_token()
+        from app.core.security import get_reset_token_expiry
         confirmation_token_expires = get_reset_token_expiry()
+        confirmation_token = generate_confirmation_token(email, confirmation_token_expires)
         
         # Update user with password and new confirmation token
-        user.password_hash = User.get_password_hash(password)
-        user.confirmation_token = confirmation_token
+        user.password_hash = await get_password_hash_async(password)
+        user.confirmation_token = hash_token(confirmation_token)
         user.confirmation_token_expires = confirmation_token_expires
         db.commit()
+        invalidate_user_cache(user.email)
             
         # Send confirmation email
         from app.services.email_sender import send_confirmation_email
@@ -735,16 +749,16 @@ async def register_submit(
         )
     
     # Generate confirmation token
-    from app.core.security import generate_reset_token, get_reset_token_expiry
-    confirmation_token = generate_reset_token()
+    from app.core.security import get_reset_token_expiry
     confirmation_token_expires = get_reset_token_expiry()
+    confirmation_token = generate_confirmation_token(email, confirmation_token_expires)
     
     # Create user with email confirmation fields
     new_user = User(
         email=email,
-        password_hash=User.get_password_hash(password),
+        password_hash=await get_password_hash_async(password),
         email_confirmed=0,  # Not confirmed yet
-        confirmation_token=confirmation_token,
+        confirmation_token=hash_token(confirmation_token),
         confirmation_token_expires=confirmation_token_expires
     )
     
@@ -806,7 +820,7 @@ async def reset_password_page(
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(
     request: Request, 
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """User dashboard"""
@@ -814,28 +828,21 @@ async def dashboard(
         flash(request, "Please log in to access the dashboard", "warning")
         return RedirectResponse(url="/login", status_code=303)
     
-    # Get user's subscriptions
-    subscriptions = db.query(Subscription).filter(Subscription.user_id == current_user.id).all()
-    
-    # Convert last_sent times from UTC to each subscription's timezone
-    import pytz
-    
-    for subscription in subscriptions:
+    # Get user's subscriptions; lesson counts are kept on the rows
+    rows = (await db.execute(
+        select(Subscription)
+        .where(Subscription.user_id == current_user.id)
+        .order_by(Subscription.id)
+    )).scalars().all()
+    
+    subscriptions = []
+    for subscription in rows:
+        # Convert the last send from UTC to the subscription's timezone
+        subscription.local_last_sent = None
         if subscription.last_sent:
-            # The last_sent is stored in UTC
-            utc_time = subscription.last_sent.replace(tzinfo=pytz.UTC)
-            
-            try:
-                # Convert to subscription's timezone
-                local_tz = pytz.timezone(str(subscription.timezone))
-                local_time = utc_time.astimezone(local_tz)
-                
-                # Store the converted time for display
-                subscription.local_last_sent = local_time
-            except Exception as e:
-                logger.error(f"Error converting timezone: {e}")
-                # If conversion fails, just use UTC time
-                subscription.local_last_sent = utc_time
+            utc_time = pytz.UTC.localize(subscription.last_sent)
+            subscription.local_last_sent = utc_time.astimezone(get_timezone(str(subscription.timezone)))
+        subscriptions.append(subscription)
     
     return templates.TemplateResponse(
         "dashboard.html", 
@@ -907,6 +914,7 @@ async def edit_subscription_submit(
         return RedirectResponse(url="/dashboard", status_code=303)
     
     # Update fields
+    joined_topic = False
     if topic:
         # Validate topic
         template_context = {
@@ -924,8 +932,12 @@ async def edit_subscription_submit(
         if invalid_response:
             return invalid_response
         
+        topic = clean_topic(topic)
+        topic_id = resolve_topic(db, topic)
+        left_topic_id = subscription.topic_id
+        joined_topic = topic_id != left_topic_id
         db.query(Subscription).filter(Subscription.id == subscription.id).update(
-            {"topic": topic}
+            {"topic": topic, "topic_id": topic_id}
         )
         
     if preferred_time:
@@ -963,6 +975,9 @@ async def edit_subscription_submit(
         )
     
     db.commit()
+    if joined_topic and current_user.email_confirmed == 1 and subscription.paused_until is None:
+        topic_suggestions.unsubscribed(left_topic_id)
+        topic_suggestions.subscribed(topic_id, topic)
     
     # Update scheduler job
     try:
@@ -991,40 +1006,21 @@ async def delete_subscription(
     request: Request,
     subscription_id: int,
     db: Session = Depends(get_db),
-    current_user: Optional[User] = Depends(get_current_user_optional),
-    scheduler_service: APSchedulerService = Depends(get_scheduler_service)
+    current_user: Optional[User] = Depends(get_current_user_optional)
 ):
     """Delete subscription"""
     if not current_user:
         flash(request, "Please log in to delete subscriptions", "warning")
         return RedirectResponse(url="/login", status_code=303)
     
-    # Get subscription
-    subscription = db.query(Subscription).filter(
+    # Delete the subscription with its history and claims, one statement per table;
+    # the dispatcher reads due rows from the table, so there is no job to remove
+    owned = select(Subscription.id).where(
         Subscription.id == subscription_id,
         Subscription.user_id == current_user.id
-    ).first()
-    
-    if not subscription:
-        flash(request, "Subscription not found", "danger")
-        return RedirectResponse(url="/dashboard", status_code=303)
-    
-    # Remove the email job first
-    try:
-        remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
-        logger.info(f"Removed job for deleted subscription {subscription.id}: {remove_info}")
-    except Exception as e:
-        logger.error(f"Error removing email job for subscription {subscription.id}: {e}")
-    
+    )
     try:
-        # Delete email history records first to avoid foreign key constraint issues
-        from app.db.models import EmailHistory
-        
-        # Delete all related email history records
-        db.query(EmailHistory).filter(EmailHistory.subscription_id == subscription.id).delete()
-        
-        # Then delete the subscription
-        db.delete(subscription)
+        deleted = delete_subscriptions(db, owned)
         db.commit()
     except Exception as e:
         db.rollback()
@@ -1032,6 +1028,10 @@ async def delete_subscription(
         flash(request, f"Error deleting subscription: {str(e)}", "danger")
         return RedirectResponse(url="/dashboard", status_code=303)
     
+    if not deleted:
+        flash(request, "Subscription not found", "danger")
+        return RedirectResponse(url="/dashboard", status_code=303)
+    
     flash(request, "Subscription deleted successfully", "success")
     return RedirectResponse(url="/dashboard", status_code=303)
 
@@ -1098,21 +1098,9 @@ async def bulk_subscription_action(
             flash(request, "Please confirm deletion", "warning")
             return RedirectResponse(url="/dashboard", status_code=303)
         
-        # Remove scheduler jobs and delete subscriptions
+        # Delete the subscriptions with their history and claims, one statement per table
         try:
-            from app.db.models import EmailHistory
-            
-            for subscription in subscriptions:
-                # Remove scheduler job
-                remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
-                logger.info(f"Removed job for deleted subscription {subscription.id}: {remove_info}")
-                
-                # Delete email history records for this subscription
-                db.query(EmailHistory).filter(EmailHistory.subscription_id == subscription.id).delete()
-                
-                # Delete the subscription
-                db.delete(subscription)
-            
+            delete_subscriptions(db, [subscription.id for subscription in subscriptions])
             db.commit()
         except Exception as e:
             db.rollback()
@@ -1144,7 +1132,7 @@ async def bulk_subscription_action(
             # Update subscriptions
             for subscription in subscriptions:
                 # Remove old job first
-                remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
+                remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id), db=db)
                 logger.info(f"Removed existing job for subscription {subscription.id} before update: {remove_info}")
                 
                 # Update time using a query to avoid type issues
@@ -1159,7 +1147,8 @@ async def bulk_subscription_action(
                     job_info = scheduler_service.schedule_email_job(
                         subscription_id=int(subscription.id),
                         delivery_time=time_str,
-                        timezone=subscription.timezone
+                        timezone=subscription.timezone,
+                        db=db
                     )
                     logger.info(f"Rescheduled job for subscription {subscription.id}: {job_info}")
                     # TODO: Check job_info for success/failure
@@ -1188,7 +1177,7 @@ async def bulk_subscription_action(
         # Update subscriptions
         for subscription in subscriptions:
             # Remove old job first
-            remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id))
+            remove_info = scheduler_service.remove_jobs_for_subscription(subscription_id=int(subscription.id), db=db)
             logger.info(f"Removed existing job for subscription {subscription.id} before update: {remove_info}")
             
             # Update timezone
@@ -1203,7 +1192,8 @@ async def bulk_subscription_action(
                 job_info = scheduler_service.schedule_email_job(
                     subscription_id=int(subscription.id),
                     delivery_time=time_str,
-                    timezone=subscription.timezone
+                    timezone=subscription.timezone,
+                    db=db
                 )
                 logger.info(f"Rescheduled job for subscription {subscription.id}: {job_info}")
                 # TODO: Check job_info for success/failure
@@ -1213,6 +1203,41 @@ async def bulk_subscription_action(
         db.commit()
         flash(request, f"Successfully updated timezone for {count} subscriptions", "success")
     
+    elif action == "pause":
+        resume_date = form_data.get("resume_date")
+        resume_date_str = resume_date if isinstance(resume_date, str) else None
+        
+        paused = 0
+        for subscription in subscriptions:
+            pause_info = scheduler_service.pause_jobs_for_subscription(
+                subscription_id=int(subscription.id),
+                resume_date=resume_date_str,
+                db=db
+            )
+            logger.info(f"Paused subscription {subscription.id}: {pause_info}")
+            if pause_info.get("success"):
+                paused += 1
+        
+        db.commit()
+        if paused:
+            if resume_date_str:
+                flash(request, f"Paused {paused} subscriptions until {resume_date_str}", "success")
+            else:
+                flash(request, f"Paused {paused} subscriptions", "success")
+        else:
+            flash(request, "Could not pause the selected subscriptions. Please check the resume date.", "danger")
+    
+    elif action == "resume":
+        for subscription in subscriptions:
+            resume_info = scheduler_service.resume_jobs_for_subscription(
+                subscription_id=int(subscription.id),
+                db=db
+            )
+            logger.info(f"Resumed subscription {subscription.id}: {resume_info}")
+        
+        db.commit()
+        flash(request, f"Resumed {count} subscriptions", "success")
+    
     else:
         flash(request, "Unknown action", "danger")
     
@@ -1380,32 +1405,47 @@ async def confirm_email_page(
         return templates.TemplateResponse("confirm_email.html", context)
     
     try:
-        # Find user by token
-        user = db.query(User).filter(User.confirmation_token == token).first()
-        
-        if not user:
-            context["error_message"] = "Invalid or already used confirmation token. Please request a new confirmation email."
-            context["show_resend"] = True
-            return templates.TemplateResponse("confirm_email.html", context)
+        email = verify_signed_token(token, CONFIRMATION_PURPOSE)
+        if email is None:
+            if is_signed_token(token):
+                # Forged or expired links are turned away without touching the database
+                context["error_message"] = "Invalid or expired confirmation link. Please request a new confirmation email."
+                context["show_resend"] = True
+                return templates.TemplateResponse("confirm_email.html", context)
+            
+            # Links sent before tokens were signed are looked up by their stored hash
+            user = db.query(User).filter(User.confirmation_token == hash_token(token)).first()
+            
+            if not user:
+                context["error_message"] = "Invalid or already used confirmation token. Please request a new confirmation email."
+                context["show_resend"] = True
+                return templates.TemplateResponse("confirm_email.html", context)
+            
+            context["email"] = user.email
+            
+            # Check if already confirmed
+            if user.email_confirmed:
+                context["error_message"] = "Email already confirmed. Please log in."
+                return templates.TemplateResponse("confirm_email.html", context)
+            
+            # Check if token is expired
+            if not user.confirmation_token_expires or user.confirmation_token_expires < datetime.utcnow():
+                context["error_message"] = "Confirmation token has expired. Please request a new one."
+                context["show_resend"] = True
+                return templates.TemplateResponse("confirm_email.html", context)
+            
+            email = str(user.email)
         
-        context["email"] = user.email
+        context["email"] = email
         
-        # Check if already confirmed
-        if user.email_confirmed:
+        # Mark user as confirmed
+        if not confirm_user_email(db, email):
             context["error_message"] = "Email already confirmed. Please log in."
             return templates.TemplateResponse("confirm_email.html", context)
         
-        # Check if token is expired
-        if not user.confirmation_token_expires or user.confirmation_token_expires < datetime.utcnow():
-            context["error_message"] = "Confirmation token has expired. Please request a new one."
-            context["show_resend"] = True
-            return templates.TemplateResponse("confirm_email.html", context)
-        
-        # Mark user as confirmed
-        user.email_confirmed = 1
-        user.confirmation_token = None
-        user.confirmation_token_expires = None
-        db.commit()
+        # Deliveries of the user's subscriptions start now that the address is confirmed
+        confirmed_user = db.query(User.id).filter(User.email == email).first()
+        backfill_next_send_at(db, user_id=confirmed_user.id)
         
         # Set success context
         context["success"] = True
@@ -1475,12 +1515,12 @@ async def resend_confirmation_submit(
     
     try:
         # Generate new confirmation token
-        from app.core.security import generate_reset_token, get_reset_token_expiry
-        confirmation_token = generate_reset_token()
+        from app.core.security import get_reset_token_expiry
         confirmation_token_expires = get_reset_token_expiry()
+        confirmation_token = generate_confirmation_token(str(user.email), confirmation_token_expires)
         
         # Update user with new token
-        user.confirmation_token = confirmation_token
+        user.confirmation_token = hash_token(confirmation_token)
         user.confirmation_token_expires = confirmation_token_expires
         db.commit()
         
@@ -1508,6 +1548,61 @@ async def resend_confirmation_submit(
         )
 
 
+@app.get("/unsubscribe", response_class=HTMLResponse)
+async def unsubscribe_page(request: Request, token: Optional[str] = None):
+    """
+    Unsubscribe page linked from every lesson
+
+    Only checks the link's signature and asks for confirmation, so mail
+    clients and link scanners that prefetch it neither unsubscribe anyone
+    nor touch the database.
+    """
+    context = {
+        "request": request,
+        "current_user": None,
+        "token": token,
+        "state": "confirm" if token and verify_unsubscribe_token(token) else "invalid"
+    }
+    return templates.TemplateResponse("unsubscribe.html", context)
+
+
+@app.post("/unsubscribe", response_class=HTMLResponse)
+async def unsubscribe_submit(
+    request: Request,
+    token: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Apply an unsubscribe link
+
+    Serves the button on the unsubscribe page as well as one-click requests
+    that mail clients send for the List-Unsubscribe-Post header (RFC 8058).
+    The signed token is the authorization, so there is no CSRF check.
+    """
+    context = {"request": request, "current_user": None, "token": token, "state": "invalid"}
+    unsubscribe = verify_unsubscribe_token(token) if token else None
+    if unsubscribe is None:
+        return templates.TemplateResponse("unsubscribe.html", context, status_code=400)
+    
+    subscription_id, email = unsubscribe
+    
+    try:
+        # The link names both id and address, so the deletes need no prior lookup
+        matching = select(Subscription.id).where(Subscription.id == subscription_id, Subscription.email == email)
+        deleted = delete_subscriptions(db, matching)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error unsubscribing subscription {subscription_id}: {str(e)}")
+        context["state"] = "error"
+        return templates.TemplateResponse("unsubscribe.html", context, status_code=500)
+    
+    if deleted:
+        logger.info(f"Subscription {subscription_id} unsubscribed via email link")
+    context["state"] = "done" if deleted else "already"
+    return templates.TemplateResponse("unsubscribe.html", context)
+
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
@@ -1525,11 +1620,20 @@ async def startup_event():
         if os.getenv("ENVIRONMENT", "development").lower() == "production":
             raise RuntimeError("CRITICAL: Cannot start in production without valid API_SECRET_KEY")
     
-    # TODO (Phase 3): Implement scheduler startup and job loading
-    logger.info("Application startup complete. Scheduler initialization pending Phase 3.")
+    # Load the topic suggestion index before the subscribe form first asks for it
+    await run_in_threadpool(topic_suggestions.reload)
+    
+    # Start the dispatch loop for scheduled lessons
+    try:
+        get_scheduler_service().start()
+    except Exception as e:
+        logger.error(f"Failed to start scheduler: {str(e)}")
+    
+    logger.info("Application startup complete.")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler to clean up resources"""
-    logger.info("Shutting down application...")
\ No newline at end of file
+    logger.info("Shutting down application...")
+    get_scheduler_service().shutdown()
\ No newline at end of file
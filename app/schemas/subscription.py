@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
-from datetime import datetime, time
+from datetime import datetime, time, date
 
 
 class SubscriptionBase(BaseModel):
@@ -22,10 +22,17 @@ class SubscriptionUpdate(BaseModel):
     difficulty: Optional[str] = None  # 'easy', 'medium', 'hard'
 
 
+class SubscriptionPause(BaseModel):
+    resume_date: Optional[date] = None  # Pause indefinitely when omitted
+
+
 class SubscriptionResponse(SubscriptionBase):
     id: int
     created_at: datetime
     last_sent: Optional[datetime] = None
+    next_send_at: Optional[datetime] = None
+    paused_until: Optional[datetime] = None
+    lesson_count: int = 0
     user_id: int
 
     class Config:
@@ -33,7 +40,7 @@ class SubscriptionResponse(SubscriptionBase):
 
 
 class EmailHistoryBase(BaseModel):
-    content: str
+    content: Optional[str] = None  # Left out when not requested in ?fields=
     sent_at: datetime
 
 
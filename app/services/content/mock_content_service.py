@@ -7,6 +7,7 @@ from typing import Dict, Any, Optional, List
 
 from app.core.interfaces.service_interfaces import ContentGenerationInterface
 from app.core.error_handler import ServiceErrorHandler
+from app.core.topics import normalize_topic
 
 
 class MockContentService(ContentGenerationInterface):
@@ -160,7 +161,7 @@ In our next lesson, we'll explore the ancient Mesopotamian civilization in more
         )
         
         # Normalize topic and difficulty for lookup
-        normalized_topic = topic.lower().split()[0]  # Take just the first word
+        normalized_topic = (normalize_topic(topic).split() or [""])[0]  # Take just the first word
         normalized_difficulty = difficulty.lower()
         
         # Try to find matching content
@@ -5,6 +5,7 @@ import google.generativeai as genai
 from typing import List, Optional
 
 from app.core.config import settings
+from app.core.topics import sanitize_topic
 
 logger = logging.getLogger(__name__)
 
@@ -91,7 +92,8 @@ async def setup_gemini():
 
 
 async def generate_educational_content(topic: str, previous_contents: Optional[List[str]] = None, 
-                              is_preview: bool = False, difficulty: str = "medium"):
+                              is_preview: bool = False, difficulty: str = "medium",
+                              lessons_sent: Optional[int] = None):
     """
     Generate educational content about a topic
     
@@ -100,6 +102,8 @@ async def generate_educational_content(topic: str, previous_contents: Optional[L
         previous_contents: Optional list of previous email contents
         is_preview: Whether this is a preview (shorter content)
         difficulty: Content difficulty level (easy, medium, hard)
+        lessons_sent: Optional total of lessons sent so far, when previous_contents
+            holds only the most recent ones
         
     Returns:
         HTML formatted educational content or None on error
@@ -111,7 +115,7 @@ async def generate_educational_content(topic: str, previous_contents: Optional[L
             return None
             
         # Basic input sanitization
-        sanitized_topic = ''.join(c for c in topic if c.isalnum() or c.isspace() or c in '-_.,')
+        sanitized_topic = sanitize_topic(topic)
         
         if not sanitized_topic:
             logger.error("Topic contains only invalid characters")
@@ -124,8 +128,9 @@ async def generate_educational_content(topic: str, previous_contents: Optional[L
         history_context = ""
         if previous_contents and not is_preview:
             if isinstance(previous_contents, list) and all(isinstance(item, str) for item in previous_contents):
-                # Use all previous content for context, not just the last 3
-                num_lessons = len(previous_contents)
+                # Use all previous content still in the hot history for context, not just the last 3
+                num_lessons = max(len(previous_contents), lessons_sent or 0)
+                first_number = num_lessons - len(previous_contents) + 1
                 
                 if num_lessons > 0:
                     # Format the history with lesson numbers
@@ -134,7 +139,7 @@ async def generate_educational_content(topic: str, previous_contents: Optional[L
                         # Extract just the title and key points to reduce token usage if needed
                         # This is a simple extraction - could be more sophisticated
                         content_summary = content[:500] + "..." if len(content) > 500 else content
-                        history_lessons.append(f"Lesson {i+1}: {content_summary}")
+                        history_lessons.append(f"Lesson {first_number + i}: {content_summary}")
                     
                     history_context = f"Previous lessons covered ({num_lessons} total):\n" + "\n---\n".join(history_lessons)
                     
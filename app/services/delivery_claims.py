@@ -0,0 +1,184 @@
+"""
+Idempotent per-day delivery claims.
+
+Before any lesson is generated, the sender inserts a row keyed by
+(subscription_id, delivery_date). The unique constraint makes the claim
+atomic: overlapping runs of a scheduled send for the same subscription and
+day lose the insert and stop before spending an LLM call. Welcome and test
+emails are not scheduled sends and take no claim. Claims are released when
+a send fails before the email goes out so it can be retried; a claim left
+behind by a crash keeps that day's lesson from being sent twice.
+
+Every send, scheduled or not, also reserves the subscription's last_sent
+with a conditional UPDATE, which fails while another send started within
+``SEND_INTERVAL``. That keeps a welcome or test email from overlapping a
+scheduled send, or another test email, and sending the same lesson twice.
+"""
+
+import logging
+from datetime import datetime, date, timedelta
+from typing import Dict, Optional, Sequence
+
+import pytz
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import DeliveryClaim, Subscription
+from app.services.scheduler.dispatcher import get_timezone
+
+logger = logging.getLogger(__name__)
+
+# Shortest time between two sends of one subscription
+SEND_INTERVAL = timedelta(hours=1)
+
+
+def delivery_date_for(timezone: str, now: Optional[datetime] = None) -> date:
+    """
+    Get the local calendar date a delivery belongs to.
+
+    Args:
+        timezone: The subscription's timezone name
+        now: Naive UTC datetime of the delivery (defaults to now)
+
+    Returns:
+        The delivery date in the subscription's timezone
+    """
+    now = now or datetime.utcnow()
+    return pytz.UTC.localize(now).astimezone(get_timezone(timezone)).date()
+
+
+def claim_delivery(db: Session, subscription_id: int, delivery_date: date,
+                   scheduled_at: Optional[datetime] = None) -> Optional[DeliveryClaim]:
+    """
+    Atomically claim the delivery of one lesson for one day.
+
+    Commits the claim immediately so concurrent runs see it.
+
+    Args:
+        db: Database session
+        subscription_id: The ID of the subscription
+        delivery_date: Local delivery date
+        scheduled_at: Optional intended delivery time (naive UTC), for lag metrics
+
+    Returns:
+        The claim, or None if the delivery was already claimed
+    """
+    claim = DeliveryClaim(
+        subscription_id=subscription_id,
+        delivery_date=delivery_date,
+        scheduled_at=scheduled_at
+    )
+    db.add(claim)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        logger.info(f"Delivery for subscription {subscription_id} on {delivery_date} already claimed")
+        return None
+
+    db.refresh(claim)
+    return claim
+
+
+def complete_delivery(db: Session, claim: DeliveryClaim,
+                      generated_at: Optional[datetime] = None,
+                      sent_at: Optional[datetime] = None,
+                      completed_at: Optional[datetime] = None) -> None:
+    """
+    Mark a claim as sent. Does not commit, so it can join the history insert.
+
+    Args:
+        db: Database session
+        claim: The claim to complete
+        generated_at: When the lesson content was generated
+        sent_at: When the email provider accepted the email
+        completed_at: When the send was recorded (defaults to now)
+    """
+    db.query(DeliveryClaim).filter(DeliveryClaim.id == claim.id).update(
+        {
+            "status": "sent",
+            "generated_at": generated_at,
+            "sent_at": sent_at,
+            "completed_at": completed_at or datetime.utcnow()
+        },
+        synchronize_session=False
+    )
+
+
+def complete_deliveries(db: Session, completions: Sequence[Dict]) -> None:
+    """
+    Mark many claims as sent with one executemany. Does not commit.
+
+    Args:
+        db: Database session
+        completions: Dicts with the claim "id" and its "generated_at",
+            "sent_at" and "completed_at"
+    """
+    if completions:
+        db.execute(update(DeliveryClaim), [dict(completion, status="sent") for completion in completions])
+
+
+def release_delivery(db: Session, claim: DeliveryClaim) -> None:
+    """
+    Release a claim after a failed send so the delivery can be retried.
+
+    Args:
+        db: Database session
+        claim: The claim to release
+    """
+    try:
+        released = db.query(DeliveryClaim).filter(
+            DeliveryClaim.id == claim.id,
+            DeliveryClaim.status == "claimed"
+        ).delete(synchronize_session=False)
+        db.commit()
+        # The row is gone; a new claim of the same delivery may reuse its id
+        if released and claim in db:
+            db.expunge(claim)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error releasing delivery claim {claim.id}: {type(e).__name__}: {str(e)}")
+
+
+def reserve_send(db: Session, subscription_id: int, now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Atomically mark a send of a subscription as started by moving its last_sent.
+
+    Commits immediately so concurrent sends see it.
+
+    Args:
+        db: Database session
+        subscription_id: The ID of the subscription
+        now: Naive UTC datetime of the send (defaults to now)
+
+    Returns:
+        The reserved last_sent, or None if another send started within SEND_INTERVAL
+    """
+    now = now or datetime.utcnow()
+    reserved = db.query(Subscription).filter(
+        Subscription.id == subscription_id,
+        or_(Subscription.last_sent == None, Subscription.last_sent < now - SEND_INTERVAL)  # noqa: E711
+    ).update({"last_sent": now}, synchronize_session=False)
+    db.commit()
+    if not reserved:
+        logger.info(f"A send for subscription {subscription_id} started within {SEND_INTERVAL}")
+        return None
+    return now
+
+
+def release_send(db: Session, subscription_id: int, reserved_at: datetime,
+                 previous: Optional[datetime]) -> None:
+    """
+    Put back the last_sent a failed send reserved. Does not commit.
+
+    Args:
+        db: Database session
+        subscription_id: The ID of the subscription
+        reserved_at: What reserve_send returned
+        previous: The subscription's last_sent before the reservation
+    """
+    db.query(Subscription).filter(
+        Subscription.id == subscription_id,
+        Subscription.last_sent == reserved_at
+    ).update({"last_sent": previous}, synchronize_session=False)
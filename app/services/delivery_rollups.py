@@ -0,0 +1,148 @@
+"""
+Daily delivery rollups for admin analytics.
+
+Every delivery attempt is counted in ``delivery_rollups`` under its UTC day,
+topic, difficulty, email provider and outcome, in the same transaction that
+records the send (or releases the claim of a failed one). Counts are added
+with an upsert, so concurrent senders never lose an increment, and batched
+sends add each distinct key once. Reports then read one row per day and
+dimension instead of scanning the history.
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.db.models import DeliveryRollup
+
+SENT = "sent"
+FAILED = "failed"
+GENERATION_FAILED = "generation_failed"
+OUTCOMES = (SENT, FAILED, GENERATION_FAILED)
+
+NO_PROVIDER = "none"
+
+
+@dataclass(frozen=True)
+class RollupKey:
+    """The dimensions a delivery attempt is counted under."""
+
+    day: date
+    topic: str
+    difficulty: str
+    provider: str
+    outcome: str
+
+
+def rollup_key(topic: str, difficulty: Optional[str], provider: Optional[str], outcome: str,
+               at: Optional[datetime] = None) -> RollupKey:
+    """
+    Key for one delivery attempt.
+
+    Args:
+        topic: The subscription's topic
+        difficulty: The subscription's difficulty
+        provider: Email provider used, or None if none was tried
+        outcome: SENT, FAILED or GENERATION_FAILED
+        at: When the attempt finished (naive UTC, defaults to now)
+    """
+    return RollupKey(
+        day=(at or datetime.utcnow()).date(),
+        topic=str(topic),
+        difficulty=str(difficulty or "medium"),
+        provider=provider or NO_PROVIDER,
+        outcome=outcome
+    )
+
+
+def _upsert(db: Session):
+    """INSERT that adds to the count of an existing row instead of failing."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql.insert(DeliveryRollup)
+        return statement.on_duplicate_key_update(count=DeliveryRollup.count + statement.inserted.count)
+    statement = (postgresql if dialect == "postgresql" else sqlite).insert(DeliveryRollup)
+    return statement.on_conflict_do_update(
+        index_elements=[c.name for c in DeliveryRollup.__table__.primary_key.columns],
+        set_={"count": DeliveryRollup.count + statement.excluded.count}
+    )
+
+
+def record_attempts(db: Session, keys: Iterable[RollupKey]) -> None:
+    """
+    Count delivery attempts, one upsert per distinct key. Does not commit.
+
+    Args:
+        db: Database session
+        keys: One key per attempt
+    """
+    add_counts(db, Counter(keys))
+
+
+def add_counts(db: Session, counts: Mapping[RollupKey, int]) -> None:
+    """
+    Add to the rollup counts with one executemany of upserts. Does not commit.
+
+    Args:
+        db: Database session
+        counts: Number of attempts to add per key
+    """
+    if not counts:
+        return
+    db.execute(_upsert(db), [
+        {"day": key.day, "topic": key.topic, "difficulty": key.difficulty,
+         "provider": key.provider, "outcome": key.outcome, "count": count}
+        for key, count in counts.items()
+    ])
+
+
+def summarize_rollups(db: Session, since: date, top_topics: int = 10) -> Dict[str, Any]:
+    """
+    Summarise the rollups from a given day on.
+
+    Args:
+        db: Database session
+        since: First UTC day to include
+        top_topics: Number of topics to list, by lessons sent
+
+    Returns:
+        Dict with per-day outcome counts, per-provider failure rates and the top topics
+    """
+    recent = db.query(DeliveryRollup).filter(DeliveryRollup.day >= since)
+
+    days: Dict[date, Dict[str, Any]] = {}
+    for day, outcome, count in recent.with_entities(
+        DeliveryRollup.day, DeliveryRollup.outcome, func.sum(DeliveryRollup.count)
+    ).group_by(DeliveryRollup.day, DeliveryRollup.outcome).order_by(DeliveryRollup.day):
+        entry = days.setdefault(day, {"date": day.isoformat(), **{o: 0 for o in OUTCOMES}})
+        entry[outcome] = int(count)
+
+    providers: Dict[str, Dict[str, Any]] = {}
+    for provider, outcome, count in recent.with_entities(
+        DeliveryRollup.provider, DeliveryRollup.outcome, func.sum(DeliveryRollup.count)
+    ).filter(DeliveryRollup.outcome.in_([SENT, FAILED])).group_by(DeliveryRollup.provider, DeliveryRollup.outcome):
+        providers.setdefault(provider, {SENT: 0, FAILED: 0})[outcome] = int(count)
+    for counts in providers.values():
+        attempts = counts[SENT] + counts[FAILED]
+        counts["failure_rate"] = round(counts[FAILED] / attempts, 4) if attempts else None
+
+    topics: List[Dict[str, Any]] = [
+        {"topic": topic, "sent": int(count)}
+        for topic, count in recent.with_entities(
+            DeliveryRollup.topic, func.sum(DeliveryRollup.count).label("sent")
+        ).filter(DeliveryRollup.outcome == SENT).group_by(DeliveryRollup.topic).order_by(
+            func.sum(DeliveryRollup.count).desc(), DeliveryRollup.topic
+        ).limit(top_topics)
+    ]
+
+    return {
+        "since": since.isoformat(),
+        "days": list(days.values()),
+        "providers": providers,
+        "top_topics": topics,
+    }
@@ -2,7 +2,8 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Dict, Optional
 import urllib.parse
 import asyncio
 from smtplib import SMTPAuthenticationError, SMTPException
@@ -11,12 +12,25 @@ from sqlalchemy.orm import Session
 from app.db.session import SessionLocal
 from app.db.models import Subscription, EmailHistory, User
 from app.core.config import settings
+from app.core.signed_tokens import generate_unsubscribe_token
 from app.services.content_generator import generate_educational_content
+from app.services.lesson_store import record_lesson
+from app.services.delivery_claims import (
+    claim_delivery,
+    complete_delivery,
+    delivery_date_for,
+    release_delivery,
+    release_send,
+    reserve_send,
+)
+from app.services.delivery_rollups import FAILED, GENERATION_FAILED, SENT, record_attempts, rollup_key
+from app.services.scheduler.metrics import SendTiming, send_metrics
+from app.services.scheduler.write_buffer import PendingSend, lesson_writes
 
 # Try to import SendGrid if available
 try:
     from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail, Content
+    from sendgrid.helpers.mail import Mail, Content, Header
     SENDGRID_AVAILABLE = True
 except ImportError:
     logging.warning("SendGrid package not available. Email sending will use SMTP only.")
@@ -134,8 +148,7 @@ async def create_html_email(subject, content, to_email, email_type="educational"
             <h1>Your Daily Educational Content</h1>
             {content}
             <div class="footer">
-                <p>You received this email because you subscribed to daily educational content.
-                To unsubscribe, reply with 'UNSUBSCRIBE' in the subject line.</p>
+                <p>You received this email because you subscribed to daily educational content.</p>
             </div>
         </body>
         </html>
@@ -144,8 +157,8 @@ async def create_html_email(subject, content, to_email, email_type="educational"
     return msg
 
 
-async def send_via_sendgrid(to_email, subject, html_content):
-    """Send email using SendGrid API"""
+async def send_via_sendgrid(to_email, subject, html_content, headers: Optional[Dict[str, str]] = None):
+    """Send email using SendGrid API, with optional extra headers such as List-Unsubscribe"""
     if not SENDGRID_AVAILABLE:
         logger.error("SendGrid package not available but send_via_sendgrid was called")
         return False
@@ -167,6 +180,8 @@ async def send_via_sendgrid(to_email, subject, html_content):
             subject=subject,
             html_content=html_content
         )
+        for name, value in (headers or {}).items():
+            message.add_header(Header(name, value))
 
         sg = SendGridAPIClient(sendgrid_key)
         # Send message
@@ -201,8 +216,8 @@ async def send_via_sendgrid(to_email, subject, html_content):
         return False
 
 
-async def send_via_smtp(to_email, subject, html_content):
-    """Send email using SMTP (Gmail)"""
+async def send_via_smtp(to_email, subject, html_content, headers: Optional[Dict[str, str]] = None):
+    """Send email using SMTP (Gmail), with optional extra headers such as List-Unsubscribe"""
     try:
         username, password = await check_email_credentials()
         
@@ -217,6 +232,8 @@ async def send_via_smtp(to_email, subject, html_content):
         else:
             # Create a new email message
             msg = await create_html_email(subject, html_content, to_email)
+        for name, value in (headers or {}).items():
+            msg[name] = value
 
         logger.info(f"Attempting to send email via SMTP to {to_email}")
         with smtplib.SMTP('smtp.gmail.com', 587) as server:
@@ -376,10 +393,36 @@ async def send_confirmation_email(email: str, token: str):
         return False
 
 
-async def send_educational_email_task(subscription_id: int):
-    """Send educational email to a subscriber"""
+def _release_or_commit(db, subscription_id: int, claim, reserved_at: Optional[datetime],
+                       previous_sent: Optional[datetime]) -> None:
+    """Commit a send that failed before the email went out, releasing its reservation and claim."""
+    if reserved_at:
+        release_send(db, subscription_id, reserved_at, previous_sent)
+    if claim:
+        release_delivery(db, claim)
+    else:
+        db.commit()
+
+
+async def send_educational_email_task(subscription_id: int, scheduled_at: Optional[datetime] = None):
+    """Send educational email to a subscriber
+
+    scheduled_at is the intended delivery time (naive UTC) when the send comes
+    from the dispatcher; it is recorded with the send timings for lag metrics.
+    Only scheduled sends claim their day's delivery, for the local date they
+    were scheduled on; welcome and test emails leave the daily lesson alone.
+    Every send reserves the subscription's last_sent, so no two sends of one
+    subscription run within an hour of each other.
+    """
     db = SessionLocal()
+    claim = None
+    reserved_at = previous_sent = None
+    sent = False
     try:
+        # Scheduled sends still in the write buffer haven't counted their lesson yet
+        if scheduled_at is None and lesson_writes.enabled:
+            await asyncio.to_thread(lesson_writes.flush)
+        
         # Get subscription
         subscription = db.query(Subscription).filter(Subscription.id == subscription_id).first()
         if not subscription:
@@ -391,24 +434,45 @@ async def send_educational_email_task(subscription_id: int):
             user = db.query(User).filter(User.id == subscription.user_id).first()
             if user and user.email_confirmed != 1:
                 logger.warning(f"Email not confirmed for user {user.id} (subscription {subscription_id}). Skipping email.")
+                if scheduled_at is not None:
+                    # Stop dispatching it until the user confirms, which schedules it again
+                    db.query(Subscription).filter(Subscription.id == subscription_id).update(
+                        {"next_send_at": None}, synchronize_session=False
+                    )
+                    db.commit()
                 return False
         
-        # Check if we already sent an email in the last hour
-        now = datetime.utcnow()
-        if subscription.last_sent and (now - subscription.last_sent).total_seconds() < 3600:
+        # Claim the scheduled day's delivery before spending an LLM call; overlapping runs
+        # lose the claim. A catch-up send after local midnight still claims the day it was due.
+        if scheduled_at is not None:
+            delivery_date = delivery_date_for(str(subscription.timezone), now=scheduled_at)
+            claim = claim_delivery(db, subscription.id, delivery_date, scheduled_at=scheduled_at)
+            if not claim:
+                logger.info(f"Skipping email for {subscription.email} - lesson for {delivery_date} already claimed")
+                return False
+            started_at = claim.claimed_at
+        else:
+            started_at = datetime.utcnow()
+        
+        # Unscheduled sends have no daily claim, so every send also reserves last_sent
+        previous_sent = subscription.last_sent
+        reserved_at = reserve_send(db, subscription.id, now=started_at)
+        if reserved_at is None:
             logger.info(f"Skipping email for {subscription.email} - too soon since last send")
+            if claim:
+                release_delivery(db, claim)
             return False
         
-        # Get all previous content for enhanced continuity
+        # Get the latest lessons for continuity; archived lessons are not read
         previous_history = db.query(EmailHistory).filter(
             EmailHistory.subscription_id == subscription.id
-        ).order_by(EmailHistory.sent_at.asc()).all()
+        ).order_by(EmailHistory.sent_at.desc(), EmailHistory.id.desc()).limit(settings.HISTORY_HOT_LESSONS).all()
         
-        # Extract content from history records
-        previous_contents = [h.content for h in previous_history]
+        # Extract content from history records, oldest first
+        previous_contents = [h.content for h in reversed(previous_history)]
         
-        # Get sequence number (for "Lesson X" labeling)
-        sequence_number = len(previous_history) + 1
+        # Get sequence number (for "Lesson X" labeling) from the counter kept on the subscription
+        sequence_number = subscription.lesson_count + 1
         
         logger.info(f"Generating content for subscription {subscription_id}, lesson #{sequence_number} with {len(previous_contents)} previous lessons as context")
         
@@ -417,11 +481,15 @@ async def send_educational_email_task(subscription_id: int):
         content = await generate_educational_content(
             topic=str(subscription.topic),
             previous_contents=[str(c) for c in previous_contents] if previous_contents else None,
-            difficulty=difficulty
+            difficulty=difficulty,
+            lessons_sent=sequence_number - 1
         )
         if not content:
             logger.error(f"Failed to generate content for {subscription.email}")
+            record_attempts(db, [rollup_key(subscription.topic, difficulty, None, GENERATION_FAILED)])
+            _release_or_commit(db, subscription.id, claim, reserved_at, previous_sent)
             return False
+        generated_at = datetime.utcnow()
         
         # Format HTML content for email with lesson number
         topic_url_encoded = urllib.parse.quote(str(subscription.topic))
@@ -451,6 +519,18 @@ async def send_educational_email_task(subscription_id: int):
             </div>
             """
         
+        # One-click unsubscribe (RFC 8058); the link is signed, so it is checked without a lookup
+        unsubscribe_token = generate_unsubscribe_token(
+            subscription.id,
+            str(subscription.email),
+            datetime.utcnow() + timedelta(days=settings.UNSUBSCRIBE_TOKEN_EXPIRE_DAYS)
+        )
+        unsubscribe_url = f"{settings.BASE_URL}/unsubscribe?token={unsubscribe_token}"
+        unsubscribe_headers = {
+            "List-Unsubscribe": f"<{unsubscribe_url}>",
+            "List-Unsubscribe-Post": "List-Unsubscribe=One-Click"
+        }
+        
         html_content = f"""
         <div style="max-width: 600px; margin: 0 auto;">
             {lesson_badge}
@@ -462,22 +542,28 @@ async def send_educational_email_task(subscription_id: int):
             </div>
             
             {registration_cta}
+            
+            <p style="margin-top: 30px; font-size: 0.8em; color: #999;">
+                Don't want these lessons anymore? <a href="{unsubscribe_url}" style="color: #999;">Unsubscribe from {subscription.topic}</a>
+            </p>
         </div>
         """
         
         # Check which email provider is available
         email_provider_available = False
         
-        # Try SendGrid first
-        sent = False
+        # Try SendGrid first; every provider tried is counted in the delivery rollups
+        attempts = []
         if SENDGRID_AVAILABLE and settings.SENDGRID_API_KEY:
             email_provider_available = True
             logger.info(f"Attempting to send email via SendGrid to {subscription.email}")
             sent = await send_via_sendgrid(
                 subscription.email,
                 f"Your {subscription.topic} Lesson #{sequence_number}",
-                html_content
+                html_content,
+                headers=unsubscribe_headers
             )
+            attempts.append(rollup_key(subscription.topic, difficulty, "sendgrid", SENT if sent else FAILED))
             
             if sent:
                 logger.info(f"Successfully sent email via SendGrid to {subscription.email}")
@@ -492,8 +578,10 @@ async def send_educational_email_task(subscription_id: int):
                 sent = await send_via_smtp(
                     subscription.email,
                     f"Your {subscription.topic} Lesson #{sequence_number}",
-                    html_content
+                    html_content,
+                    headers=unsubscribe_headers
                 )
+                attempts.append(rollup_key(subscription.topic, difficulty, "smtp", SENT if sent else FAILED))
                 
                 if sent:
                     logger.info(f"Successfully sent email via SMTP to {subscription.email}")
@@ -502,25 +590,63 @@ async def send_educational_email_task(subscription_id: int):
                     
         if not email_provider_available:
             logger.error("No email provider credentials configured. Cannot send emails.")
+            attempts.append(rollup_key(subscription.topic, difficulty, None, FAILED))
         
         if sent:
-            # Save the email content to history
-            history = EmailHistory(subscription_id=subscription.id, content=content)
-            db.add(history)
+            sent_at = datetime.utcnow()
             
-            # Update the last sent time - needs explicit update for SQLAlchemy Column type
-            db.query(Subscription).filter(Subscription.id == subscription.id).update(
-                {"last_sent": datetime.utcnow()})
+            # Scheduled sends are recorded in batches; the committed claim keeps the lesson
+            # from being sent again should the process die before the batch is written
+            if scheduled_at is not None and lesson_writes.enabled:
+                lesson_writes.add(PendingSend(
+                    subscription_id=subscription.id,
+                    claim_id=claim.id,
+                    body=content,
+                    scheduled_at=scheduled_at,
+                    started_at=started_at,
+                    generated_at=generated_at,
+                    sent_at=sent_at,
+                    attempts=attempts
+                ))
+                logger.info(f"Successfully sent email to {subscription.email}")
+                return True
+            
+            # Save the email content to history; identical lessons share one stored body, and
+            # the subscription's lesson count and last sent time are updated with it
+            record_lesson(db, subscription.id, content, sent_at=sent_at)
+            record_attempts(db, attempts)
+            completed_at = datetime.utcnow()
+            if claim:
+                complete_delivery(db, claim, generated_at=generated_at, sent_at=sent_at, completed_at=completed_at)
             db.commit()
+            
+            send_metrics.record(SendTiming(
+                scheduled_at=scheduled_at,
+                started_at=started_at,
+                generated_at=generated_at,
+                sent_at=sent_at,
+                committed_at=completed_at
+            ))
             logger.info(f"Successfully sent email to {subscription.email}")
             return True
         else:
             logger.error(f"Failed to send email to {subscription.email}")
+            record_attempts(db, attempts)
+            _release_or_commit(db, subscription.id, claim, reserved_at, previous_sent)
             return False
     
     except Exception as e:
         logger.error(f"Error in send_educational_email_task: {type(e).__name__}: {str(e)}")
         db.rollback()
+        if sent:
+            # The email went out; releasing now would send the lesson again
+            logger.warning(f"Lesson for subscription {subscription_id} was sent but not recorded; keeping its claim")
+        elif reserved_at or claim:
+            try:
+                _release_or_commit(db, subscription_id, claim, reserved_at, previous_sent)
+            except Exception as release_error:
+                db.rollback()
+                logger.error(f"Error releasing send of subscription {subscription_id}: {str(release_error)}")
         return False
     finally:
         db.close()
\ No newline at end of file
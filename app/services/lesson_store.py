@@ -0,0 +1,215 @@
+"""
+Content-addressed store for lesson bodies.
+
+History rows reference their lesson by the SHA-256 of its body, and each
+distinct body is stored once, compressed. Lessons shared by a cohort of
+subscribers cost one blob instead of one copy per subscriber, and a body
+that is already stored is not compressed again.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.compression import compress, content_hash
+from app.db.models import Subscription, EmailHistory, EmailHistoryArchive, LessonContent
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SentLesson:
+    """A lesson sent to a subscription, to be recorded in its history."""
+
+    subscription_id: int
+    body: str
+    sent_at: datetime
+
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT that leaves an existing row alone, so concurrent writers of one body don't conflict."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(LessonContent).on_conflict_do_nothing()
+    if dialect == "mysql":
+        return mysql.insert(LessonContent).prefix_with("IGNORE")
+    return sqlite.insert(LessonContent).on_conflict_do_nothing()
+
+
+def _content_row(digest: str, body: str) -> Dict:
+    """Compressed lesson_contents row for a body."""
+    codec, data = compress(body)
+    return {"hash": digest, "codec": codec, "data": data, "size": len(body.encode("utf-8"))}
+
+
+def store_lesson_content(db: Session, body: str) -> str:
+    """
+    Store a lesson body unless it is already stored. Does not commit.
+
+    Args:
+        db: Database session
+        body: The lesson body
+
+    Returns:
+        The content hash to reference from EmailHistory.content_hash
+    """
+    digest = content_hash(body)
+    if db.query(LessonContent.hash).filter(LessonContent.hash == digest).first():
+        return digest
+
+    row = _content_row(digest, body)
+    db.execute(_insert_ignoring_duplicates(db), row)
+    logger.debug(f"Stored lesson {digest[:12]} ({row['codec']}, {len(row['data'])} bytes)")
+    return digest
+
+
+def store_lesson_contents(db: Session, bodies: Sequence[str]) -> List[str]:
+    """
+    Store any of several lesson bodies not stored yet, in one INSERT. Does not commit.
+
+    Args:
+        db: Database session
+        bodies: The lesson bodies
+
+    Returns:
+        The content hash of each body, in order
+    """
+    digests = [content_hash(body) for body in bodies]
+    unique = dict(zip(digests, bodies))
+    stored = {row.hash for row in db.query(LessonContent.hash).filter(LessonContent.hash.in_(list(unique)))}
+    missing = [_content_row(digest, body) for digest, body in unique.items() if digest not in stored]
+    if missing:
+        db.execute(_insert_ignoring_duplicates(db), missing)
+    return digests
+
+
+def record_lesson(db: Session, subscription_id: int, body: str,
+                  sent_at: Optional[datetime] = None) -> EmailHistory:
+    """
+    Add a history row for a sent lesson, storing its body. Does not commit.
+
+    The subscription's lesson_count, last_history_id and last_sent are
+    updated in the same transaction, so they commit or roll back with the
+    history row.
+
+    Args:
+        db: Database session
+        subscription_id: The subscription the lesson was sent for
+        body: The lesson body
+        sent_at: When the lesson was sent (naive UTC, defaults to now)
+
+    Returns:
+        The flushed EmailHistory row
+    """
+    sent_at = sent_at or datetime.utcnow()
+    history = EmailHistory(
+        subscription_id=subscription_id,
+        content_hash=store_lesson_content(db, body),
+        sent_at=sent_at
+    )
+    db.add(history)
+    db.flush()
+
+    # Incremented in SQL, so concurrent sends for one subscription can't lose a count
+    db.query(Subscription).filter(Subscription.id == subscription_id).update({
+        "lesson_count": Subscription.lesson_count + 1,
+        "last_history_id": history.id,
+        "last_sent": sent_at
+    }, synchronize_session=False)
+    return history
+
+
+def record_lessons(db: Session, lessons: Sequence[SentLesson]) -> List[int]:
+    """
+    Add the history rows of many sent lessons in one batch. Does not commit.
+
+    The rows are inserted with one executemany, and the lesson counters and
+    last_sent of all their subscriptions are updated by a single UPDATE.
+
+    Args:
+        db: Database session
+        lessons: The sent lessons, oldest first
+
+    Returns:
+        The ids of the new history rows, in order
+    """
+    if not lessons:
+        return []
+
+    hashes = store_lesson_contents(db, [lesson.body for lesson in lessons])
+    history_ids = list(db.scalars(
+        insert(EmailHistory).returning(EmailHistory.id, sort_by_parameter_order=True),
+        [
+            {"subscription_id": lesson.subscription_id, "content_hash": digest, "sent_at": lesson.sent_at}
+            for lesson, digest in zip(lessons, hashes)
+        ]
+    ))
+
+    # Per subscription: lessons added, and the newest of them
+    counts: Dict[int, int] = {}
+    latest: Dict[int, Tuple[int, datetime]] = {}
+    for lesson, history_id in zip(lessons, history_ids):
+        counts[lesson.subscription_id] = counts.get(lesson.subscription_id, 0) + 1
+        latest[lesson.subscription_id] = (history_id, lesson.sent_at)
+
+    db.query(Subscription).filter(Subscription.id.in_(list(counts))).update({
+        "lesson_count": Subscription.lesson_count + case(counts, value=Subscription.id, else_=0),
+        "last_history_id": case(
+            {sid: history_id for sid, (history_id, _) in latest.items()}, value=Subscription.id
+        ),
+        "last_sent": case(
+            {sid: sent_at for sid, (_, sent_at) in latest.items()}, value=Subscription.id
+        ),
+    }, synchronize_session=False)
+    return history_ids
+
+
+def repair_lesson_counters(db: Session, batch_size: int = 500) -> int:
+    """
+    Recount lesson_count and last_history_id from the history and fix any drift.
+
+    Works through subscriptions in id order, committing each batch.
+
+    Args:
+        db: Database session
+        batch_size: Subscriptions checked per query and commit
+
+    Returns:
+        Number of subscriptions whose counters were repaired
+    """
+    repaired, last_id = 0, 0
+    while True:
+        subscriptions = db.query(
+            Subscription.id, Subscription.lesson_count, Subscription.last_history_id
+        ).filter(Subscription.id > last_id).order_by(Subscription.id).limit(batch_size).all()
+        if not subscriptions:
+            return repaired
+        last_id = subscriptions[-1].id
+        ids = [row.id for row in subscriptions]
+
+        # Archived rows are older than every hot row, so the latest lesson is hot unless none are
+        actual = {}
+        for model in (EmailHistoryArchive, EmailHistory):
+            for subscription_id, count, latest_id in db.query(
+                model.subscription_id, func.count(model.id), func.max(model.id)
+            ).filter(model.subscription_id.in_(ids)).group_by(model.subscription_id):
+                total, _ = actual.get(subscription_id, (0, None))
+                actual[subscription_id] = (total + count, latest_id)
+
+        for row in subscriptions:
+            count, latest_id = actual.get(row.id, (0, None))
+            if (row.lesson_count, row.last_history_id) != (count, latest_id):
+                logger.warning(
+                    f"Repairing lesson counters of subscription {row.id}: "
+                    f"{row.lesson_count}/{row.last_history_id} -> {count}/{latest_id}"
+                )
+                db.query(Subscription).filter(Subscription.id == row.id).update(
+                    {"lesson_count": count, "last_history_id": latest_id}, synchronize_session=False
+                )
+                repaired += 1
+        db.commit()
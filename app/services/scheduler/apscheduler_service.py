@@ -1,94 +1,493 @@
 """
 APScheduler service implementation.
-This is a stub that will be fully implemented in Phase 3.
+
+Delivery times are stored on the subscription rows themselves
+(``next_send_at``) and a single APScheduler interval job dispatches whatever
+is due, so scheduling, pausing and resuming are plain database updates.
+Several processes can run the dispatcher at once: each tick first renews this
+process's shard leases and only claims subscriptions in the shards it holds.
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, List, Optional, Callable, Iterator, Union
+
+import pytz
+from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.interfaces.service_interfaces import SchedulerInterface
 from app.core.error_handler import ServiceErrorHandler
+from app.db.models import Subscription, User
+from app.services.scheduler.archive import archive_history
+from app.services.scheduler.catchup import CatchUpProcessor
+from app.services.scheduler.leases import ShardLeaseManager
+from app.services.scheduler.metrics import format_summary, send_metrics
+from app.services.subscription_deletes import sweep_orphans
+from app.services.scheduler.dispatcher import (
+    PAUSED_INDEFINITELY,
+    backfill_next_send_at,
+    claim_due_subscriptions,
+    compute_next_send_at,
+    count_overdue,
+    local_midnight_utc,
+    resume_paused_subscriptions,
+)
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_JOB_ID = "dispatch_due_subscriptions"
+ARCHIVE_JOB_ID = "archive_history"
+SWEEP_JOB_ID = "sweep_orphaned_history"
 
 
 class APSchedulerService(SchedulerInterface):
     """APScheduler implementation of the scheduler interface."""
-    
-    def __init__(self, error_handler: ServiceErrorHandler):
+
+    def __init__(self, error_handler: ServiceErrorHandler,
+                 session_factory: Optional[Callable[[], Session]] = None):
         """
         Initialize the APScheduler service.
-        
+
         Args:
             error_handler: Error handler for service errors
+            session_factory: Optional callable returning database sessions
+                (defaults to the application's SessionLocal)
         """
         self.error_handler = error_handler
         self.scheduler = None
-        
-        # TODO: Initialize scheduler in Phase 3
-    
-    def schedule_email_job(self, subscription_id: int, delivery_time: str, 
-                          timezone: str) -> Dict[str, Any]:
+        self.processor: Optional[CatchUpProcessor] = None
+        self.leases = ShardLeaseManager(
+            shard_count=settings.SCHEDULER_SHARD_COUNT,
+            ttl_seconds=settings.SCHEDULER_LEASE_TTL_SECONDS
+        )
+        self.owned_shards: List[int] = []
+        self.last_tick_at: Optional[datetime] = None
+
+        if session_factory is None:
+            from app.db.session import SessionLocal
+            session_factory = SessionLocal
+        self.session_factory = session_factory
+
+    def start(self) -> None:
+        """Start the dispatch loop and schedule any unscheduled subscriptions."""
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+        if not settings.SCHEDULER_ENABLED:
+            logger.info("Scheduler disabled on this instance (SCHEDULER_ENABLED=false)")
+            return
+
+        if self.scheduler is not None and self.scheduler.running:
+            return
+
+        with self._session() as db:
+            scheduled = backfill_next_send_at(db)
+            overdue = count_overdue(db)
+        logger.info(f"Scheduled {scheduled} subscriptions without a delivery time, {overdue} overdue to catch up")
+
+        self.processor = self._create_processor()
+        self.scheduler = AsyncIOScheduler(timezone=pytz.UTC)
+        self.scheduler.add_job(
+            self.dispatch_tick,
+            trigger="interval",
+            seconds=settings.SCHEDULER_DISPATCH_INTERVAL_SECONDS,
+            id=DISPATCH_JOB_ID,
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+            next_run_time=datetime.now(pytz.UTC)  # Start catching up immediately
+        )
+        if settings.HISTORY_ARCHIVE_AFTER_DAYS > 0:
+            self.scheduler.add_job(
+                self.archive_tick,
+                trigger="interval",
+                seconds=settings.HISTORY_ARCHIVE_INTERVAL_SECONDS,
+                id=ARCHIVE_JOB_ID,
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True
+            )
+        if settings.HISTORY_ORPHAN_SWEEP_INTERVAL_SECONDS > 0:
+            self.scheduler.add_job(
+                self.sweep_tick,
+                trigger="interval",
+                seconds=settings.HISTORY_ORPHAN_SWEEP_INTERVAL_SECONDS,
+                id=SWEEP_JOB_ID,
+                max_instances=1,
+                coalesce=True,
+                replace_existing=True
+            )
+        self.scheduler.start()
+        logger.info(f"Scheduler started as {self.leases.owner}, dispatching every {settings.SCHEDULER_DISPATCH_INTERVAL_SECONDS}s")
+
+    def shutdown(self) -> None:
+        """Stop the dispatch loop and hand this process's shards to the others."""
+        if self.scheduler is None:
+            return
+
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+            logger.info("Scheduler stopped")
+        self.scheduler = None
+
+        # Record the sends still waiting for a batch before their claims go stale
+        from app.services.scheduler.write_buffer import lesson_writes
+
+        try:
+            lesson_writes.flush()
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "flush_history", e)
+
+        try:
+            with self._session() as db:
+                self.leases.release_all(db)
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "shutdown", e)
+
+    async def dispatch_tick(self) -> int:
+        """
+        Resume expired pauses and hand due subscriptions to the send processor.
+
+        Only as many subscriptions are claimed as the processor can start
+        before the next tick, oldest due first; the rest stay in the
+        database queue. Lessons overdue by more than the misfire grace
+        period are skipped rather than sent late.
+
+        Returns:
+            Number of subscriptions submitted for sending
+        """
+        if self.processor is None:
+            self.processor = self._create_processor()
+
+        now = datetime.utcnow()
+        submitted = await self._dispatch(now)
+        self.last_tick_at = now
+        logger.info(
+            f"Dispatch tick: submitted {submitted}, backlog {self.processor.backlog}, "
+            f"shards {len(self.owned_shards)}/{self.leases.shard_count}; "
+            f"{format_summary(send_metrics.snapshot())}"
+        )
+        return submitted
+
+    async def archive_tick(self) -> int:
+        """
+        Move old lessons of the subscriptions in our shards to the archive.
+
+        Runs in a worker thread so long archival runs don't hold up dispatch.
+
+        Returns:
+            Number of lessons archived
+        """
+        shards = list(self.owned_shards)
+        if not shards:
+            return 0
+
+        try:
+            return await asyncio.to_thread(self._archive, shards)
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "archive_tick", e)
+            return 0
+
+    def _archive(self, shards: List[int]) -> int:
+        with self._session() as db:
+            return archive_history(db, shards=shards, shard_count=self.leases.shard_count)
+
+    async def sweep_tick(self) -> int:
+        """
+        Purge history and claims left behind by deleted subscriptions in our shards.
+
+        Returns:
+            Number of rows deleted
+        """
+        shards = list(self.owned_shards)
+        if not shards:
+            return 0
+
+        try:
+            return await asyncio.to_thread(self._sweep, shards)
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "sweep_tick", e)
+            return 0
+
+    def _sweep(self, shards: List[int]) -> int:
+        with self._session() as db:
+            return sweep_orphans(db, shards=shards, shard_count=self.leases.shard_count)
+
+    async def _dispatch(self, now: datetime) -> int:
+        """Renew leases, then claim and submit due subscriptions in our shards."""
+        try:
+            # Heartbeat even when the backlog is full so our leases don't expire
+            with self._session() as db:
+                shards = self.leases.heartbeat(db, now)
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "lease_heartbeat", e)
+            return 0
+        self.owned_shards = shards
+
+        if not shards:
+            logger.info(f"No dispatch shards held by {self.leases.owner} this tick")
+            return 0
+
+        budget = self._tick_budget() - self.processor.backlog
+        if budget <= 0:
+            logger.info(f"Send backlog of {self.processor.backlog} still draining, not claiming more work")
+            return 0
+
+        shard_count = self.leases.shard_count
+        try:
+            with self._session() as db:
+                resume_paused_subscriptions(db, now, shards=shards, shard_count=shard_count)
+                claimed = claim_due_subscriptions(db, now, limit=budget, shards=shards, shard_count=shard_count)
+        except Exception as e:
+            self.error_handler.handle_external_service_error("APScheduler", "dispatch_tick", e)
+            return 0
+
+        grace_cutoff = now - timedelta(seconds=settings.SCHEDULER_MISFIRE_GRACE_SECONDS)
+        due = []
+        for subscription_id, due_at in claimed:
+            if due_at < grace_cutoff:
+                logger.warning(f"Skipping lesson for subscription {subscription_id} due at {due_at}: past misfire grace period")
+                continue
+            due.append((subscription_id, due_at))
+
+        return self.processor.submit(due)
+
+    def schedule_email_job(self, subscription_id: int, delivery_time: str,
+                          timezone: str, db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Schedule an email job for a subscription.
-        
+
         Args:
             subscription_id: The ID of the subscription
             delivery_time: The time to deliver the email (format: HH:MM)
             timezone: The user's timezone
-            
+            db: Optional session to reuse; the caller is then responsible for committing
+
         Returns:
             Dict containing job information and status
         """
-        # TODO: Implement in Phase 3
-        return {
-            "success": False,
-            "message": "Not yet implemented"
-        }
-    
-    def remove_jobs_for_subscription(self, subscription_id: int) -> Dict[str, Any]:
+        try:
+            preferred_time = datetime.strptime(delivery_time, "%H:%M").time()
+
+            with self._session(db) as session:
+                subscription = session.query(Subscription).filter(Subscription.id == subscription_id).first()
+                if not subscription:
+                    return {"success": False, "message": f"Subscription {subscription_id} not found"}
+
+                if subscription.paused_until is not None:
+                    # Keep paused subscriptions out of the due queue; resuming schedules them
+                    return {
+                        "success": True,
+                        "subscription_id": subscription_id,
+                        "paused": True,
+                        "next_send_at": None
+                    }
+
+                if not self._owner_confirmed(session, subscription):
+                    # The sender would reject every delivery; confirming the email schedules it
+                    session.query(Subscription).filter(Subscription.id == subscription_id).update(
+                        {"next_send_at": None}, synchronize_session=False
+                    )
+                    self._commit(session, db)
+                    return {
+                        "success": True,
+                        "subscription_id": subscription_id,
+                        "paused": False,
+                        "unconfirmed": True,
+                        "next_send_at": None
+                    }
+
+                next_send_at = compute_next_send_at(preferred_time, timezone)
+                session.query(Subscription).filter(Subscription.id == subscription_id).update(
+                    {"next_send_at": next_send_at}, synchronize_session=False
+                )
+                self._commit(session, db)
+
+            return {
+                "success": True,
+                "subscription_id": subscription_id,
+                "paused": False,
+                "next_send_at": next_send_at.isoformat()
+            }
+        except Exception as e:
+            return self.error_handler.handle_external_service_error(
+                "APScheduler", "schedule_email_job", e, subscription_id=subscription_id
+            )
+
+    def remove_jobs_for_subscription(self, subscription_id: int,
+                                     db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Remove all scheduled jobs for a subscription.
-        
+
         Args:
             subscription_id: The ID of the subscription
-            
+            db: Optional session to reuse; the caller is then responsible for committing
+
         Returns:
             Dict containing status information about the operation
         """
-        # TODO: Implement in Phase 3
-        return {
-            "success": False,
-            "message": "Not yet implemented"
-        }
-    
-    def pause_jobs_for_subscription(self, subscription_id: int, 
-                                  resume_date: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            with self._session(db) as session:
+                updated = session.query(Subscription).filter(Subscription.id == subscription_id).update(
+                    {"next_send_at": None}, synchronize_session=False
+                )
+                self._commit(session, db)
+
+            return {"success": True, "subscription_id": subscription_id, "removed": bool(updated)}
+        except Exception as e:
+            return self.error_handler.handle_external_service_error(
+                "APScheduler", "remove_jobs_for_subscription", e, subscription_id=subscription_id
+            )
+
+    def pause_jobs_for_subscription(self, subscription_id: int,
+                                  resume_date: Optional[Union[str, date, datetime]] = None,
+                                  db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Pause all scheduled jobs for a subscription.
-        
+
+        A date-only resume_date resumes at the start of that day in the
+        subscription's timezone; a datetime is taken as UTC. The dispatch
+        tick resumes the subscription once that moment has passed.
+
         Args:
             subscription_id: The ID of the subscription
             resume_date: Optional date to automatically resume
-            
+            db: Optional session to reuse; the caller is then responsible for committing
+
         Returns:
             Dict containing status information about the operation
         """
-        # TODO: Implement in Phase 3
-        return {
-            "success": False,
-            "message": "Not yet implemented"
-        }
-    
-    def resume_jobs_for_subscription(self, subscription_id: int) -> Dict[str, Any]:
+        try:
+            with self._session(db) as session:
+                subscription = session.query(Subscription).filter(Subscription.id == subscription_id).first()
+                if not subscription:
+                    return {"success": False, "message": f"Subscription {subscription_id} not found"}
+
+                paused_until = self._parse_resume_date(resume_date, str(subscription.timezone))
+                if paused_until <= datetime.utcnow():
+                    return {"success": False, "message": "Resume date must be in the future"}
+
+                session.query(Subscription).filter(Subscription.id == subscription_id).update(
+                    {"paused_until": paused_until, "next_send_at": None}, synchronize_session=False
+                )
+                self._commit(session, db)
+
+            logger.info(f"Paused subscription {subscription_id} until {paused_until}")
+            return {
+                "success": True,
+                "subscription_id": subscription_id,
+                "paused_until": None if paused_until == PAUSED_INDEFINITELY else paused_until.isoformat()
+            }
+        except ValueError as e:
+            return {"success": False, "message": f"Invalid resume date: {str(e)}"}
+        except Exception as e:
+            return self.error_handler.handle_external_service_error(
+                "APScheduler", "pause_jobs_for_subscription", e, subscription_id=subscription_id
+            )
+
+    def resume_jobs_for_subscription(self, subscription_id: int,
+                                     db: Optional[Session] = None) -> Dict[str, Any]:
         """
         Resume all scheduled jobs for a subscription.
-        
+
         Args:
             subscription_id: The ID of the subscription
-            
+            db: Optional session to reuse; the caller is then responsible for committing
+
         Returns:
             Dict containing status information about the operation
         """
-        # TODO: Implement in Phase 3
-        return {
-            "success": False,
-            "message": "Not yet implemented"
-        }
\ No newline at end of file
+        try:
+            with self._session(db) as session:
+                subscription = session.query(Subscription).filter(Subscription.id == subscription_id).first()
+                if not subscription:
+                    return {"success": False, "message": f"Subscription {subscription_id} not found"}
+
+                next_send_at = None
+                if self._owner_confirmed(session, subscription):
+                    next_send_at = compute_next_send_at(subscription.preferred_time, str(subscription.timezone))
+                session.query(Subscription).filter(Subscription.id == subscription_id).update(
+                    {"paused_until": None, "next_send_at": next_send_at}, synchronize_session=False
+                )
+                self._commit(session, db)
+
+            logger.info(f"Resumed subscription {subscription_id}, next delivery at {next_send_at}")
+            return {
+                "success": True,
+                "subscription_id": subscription_id,
+                "next_send_at": next_send_at.isoformat() if next_send_at else None
+            }
+        except Exception as e:
+            return self.error_handler.handle_external_service_error(
+                "APScheduler", "resume_jobs_for_subscription", e, subscription_id=subscription_id
+            )
+
+    @staticmethod
+    def _owner_confirmed(session: Session, subscription: Subscription) -> bool:
+        """Whether the subscription's user has confirmed their email, so its lessons can be sent."""
+        return session.query(User.id).filter(
+            User.id == subscription.user_id, User.email_confirmed == 1
+        ).first() is not None
+
+    def _create_processor(self) -> CatchUpProcessor:
+        """Create the send processor from the configured limits."""
+        from app.services.email_sender import send_educational_email_task
+
+        return CatchUpProcessor(
+            send_task=send_educational_email_task,
+            max_concurrency=settings.SCHEDULER_MAX_CONCURRENT_SENDS,
+            max_per_minute=settings.SCHEDULER_MAX_SENDS_PER_MINUTE
+        )
+
+    @staticmethod
+    def _tick_budget() -> int:
+        """Maximum number of subscriptions to claim in one dispatch tick."""
+        if settings.SCHEDULER_MAX_SENDS_PER_MINUTE <= 0:
+            return settings.SCHEDULER_DISPATCH_BATCH_SIZE
+        per_tick = settings.SCHEDULER_MAX_SENDS_PER_MINUTE * settings.SCHEDULER_DISPATCH_INTERVAL_SECONDS // 60
+        return max(1, min(per_tick, settings.SCHEDULER_DISPATCH_BATCH_SIZE))
+
+    @contextmanager
+    def _session(self, db: Optional[Session] = None) -> Iterator[Session]:
+        """Yield the given session, or a new one that is closed afterwards."""
+        if db is not None:
+            yield db
+            return
+
+        session = self.session_factory()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @staticmethod
+    def _commit(session: Session, db: Optional[Session]) -> None:
+        """Commit sessions owned by the service; leave caller-provided ones to the caller."""
+        if db is None:
+            session.commit()
+        else:
+            session.flush()
+
+    @staticmethod
+    def _parse_resume_date(resume_date: Optional[Union[str, date, datetime]], timezone: str) -> datetime:
+        """Convert a resume date to the naive UTC value stored in paused_until."""
+        if resume_date is None or resume_date == "":
+            return PAUSED_INDEFINITELY
+
+        if isinstance(resume_date, str):
+            if "T" in resume_date or " " in resume_date.strip():
+                resume_date = datetime.fromisoformat(resume_date)
+            else:
+                resume_date = date.fromisoformat(resume_date)
+
+        if isinstance(resume_date, datetime):
+            if resume_date.tzinfo is not None:
+                resume_date = resume_date.astimezone(pytz.UTC).replace(tzinfo=None)
+            return resume_date
+
+        return local_midnight_utc(resume_date, timezone)
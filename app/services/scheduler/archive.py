@@ -0,0 +1,114 @@
+"""
+Archival of old lessons out of the hot history table.
+
+``email_history`` only keeps what sends and the recent-history views read:
+every lesson newer than ``HISTORY_ARCHIVE_AFTER_DAYS`` plus the latest
+``HISTORY_HOT_LESSONS`` of each subscription, which the generator uses for
+continuity. Older rows move to ``email_history_archive`` with their ids, so
+per-subscription queries on the hot table stay small while the history API
+still reads both. Bodies live in the content store, so moving a row copies
+only its hash. Each batch of subscriptions is moved in its own short
+transaction, and a scheduler process only archives the shards it holds.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Subscription, EmailHistory, EmailHistoryArchive
+from app.services.scheduler.dispatcher import _in_shards
+
+logger = logging.getLogger(__name__)
+
+
+def archive_subscriptions(db: Session, subscription_ids: Iterable[int], cutoff: datetime,
+                          keep_recent: int, now: Optional[datetime] = None) -> int:
+    """
+    Move the old lessons of some subscriptions into the archive. Does not commit.
+
+    Args:
+        db: Database session
+        subscription_ids: Subscriptions to archive
+        cutoff: Lessons sent before this (naive UTC) are archived...
+        keep_recent: ...unless they are among the subscription's latest this many
+
+    Returns:
+        Number of lessons archived
+    """
+    subscription_ids = list(subscription_ids)
+    now = now or datetime.utcnow()
+    ranked = select(
+        EmailHistory.id,
+        EmailHistory.subscription_id,
+        EmailHistory.content_hash,
+        EmailHistory.inline_content,
+        EmailHistory.sent_at,
+        func.row_number().over(
+            partition_by=EmailHistory.subscription_id,
+            order_by=(EmailHistory.sent_at.desc(), EmailHistory.id.desc())
+        ).label("recency")
+    ).where(EmailHistory.subscription_id.in_(subscription_ids)).subquery()
+
+    moved = db.execute(insert(EmailHistoryArchive).from_select(
+        ["id", "subscription_id", "content_hash", "content", "sent_at", "archived_at"],
+        select(
+            ranked.c.id,
+            ranked.c.subscription_id,
+            ranked.c.content_hash,
+            ranked.c.inline_content,
+            ranked.c.sent_at,
+            literal(now)
+        ).where(ranked.c.sent_at < cutoff, ranked.c.recency > keep_recent)
+    )).rowcount
+
+    if moved:
+        db.query(EmailHistory).filter(
+            EmailHistory.subscription_id.in_(subscription_ids),
+            EmailHistory.id.in_(
+                select(EmailHistoryArchive.id).where(EmailHistoryArchive.subscription_id.in_(subscription_ids))
+            )
+        ).delete(synchronize_session=False)
+    return moved
+
+
+def archive_history(db: Session, now: Optional[datetime] = None,
+                    shards: Optional[Sequence[int]] = None,
+                    shard_count: int = 1) -> int:
+    """
+    Archive old lessons of every subscription, a batch of subscriptions per commit.
+
+    Args:
+        db: Database session
+        now: Naive UTC datetime the horizon is measured from (defaults to now)
+        shards: Optional shard numbers to restrict archiving to
+        shard_count: Total number of shards
+
+    Returns:
+        Number of lessons archived
+    """
+    if settings.HISTORY_ARCHIVE_AFTER_DAYS <= 0:
+        return 0
+
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=settings.HISTORY_ARCHIVE_AFTER_DAYS)
+    keep_recent = max(1, settings.HISTORY_HOT_LESSONS)
+    archived, last_id = 0, 0
+    while True:
+        subscription_ids = [row.id for row in _in_shards(
+            db.query(Subscription.id).filter(Subscription.id > last_id),
+            shards, shard_count
+        ).order_by(Subscription.id).limit(settings.HISTORY_ARCHIVE_BATCH_SIZE).all()]
+        if not subscription_ids:
+            break
+        last_id = subscription_ids[-1]
+
+        archived += archive_subscriptions(db, subscription_ids, cutoff, keep_recent, now=now)
+        db.commit()
+
+    if archived:
+        logger.info(f"Archived {archived} lessons sent before {cutoff}")
+    return archived
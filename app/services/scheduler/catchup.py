@@ -0,0 +1,105 @@
+"""
+Bounded-concurrency processor for due and overdue lesson sends.
+
+The dispatch tick claims due subscriptions oldest-first and hands them to
+this processor, which runs them with a fixed number of concurrent sends,
+a maximum start rate, and at most one in-flight send per subscription.
+After downtime the backlog therefore drains in priority order at a steady
+rate instead of firing every missed job at once.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CatchUpProcessor:
+    """Rate-limited, per-subscription exclusive executor for send tasks."""
+
+    def __init__(self, send_task: Callable[[int, Optional[datetime]], Awaitable[bool]],
+                 max_concurrency: int = 5, max_per_minute: int = 60):
+        """
+        Initialize the processor.
+
+        Args:
+            send_task: Coroutine function that sends one subscription's lesson,
+                called with the subscription ID and its scheduled delivery time
+            max_concurrency: Maximum number of sends running at once
+            max_per_minute: Maximum number of sends started per minute (0 = unlimited)
+        """
+        self.send_task = send_task
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_minute = max_per_minute
+        self._interval = 60.0 / max_per_minute if max_per_minute > 0 else 0.0
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._rate_lock = asyncio.Lock()
+        self._next_start = 0.0
+        self._in_flight: Set[int] = set()
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    @property
+    def backlog(self) -> int:
+        """Number of subscriptions queued or currently sending."""
+        return len(self._in_flight)
+
+    def is_in_flight(self, subscription_id: int) -> bool:
+        """Whether a send for this subscription is queued or running."""
+        return subscription_id in self._in_flight
+
+    def submit(self, due: Iterable[Tuple[int, Optional[datetime]]]) -> int:
+        """
+        Queue sends in the given order, skipping subscriptions already in flight.
+
+        Must be called from a running event loop.
+
+        Args:
+            due: (subscription_id, scheduled_at) pairs, highest priority first
+
+        Returns:
+            Number of sends accepted
+        """
+        accepted = 0
+        for subscription_id, scheduled_at in due:
+            if subscription_id in self._in_flight:
+                logger.info(f"Send for subscription {subscription_id} already in flight, skipping")
+                continue
+
+            self._in_flight.add(subscription_id)
+            task = asyncio.create_task(self._run(subscription_id, scheduled_at))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            accepted += 1
+
+        return accepted
+
+    async def drain(self) -> None:
+        """Wait until every queued send has finished."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def _run(self, subscription_id: int, scheduled_at: Optional[datetime]) -> None:
+        """Run one send once a concurrency slot and a rate slot are free."""
+        try:
+            async with self._semaphore:
+                await self._wait_for_rate_slot()
+                await self.send_task(subscription_id, scheduled_at)
+        except Exception as e:
+            logger.error(f"Send for subscription {subscription_id} failed: {type(e).__name__}: {str(e)}")
+        finally:
+            self._in_flight.discard(subscription_id)
+
+    async def _wait_for_rate_slot(self) -> None:
+        """Space send starts at least 60 / max_per_minute seconds apart."""
+        if not self._interval:
+            return
+
+        async with self._rate_lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next_start - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_start = max(now, self._next_start) + self._interval
@@ -0,0 +1,218 @@
+"""
+Database-driven dispatch for scheduled lessons.
+
+Each subscription stores the UTC time of its next delivery in
+``Subscription.next_send_at``. A single periodic dispatch tick picks up due
+rows through that index instead of keeping one timer per subscription.
+Paused subscriptions have ``next_send_at`` cleared and ``paused_until`` set,
+so they never appear in the due-work query; the tick resumes them once
+``paused_until`` has passed. When several processes dispatch, each one
+restricts these queries to the id-hash shards it holds a lease on.
+"""
+
+import logging
+from functools import lru_cache
+from datetime import datetime, date, time, timedelta
+from typing import List, Optional, Sequence, Tuple
+
+import pytz
+from sqlalchemy.orm import Session
+
+from app.db.models import Subscription, User
+
+logger = logging.getLogger(__name__)
+
+# Stored in paused_until for pauses without a resume date. It never satisfies
+# the resume query, so the subscription stays paused until resumed explicitly.
+PAUSED_INDEFINITELY = datetime(9999, 12, 31)
+
+
+@lru_cache(maxsize=1024)
+def get_timezone(timezone: str):
+    """
+    Return a pytz timezone, falling back to UTC for unknown names.
+
+    Memoized, since the dashboard, dispatcher and delivery claims resolve the
+    same few names over and over.
+    """
+    try:
+        return pytz.timezone(str(timezone))
+    except pytz.UnknownTimeZoneError:
+        logger.warning(f"Unknown timezone '{timezone}', falling back to UTC")
+        return pytz.UTC
+
+
+def compute_next_send_at(preferred_time: time, timezone: str,
+                         after: Optional[datetime] = None) -> datetime:
+    """
+    Compute the next delivery time strictly after a given moment.
+
+    Args:
+        preferred_time: Local delivery time of the subscription
+        timezone: The subscription's timezone name
+        after: Naive UTC datetime to start from (defaults to now)
+
+    Returns:
+        Naive UTC datetime of the next delivery
+    """
+    after = after or datetime.utcnow()
+    tz = get_timezone(timezone)
+    delivery_time = preferred_time.replace(second=0, microsecond=0)
+
+    local_after = pytz.UTC.localize(after).astimezone(tz)
+    local_date = local_after.date()
+    candidate = tz.localize(datetime.combine(local_date, delivery_time))
+    if candidate <= local_after:
+        candidate = tz.localize(datetime.combine(local_date + timedelta(days=1), delivery_time))
+
+    return candidate.astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def local_midnight_utc(day: date, timezone: str) -> datetime:
+    """Convert the start of a local calendar day to a naive UTC datetime."""
+    tz = get_timezone(timezone)
+    local_start = tz.localize(datetime.combine(day, time(0, 0)))
+    return local_start.astimezone(pytz.UTC).replace(tzinfo=None)
+
+
+def _in_shards(query, shards: Optional[Sequence[int]], shard_count: int):
+    """Restrict a subscription query to the given id-hash shards."""
+    if shards is None or shard_count <= 1:
+        return query
+    return query.filter((Subscription.id % shard_count).in_(list(shards)))
+
+
+def resume_paused_subscriptions(db: Session, now: Optional[datetime] = None,
+                                shards: Optional[Sequence[int]] = None,
+                                shard_count: int = 1) -> int:
+    """
+    Resume subscriptions whose pause has expired.
+
+    Args:
+        db: Database session
+        now: Naive UTC datetime to compare against (defaults to now)
+        shards: Optional shard numbers to restrict the query to
+        shard_count: Total number of shards
+
+    Returns:
+        Number of subscriptions resumed
+    """
+    now = now or datetime.utcnow()
+    expired = _in_shards(db.query(
+        Subscription.id,
+        Subscription.preferred_time,
+        Subscription.timezone
+    ).filter(
+        Subscription.paused_until != None,  # noqa: E711
+        Subscription.paused_until <= now
+    ), shards, shard_count).all()
+
+    for row in expired:
+        db.query(Subscription).filter(Subscription.id == row.id).update(
+            {
+                "paused_until": None,
+                "next_send_at": compute_next_send_at(row.preferred_time, row.timezone, now)
+            },
+            synchronize_session=False
+        )
+
+    if expired:
+        db.commit()
+        logger.info(f"Resumed {len(expired)} paused subscriptions")
+    return len(expired)
+
+
+def claim_due_subscriptions(db: Session, now: Optional[datetime] = None,
+                            limit: int = 500,
+                            shards: Optional[Sequence[int]] = None,
+                            shard_count: int = 1) -> List[Tuple[int, datetime]]:
+    """
+    Claim subscriptions that are due and advance them to their next slot.
+
+    Each row is advanced with a conditional UPDATE on its current
+    ``next_send_at``, so a subscription is only handed out once per slot
+    even if two ticks overlap.
+
+    Args:
+        db: Database session
+        now: Naive UTC datetime to compare against (defaults to now)
+        limit: Maximum number of subscriptions to claim
+        shards: Optional shard numbers to restrict the query to
+        shard_count: Total number of shards
+
+    Returns:
+        (subscription_id, due_at) pairs of the claimed subscriptions, oldest due first
+    """
+    now = now or datetime.utcnow()
+    due = _in_shards(db.query(
+        Subscription.id,
+        Subscription.next_send_at,
+        Subscription.preferred_time,
+        Subscription.timezone
+    ).filter(
+        Subscription.next_send_at != None,  # noqa: E711
+        Subscription.next_send_at <= now
+    ), shards, shard_count).order_by(Subscription.next_send_at.asc()).limit(limit).all()
+
+    claimed = []
+    for row in due:
+        updated = db.query(Subscription).filter(
+            Subscription.id == row.id,
+            Subscription.next_send_at == row.next_send_at
+        ).update(
+            {"next_send_at": compute_next_send_at(row.preferred_time, row.timezone, now)},
+            synchronize_session=False
+        )
+        if updated:
+            claimed.append((row.id, row.next_send_at))
+
+    db.commit()
+    return claimed
+
+
+def count_overdue(db: Session, now: Optional[datetime] = None) -> int:
+    """Count subscriptions whose delivery time has already passed."""
+    now = now or datetime.utcnow()
+    return db.query(Subscription.id).filter(
+        Subscription.next_send_at != None,  # noqa: E711
+        Subscription.next_send_at <= now
+    ).count()
+
+
+def backfill_next_send_at(db: Session, now: Optional[datetime] = None, user_id: Optional[int] = None) -> int:
+    """
+    Schedule active subscriptions of confirmed users that have no next delivery time yet.
+
+    Subscriptions of unconfirmed users stay unscheduled, since the sender
+    would reject every delivery; they are scheduled once the user confirms.
+
+    Args:
+        db: Database session
+        now: Naive UTC datetime to start from (defaults to now)
+        user_id: Only schedule this user's subscriptions
+
+    Returns:
+        Number of subscriptions scheduled
+    """
+    now = now or datetime.utcnow()
+    unscheduled = db.query(
+        Subscription.id,
+        Subscription.preferred_time,
+        Subscription.timezone
+    ).join(User, User.id == Subscription.user_id).filter(
+        Subscription.next_send_at == None,  # noqa: E711
+        Subscription.paused_until == None,  # noqa: E711
+        User.email_confirmed == 1
+    )
+    if user_id is not None:
+        unscheduled = unscheduled.filter(Subscription.user_id == user_id)
+    unscheduled = unscheduled.all()
+
+    for row in unscheduled:
+        db.query(Subscription).filter(Subscription.id == row.id).update(
+            {"next_send_at": compute_next_send_at(row.preferred_time, row.timezone, now)},
+            synchronize_session=False
+        )
+
+    db.commit()
+    return len(unscheduled)
@@ -0,0 +1,146 @@
+"""
+Database-backed leases for running the dispatcher in several processes.
+
+Subscriptions are split into ``SCHEDULER_SHARD_COUNT`` shards by
+``id % shard_count``. Every scheduler process heartbeats a ``worker:<owner>``
+lease and holds a fair share of ``shard:<n>`` leases, renewing them on each
+dispatch tick. Leases of a process that stops heartbeating expire and are
+picked up by the remaining processes; a new process takes over shards that
+others release once they hold more than their share.
+"""
+
+import logging
+import math
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+WORKER_PREFIX = "worker:"
+SHARD_PREFIX = "shard:"
+
+
+def make_owner_id() -> str:
+    """Build a lease owner id that is unique per process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def try_acquire_lease(db: Session, name: str, owner: str, expires_at: datetime,
+                      now: Optional[datetime] = None) -> bool:
+    """
+    Acquire or renew a lease if it is free, expired or already ours.
+
+    Args:
+        db: Database session
+        name: Lease name
+        owner: Owner id of the caller
+        expires_at: New expiry for the lease
+        now: Naive UTC datetime to compare against (defaults to now)
+
+    Returns:
+        True if the caller holds the lease afterwards
+    """
+    now = now or datetime.utcnow()
+    updated = db.query(SchedulerLease).filter(
+        SchedulerLease.name == name,
+        or_(SchedulerLease.owner == owner, SchedulerLease.expires_at < now)
+    ).update({"owner": owner, "expires_at": expires_at}, synchronize_session=False)
+    if updated:
+        db.commit()
+        return True
+
+    if db.query(SchedulerLease.name).filter(SchedulerLease.name == name).first():
+        db.rollback()
+        return False
+
+    db.add(SchedulerLease(name=name, owner=owner, expires_at=expires_at))
+    try:
+        db.commit()
+        return True
+    except IntegrityError:
+        # Another process inserted the lease first
+        db.rollback()
+        return False
+
+
+class ShardLeaseManager:
+    """Keeps this process's worker heartbeat and its share of dispatch shards."""
+
+    def __init__(self, shard_count: int, ttl_seconds: int, owner: Optional[str] = None):
+        """
+        Initialize the lease manager.
+
+        Args:
+            shard_count: Number of dispatch shards
+            ttl_seconds: Lease lifetime; should span several dispatch ticks
+            owner: Optional owner id (defaults to host, pid and a random suffix)
+        """
+        self.shard_count = max(1, shard_count)
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.owner = owner or make_owner_id()
+
+    def heartbeat(self, db: Session, now: Optional[datetime] = None) -> List[int]:
+        """
+        Renew this worker's leases and rebalance shards towards a fair share.
+
+        Args:
+            db: Database session
+            now: Naive UTC datetime of the heartbeat (defaults to now)
+
+        Returns:
+            Sorted list of shard numbers this worker owns
+        """
+        now = now or datetime.utcnow()
+        expires_at = now + self.ttl
+
+        try_acquire_lease(db, f"{WORKER_PREFIX}{self.owner}", self.owner, expires_at, now)
+
+        # Forget workers that stopped heartbeating
+        db.query(SchedulerLease).filter(
+            SchedulerLease.name.like(f"{WORKER_PREFIX}%"),
+            SchedulerLease.expires_at < now
+        ).delete(synchronize_session=False)
+        db.commit()
+
+        live_workers = db.query(SchedulerLease.name).filter(
+            SchedulerLease.name.like(f"{WORKER_PREFIX}%"),
+            SchedulerLease.expires_at >= now
+        ).count()
+        fair_share = math.ceil(self.shard_count / max(1, live_workers))
+
+        owned = []
+        for shard in range(self.shard_count):
+            name = f"{SHARD_PREFIX}{shard}"
+            if len(owned) < fair_share:
+                if try_acquire_lease(db, name, self.owner, expires_at, now):
+                    owned.append(shard)
+            else:
+                # Over our share: hand back shards we hold so newer workers can take them
+                self._release(db, name)
+
+        return owned
+
+    def release_all(self, db: Session) -> None:
+        """Release every lease held by this worker, e.g. on shutdown."""
+        db.query(SchedulerLease).filter(SchedulerLease.owner == self.owner).delete(synchronize_session=False)
+        db.commit()
+        logger.info(f"Released scheduler leases for {self.owner}")
+
+    def _release(self, db: Session, name: str) -> None:
+        """Release one lease if this worker holds it."""
+        released = db.query(SchedulerLease).filter(
+            SchedulerLease.name == name,
+            SchedulerLease.owner == self.owner
+        ).delete(synchronize_session=False)
+        db.commit()
+        if released:
+            logger.info(f"Released {name} to rebalance shards")
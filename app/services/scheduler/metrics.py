@@ -0,0 +1,177 @@
+"""
+Lag and throughput metrics for lesson sends.
+
+Every send records when it was scheduled, started, generated, sent and
+committed. The timestamps are stored on the delivery claim, so they can be
+summarised across all scheduler processes, and a rolling in-memory window
+is kept per process for the log line written on each dispatch tick.
+"""
+
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import DeliveryClaim
+
+PERCENTILES = (50, 95, 99)
+
+
+@dataclass
+class SendTiming:
+    """Timestamps (naive UTC) of one lesson send."""
+
+    scheduled_at: Optional[datetime]  # None for sends outside the schedule (welcome, test emails)
+    started_at: datetime
+    generated_at: Optional[datetime]
+    sent_at: Optional[datetime]
+    committed_at: datetime
+
+    @property
+    def lag_seconds(self) -> Optional[float]:
+        """Seconds between the intended delivery time and the committed send."""
+        if self.scheduled_at is None:
+            return None
+        return (self.committed_at - self.scheduled_at).total_seconds()
+
+    @property
+    def start_delay_seconds(self) -> Optional[float]:
+        """Seconds between the intended delivery time and the start of the send."""
+        if self.scheduled_at is None:
+            return None
+        return (self.started_at - self.scheduled_at).total_seconds()
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def _distribution(values: Iterable[Optional[float]]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99 of the non-empty values, rounded to milliseconds."""
+    ordered = sorted(v for v in values if v is not None)
+    result = {}
+    for pct in PERCENTILES:
+        value = percentile(ordered, pct)
+        result[f"p{pct}"] = round(value, 3) if value is not None else None
+    return result
+
+
+def summarize_timings(timings: List[SendTiming], window_seconds: int) -> Dict[str, Any]:
+    """
+    Summarise send timings from one window.
+
+    Args:
+        timings: Sends committed within the window
+        window_seconds: Length of the window
+
+    Returns:
+        Dict with send counts, sends per minute and lag percentiles in seconds
+    """
+    def stage(start: str, end: str):
+        for t in timings:
+            a, b = getattr(t, start), getattr(t, end)
+            yield (b - a).total_seconds() if a and b else None
+
+    return {
+        "window_seconds": window_seconds,
+        "sends": len(timings),
+        "scheduled_sends": sum(1 for t in timings if t.scheduled_at is not None),
+        "sends_per_minute": round(len(timings) * 60 / window_seconds, 2) if window_seconds else None,
+        "lag_seconds": _distribution(t.lag_seconds for t in timings),
+        "start_delay_seconds": _distribution(t.start_delay_seconds for t in timings),
+        "generate_seconds": _distribution(stage("started_at", "generated_at")),
+        "deliver_seconds": _distribution(stage("generated_at", "sent_at")),
+        "commit_seconds": _distribution(stage("sent_at", "committed_at")),
+    }
+
+
+class SendMetrics:
+    """Rolling window of recent send timings for this process."""
+
+    def __init__(self, window_seconds: int = 900, max_samples: int = 10000):
+        """
+        Initialize the metrics window.
+
+        Args:
+            window_seconds: How far back the window reaches
+            max_samples: Upper bound on retained samples
+        """
+        self.window_seconds = window_seconds
+        self._samples: Deque[SendTiming] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, timing: SendTiming) -> None:
+        """Add a completed send to the window."""
+        with self._lock:
+            self._samples.append(timing)
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Summarise the sends committed within the window."""
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(seconds=self.window_seconds)
+        with self._lock:
+            while self._samples and self._samples[0].committed_at < cutoff:
+                self._samples.popleft()
+            timings = list(self._samples)
+        return summarize_timings(timings, self.window_seconds)
+
+
+def load_timings(db: Session, since: datetime) -> List[SendTiming]:
+    """
+    Load the timings of sends committed since a given moment, from all processes.
+
+    Args:
+        db: Database session
+        since: Naive UTC start of the window
+
+    Returns:
+        Send timings ordered by commit time
+    """
+    rows = db.query(
+        DeliveryClaim.scheduled_at,
+        DeliveryClaim.claimed_at,
+        DeliveryClaim.generated_at,
+        DeliveryClaim.sent_at,
+        DeliveryClaim.completed_at
+    ).filter(
+        DeliveryClaim.status == "sent",
+        DeliveryClaim.completed_at >= since
+    ).order_by(DeliveryClaim.completed_at.asc()).all()
+
+    return [
+        SendTiming(
+            scheduled_at=row.scheduled_at,
+            started_at=row.claimed_at,
+            generated_at=row.generated_at,
+            sent_at=row.sent_at,
+            committed_at=row.completed_at
+        )
+        for row in rows
+    ]
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """One-line rendering of a summary for the dispatch log."""
+    lag = summary["lag_seconds"]
+
+    def fmt(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:.1f}s"
+
+    return (
+        f"{summary['sends']} sends in {summary['window_seconds']}s "
+        f"({summary['sends_per_minute']}/min), "
+        f"lag p50={fmt(lag['p50'])} p95={fmt(lag['p95'])} p99={fmt(lag['p99'])}"
+    )
+
+
+# Per-process window fed by send_educational_email_task
+send_metrics = SendMetrics(window_seconds=settings.SCHEDULER_METRICS_WINDOW_SECONDS)
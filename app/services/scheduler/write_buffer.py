@@ -0,0 +1,212 @@
+"""
+Write-behind buffer for the history of scheduled sends.
+
+Recording a send inserts its history row, updates the subscription's lesson
+counters and last_sent, counts it in the delivery rollups and marks its
+delivery claim sent. Committed one send at a time that is a transaction, and
+on SQLite an fsync, per lesson. During bulk runs the sender hands finished
+sends to this buffer instead, which records them together every
+``SCHEDULER_WRITE_BATCH_SIZE`` sends or ``SCHEDULER_WRITE_FLUSH_MS``
+milliseconds: one executemany of history rows, one UPDATE of the
+subscriptions and one executemany of claims, committed once. Batches are
+written on the buffer's own writer thread, one at a time, so the event loop
+keeps serving requests while a batch commits.
+
+Crash safety comes from the delivery claim, which is committed before the
+lesson is generated. A crash before a flush loses the buffered history rows
+and leaves their claims in the "claimed" state, so those deliveries are not
+sent a second time; ``repair_lesson_counters`` keeps the counters in line
+with the history that was recorded. Until a batch is written, its
+subscriptions' lesson_count lags behind, so welcome and test emails flush
+the buffer before they number their lesson.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.delivery_claims import complete_deliveries
+from app.services.delivery_rollups import RollupKey, record_attempts
+from app.services.lesson_store import SentLesson, record_lessons
+from app.services.scheduler.metrics import SendTiming, send_metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PendingSend:
+    """A delivered lesson whose history has not been written yet."""
+
+    subscription_id: int
+    claim_id: int
+    body: str
+    scheduled_at: Optional[datetime]
+    started_at: datetime
+    generated_at: datetime
+    sent_at: datetime
+    attempts: List[RollupKey] = field(default_factory=list)  # Counted in the delivery rollups
+
+
+class LessonWriteBuffer:
+    """Coalesces the history writes of many sends into one transaction."""
+
+    def __init__(self, batch_size: int = 100, flush_ms: int = 500,
+                 session_factory: Optional[Callable[[], Session]] = None):
+        """
+        Initialize the buffer.
+
+        Args:
+            batch_size: Sends recorded per commit; 1 or less disables buffering
+            flush_ms: Longest a buffered send waits before it is committed
+            session_factory: Optional callable returning database sessions
+                (defaults to the application's SessionLocal)
+        """
+        self.batch_size = batch_size
+        self.flush_seconds = flush_ms / 1000
+        self._session_factory = session_factory
+        self._pending: List[PendingSend] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # A single writer thread keeps the blocking commits off the event loop and never runs two at once
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lesson-writes")
+
+    @property
+    def enabled(self) -> bool:
+        """Whether sends are buffered rather than written through."""
+        return self.batch_size > 1
+
+    @property
+    def pending(self) -> int:
+        """Number of sends waiting to be written."""
+        return len(self._pending)
+
+    def add(self, send: PendingSend) -> None:
+        """
+        Buffer a delivered send, flushing if the batch is full.
+
+        Called from the event loop; the first send of a batch starts the
+        flush timer. Full batches are handed to the writer thread without
+        waiting for them to be written.
+        """
+        with self._lock:
+            self._pending.append(send)
+            full = len(self._pending) >= self.batch_size
+
+        if full:
+            self.flush_soon()
+        elif self._timer is None:
+            try:
+                self._timer = asyncio.get_running_loop().call_later(self.flush_seconds, self.flush_soon)
+            except RuntimeError:
+                # No event loop to time the flush: write through
+                self.flush()
+
+    def flush_soon(self) -> None:
+        """Hand every buffered send to the writer thread, without waiting for the write."""
+        batch = self._take()
+        if batch:
+            self._writer.submit(self._write_batch, batch).add_done_callback(self._log_failure)
+
+    def flush(self) -> int:
+        """
+        Write every buffered send and wait until it is written.
+
+        Batches handed to the writer earlier are written first. This blocks
+        the caller, so on the event loop it is only meant for shutdown;
+        sends call it through asyncio.to_thread.
+
+        Returns:
+            Number of sends written by this flush
+        """
+        return self._writer.submit(self._write_batch, self._take()).result()
+
+    @staticmethod
+    def _log_failure(future) -> None:
+        if future.exception() is not None:
+            logger.error(f"Error writing buffered sends: {type(future.exception()).__name__}: {str(future.exception())}")
+
+    def _take(self) -> List[PendingSend]:
+        """Take the buffered sends, stopping the flush timer."""
+        with self._lock:
+            batch, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        return batch
+
+    def _write_batch(self, batch: List[PendingSend]) -> int:
+        """
+        Write a batch of sends in one transaction, on the writer thread.
+
+        If the batch cannot be written, for instance because a subscription
+        was deleted meanwhile, each send is retried in its own transaction so
+        one bad row doesn't lose the others.
+        """
+        if not batch:
+            return 0
+
+        db = self._session()
+        try:
+            try:
+                self._write(db, batch)
+                written = batch
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Writing {len(batch)} buffered sends failed ({type(e).__name__}: {str(e)}), retrying one by one")
+                written = [send for send in batch if self._write_one(db, send)]
+        finally:
+            db.close()
+
+        logger.debug(f"Wrote {len(written)} buffered sends")
+        return len(written)
+
+    @staticmethod
+    def _write(db: Session, batch: List[PendingSend]) -> None:
+        """Record a batch of sends and mark their claims sent, in one commit."""
+        record_lessons(db, [SentLesson(s.subscription_id, s.body, s.sent_at) for s in batch])
+        record_attempts(db, [key for s in batch for key in s.attempts])
+        completed_at = datetime.utcnow()
+        complete_deliveries(db, [
+            {"id": s.claim_id, "generated_at": s.generated_at, "sent_at": s.sent_at, "completed_at": completed_at}
+            for s in batch
+        ])
+        db.commit()
+
+        for send in batch:
+            send_metrics.record(SendTiming(
+                scheduled_at=send.scheduled_at,
+                started_at=send.started_at,
+                generated_at=send.generated_at,
+                sent_at=send.sent_at,
+                committed_at=completed_at
+            ))
+
+    def _write_one(self, db: Session, send: PendingSend) -> bool:
+        """Write one send in its own transaction; its claim stays taken if that fails too."""
+        try:
+            self._write(db, [send])
+            return True
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error recording lesson for subscription {send.subscription_id}: {type(e).__name__}: {str(e)}")
+            return False
+
+    def _session(self) -> Session:
+        if self._session_factory is None:
+            from app.db.session import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+
+# Per-process buffer used by send_educational_email_task for scheduled sends
+lesson_writes = LessonWriteBuffer(
+    batch_size=settings.SCHEDULER_WRITE_BATCH_SIZE,
+    flush_ms=settings.SCHEDULER_WRITE_FLUSH_MS
+)
@@ -0,0 +1,114 @@
+"""
+Set-based deletion of subscriptions and the rows that belong to them.
+
+A subscription owns its lesson history, hot and archived, and its delivery
+claims. Fresh schemas declare those foreign keys ON DELETE CASCADE, but
+SQLite cannot add a cascade to a table created before that. Deletes
+therefore remove the children explicitly, with one statement per table for
+any number of subscriptions and never a query per row. Rows orphaned by
+older code, which deleted subscriptions without their history, are purged
+in chunks by sweep_orphans.
+"""
+
+import logging
+from typing import List, Optional, Sequence, Union
+
+from sqlalchemy import Select, delete
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Delete
+
+from app.core.config import settings
+from app.db.models import Subscription, EmailHistory, EmailHistoryArchive, DeliveryClaim
+from app.services.topic_suggestions import counted_subscribers, topic_suggestions
+
+logger = logging.getLogger(__name__)
+
+# Tables with a subscription_id, deleted before the subscriptions themselves
+CHILD_MODELS = (EmailHistory, EmailHistoryArchive, DeliveryClaim)
+
+SubscriptionIds = Union[Sequence[int], Select]
+
+
+def subscription_delete_statements(subscription_ids: SubscriptionIds) -> List[Delete]:
+    """
+    Build the DELETE statements for some subscriptions, children first.
+
+    Args:
+        subscription_ids: Subscription ids, or a select of them
+
+    Returns:
+        Statements to execute in order in one transaction; the last one deletes the subscriptions
+    """
+    statements = [
+        delete(model).where(model.subscription_id.in_(subscription_ids))
+        for model in CHILD_MODELS
+    ]
+    statements.append(delete(Subscription).where(Subscription.id.in_(subscription_ids)))
+    # Plain statements: rows loaded in the session are not looked up and expired first
+    return [statement.execution_options(synchronize_session=False) for statement in statements]
+
+
+def delete_subscriptions(db: Session, subscription_ids: SubscriptionIds) -> int:
+    """
+    Delete subscriptions with their history and claims. Does not commit.
+
+    Their topics lose the subscribers in the suggestion index right away; if
+    the delete is rolled back, the next reload counts them again.
+
+    Args:
+        db: Database session
+        subscription_ids: Subscription ids, or a select of them
+
+    Returns:
+        Number of subscriptions deleted
+    """
+    counted = counted_subscribers(db, subscription_ids).all()
+    deleted = 0
+    for statement in subscription_delete_statements(subscription_ids):
+        deleted = db.execute(statement).rowcount
+    for topic_id, subscribers in counted:
+        topic_suggestions.unsubscribed(topic_id, subscribers)
+    return deleted
+
+
+def sweep_orphans(db: Session, chunk_size: Optional[int] = None,
+                  shards: Optional[Sequence[int]] = None,
+                  shard_count: int = 1) -> int:
+    """
+    Delete history and claims whose subscription no longer exists, a chunk per commit.
+
+    Each table is walked once in id order, so a sweep never holds the write
+    lock for longer than one chunk takes to delete.
+
+    Args:
+        db: Database session
+        chunk_size: Rows deleted per transaction (defaults to HISTORY_ORPHAN_SWEEP_CHUNK_SIZE)
+        shards: Optional shard numbers of the (deleted) subscription ids to sweep
+        shard_count: Total number of shards
+
+    Returns:
+        Number of rows deleted
+    """
+    chunk_size = chunk_size or settings.HISTORY_ORPHAN_SWEEP_CHUNK_SIZE
+    swept = 0
+    for model in CHILD_MODELS:
+        last_id = 0
+        while True:
+            query = db.query(model.id).outerjoin(
+                Subscription, Subscription.id == model.subscription_id
+            ).filter(
+                Subscription.id == None,  # noqa: E711
+                model.id > last_id
+            )
+            if shards is not None and shard_count > 1:
+                query = query.filter((model.subscription_id % shard_count).in_(list(shards)))
+            ids = [row.id for row in query.order_by(model.id).limit(chunk_size)]
+            if not ids:
+                break
+            last_id = ids[-1]
+
+            db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            swept += len(ids)
+            logger.info(f"Swept {len(ids)} orphaned rows from {model.__tablename__}")
+    return swept
@@ -0,0 +1,101 @@
+"""
+Canonical topics that subscriptions are grouped into.
+
+Each distinct ``normalize_topic`` key gets a row in ``topics`` the first time
+it is subscribed to, and every subscription points at its topic, so
+"Python" and "python " are one cohort. Admins can add aliases to fold
+further keys into a topic ("Python programming" into Python); an alias for
+a key that already has a topic of its own merges that topic in.
+"""
+
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import update
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.topics import clean_topic, normalize_topic
+from app.db.models import Subscription, Topic, TopicAlias
+
+logger = logging.getLogger(__name__)
+
+
+def _insert_ignoring_duplicates(db: Session):
+    """INSERT that leaves an existing topic alone, so concurrent subscribers of a new topic don't conflict."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(Topic).on_conflict_do_nothing()
+    if dialect == "mysql":
+        return mysql.insert(Topic).prefix_with("IGNORE")
+    return sqlite.insert(Topic).on_conflict_do_nothing()
+
+
+def resolve_topics(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """
+    Look up the topics of several topic names, creating any that are new. Does not commit.
+
+    Args:
+        db: Database session
+        names: Topics as entered
+
+    Returns:
+        Topic id by normalized key, for every name with a non-empty key
+    """
+    names_by_key: Dict[str, str] = {}
+    for name in names:
+        key = normalize_topic(name)
+        if key:
+            names_by_key.setdefault(key, clean_topic(name))
+    if not names_by_key:
+        return {}
+
+    keys = list(names_by_key)
+    topic_ids = dict(db.query(TopicAlias.key, TopicAlias.topic_id).filter(TopicAlias.key.in_(keys)).all())
+    missing = [key for key in keys if key not in topic_ids]
+    if missing:
+        db.execute(_insert_ignoring_duplicates(db), [{"key": key, "name": names_by_key[key]} for key in missing])
+        topic_ids.update(db.query(Topic.key, Topic.id).filter(Topic.key.in_(missing)).all())
+    return topic_ids
+
+
+def resolve_topic(db: Session, name: str) -> Optional[int]:
+    """Id of the topic a name belongs to, creating the topic if it is new. Does not commit."""
+    return resolve_topics(db, [name]).get(normalize_topic(name))
+
+
+def add_topic_alias(db: Session, topic_id: int, alias: str) -> int:
+    """
+    Make a further topic resolve to a topic, merging its subscriptions in. Does not commit.
+
+    Args:
+        db: Database session
+        topic_id: The topic to keep
+        alias: Topic to fold into it, as entered
+
+    Returns:
+        Number of subscriptions moved to the topic
+
+    Raises:
+        ValueError: If the alias is empty or already the topic's own key
+    """
+    key = normalize_topic(alias)
+    topic = db.get(Topic, topic_id)
+    if topic is None:
+        raise ValueError(f"Topic {topic_id} not found")
+    if not key or key == topic.key:
+        raise ValueError(f"'{alias}' is not a different topic")
+
+    # The merged topic's own key and aliases all resolve to the kept topic from now on
+    merged = db.query(Topic.id, Topic.key).filter(Topic.key == key).first()
+    moved = 0
+    if merged is not None:
+        moved = db.execute(
+            update(Subscription).where(Subscription.topic_id == merged.id).values(topic_id=topic_id)
+        ).rowcount
+        db.execute(update(TopicAlias).where(TopicAlias.topic_id == merged.id).values(topic_id=topic_id))
+        db.query(Topic).filter(Topic.id == merged.id).delete(synchronize_session=False)
+        logger.info(f"Merged topic {merged.id} ({merged.key}) into {topic_id}, moving {moved} subscriptions")
+
+    db.merge(TopicAlias(key=key, topic_id=topic_id))
+    return moved
@@ -0,0 +1,228 @@
+"""
+In-memory topic suggestions for the subscribe form.
+
+Every word suffix of each topic's key and aliases ("machine learning" and
+"learning") is kept in a sorted list, so the topics matching a prefix are
+one contiguous slice found with two bisections. Matches are ranked by
+subscriber count, where only active subscriptions of confirmed users
+count. Answers never touch the database: the index is loaded with one
+query, subscriptions, edits, deletions, imports and topic merges made
+through this process update it as they happen, and a periodic reload picks
+up other workers' changes, pauses and confirmations.
+"""
+
+import bisect
+import heapq
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Select, func
+from sqlalchemy.orm import Query, Session
+
+from app.core.config import settings
+from app.core.topics import normalize_topic
+from app.db.models import Subscription, Topic, TopicAlias, User
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Sorts after any character a normalized key can contain, closing a prefix's range
+_PREFIX_END = chr(0x10FFFF)
+
+
+def _suffixes(key: str) -> Iterable[str]:
+    """The key and each of its trailing runs of words."""
+    words = key.split(" ")
+    return (" ".join(words[n:]) for n in range(len(words)))
+
+
+def counted_subscribers(db: Session, subscription_ids: Optional[Union[Sequence[int], Select]] = None) -> Query:
+    """
+    (topic id, subscribers) of each topic, counting active subscriptions of confirmed users.
+
+    Args:
+        db: Database session
+        subscription_ids: Only count these subscriptions, as ids or a select of them
+
+    Returns:
+        Query grouped by topic id
+    """
+    query = db.query(
+        Subscription.topic_id, func.count(Subscription.id).label("subscribers")
+    ).join(User, User.id == Subscription.user_id).filter(
+        User.email_confirmed == 1,
+        Subscription.paused_until == None  # noqa: E711
+    )
+    if subscription_ids is not None:
+        query = query.filter(Subscription.id.in_(subscription_ids))
+    return query.group_by(Subscription.topic_id)
+
+
+class TopicSuggestions:
+    """Thread-safe prefix index of topics weighted by subscriber count."""
+
+    def __init__(self, refresh_seconds: float = 300, max_cached: int = 1024, clock=time.monotonic):
+        """
+        Initialize an empty index.
+
+        Args:
+            refresh_seconds: Age after which the index is reloaded from the database
+            max_cached: Answers kept for repeated queries until the index changes
+            clock: Monotonic time source, injectable for tests
+        """
+        self.refresh_seconds = refresh_seconds
+        self.max_cached = max_cached
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._keys: List[str] = []
+        self._topic_ids: List[int] = []  # Parallel to _keys
+        self._names: Dict[int, str] = {}
+        self._counts: Dict[int, int] = {}
+        self._topic_keys: Dict[int, List[str]] = {}  # Keys each topic is indexed under
+        self._cache: Dict[Tuple[str, int], List[Dict]] = {}
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    @property
+    def stale(self) -> bool:
+        return not self.loaded or self._clock() - self.loaded_at >= self.refresh_seconds
+
+    def load(self, topics: Iterable[Tuple[int, str, int]], aliases: Iterable[Tuple[str, int]] = ()) -> None:
+        """
+        Replace the index.
+
+        Args:
+            topics: (topic id, name, subscriber count) of every topic
+            aliases: (key, topic id) of further keys that resolve to a topic
+        """
+        names, counts, topic_keys = {}, {}, {}
+        for topic_id, name, count in topics:
+            names[topic_id], counts[topic_id] = name, count
+            topic_keys[topic_id] = list(_suffixes(normalize_topic(name)))
+        for key, topic_id in aliases:
+            if topic_id in names:
+                topic_keys[topic_id].extend(_suffixes(key))
+        entries = sorted({(key, topic_id) for topic_id, keys in topic_keys.items() for key in keys})
+
+        with self._lock:
+            self._keys = [key for key, _ in entries]
+            self._topic_ids = [topic_id for _, topic_id in entries]
+            self._names, self._counts, self._topic_keys = names, counts, topic_keys
+            self._cache = {}
+            self.loaded_at = self._clock()
+
+    def reload(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        """Load every topic with its subscriber count from the database; concurrent reloads are skipped."""
+        if not self._reload_lock.acquire(blocking=False):
+            return
+        db = session_factory()
+        try:
+            subscribers = counted_subscribers(db).subquery()
+            topics = db.query(Topic.id, Topic.name, func.coalesce(subscribers.c.subscribers, 0)).outerjoin(
+                subscribers, subscribers.c.topic_id == Topic.id
+            ).all()
+            aliases = db.query(TopicAlias.key, TopicAlias.topic_id).all()
+            self.load(topics, aliases)
+            logger.info(f"Loaded {len(topics)} topics into the suggestion index")
+        except Exception as e:
+            logger.error(f"Error loading topic suggestions: {str(e)}")
+        finally:
+            db.close()
+            self._reload_lock.release()
+
+    def subscribed(self, topic_id: Optional[int], name: str, count: int = 1) -> None:
+        """Count new subscribers of a topic, adding the topic if the index doesn't have it yet."""
+        if topic_id is None:
+            return
+        with self._lock:
+            if topic_id not in self._names:
+                self._names[topic_id], self._counts[topic_id] = name, 0
+                self._topic_keys[topic_id] = list(_suffixes(normalize_topic(name)))
+                for key in self._topic_keys[topic_id]:
+                    at = bisect.bisect_left(self._keys, key)
+                    self._keys.insert(at, key)
+                    self._topic_ids.insert(at, topic_id)
+            self._counts[topic_id] += count
+            self._invalidate(topic_id)
+
+    def unsubscribed(self, topic_id: Optional[int], count: int = 1) -> None:
+        """Stop counting subscribers of a topic; the topic stays indexed, hidden once it has none."""
+        with self._lock:
+            if topic_id not in self._counts:
+                return
+            self._counts[topic_id] = max(0, self._counts[topic_id] - count)
+            self._invalidate(topic_id)
+
+    def merged(self, topic_id: int, alias: str) -> None:
+        """
+        Fold an alias into a topic, as add_topic_alias does in the database.
+
+        A topic of the alias's own key is removed, its subscribers and keys
+        going to the kept topic; otherwise the alias becomes a further key.
+        """
+        key = normalize_topic(alias)
+        with self._lock:
+            if topic_id not in self._names or not key:
+                return
+            merged_id = next(
+                (other for other, keys in self._topic_keys.items() if keys[0] == key and other != topic_id), None
+            )
+            if merged_id is None:
+                self._topic_keys[topic_id].extend(_suffixes(key))
+            else:
+                self._topic_keys[topic_id].extend(self._topic_keys.pop(merged_id))
+                self._counts[topic_id] += self._counts.pop(merged_id)
+                del self._names[merged_id]
+            entries = sorted({(indexed_key, indexed) for indexed, keys in self._topic_keys.items() for indexed_key in keys})
+            self._keys = [indexed_key for indexed_key, _ in entries]
+            self._topic_ids = [indexed for _, indexed in entries]
+            self._cache = {}
+
+    def _invalidate(self, topic_id: int) -> None:
+        """Drop cached answers a change to one topic can affect; the lock must be held."""
+        prefixes = {key[:n] for key in self._topic_keys[topic_id] for n in range(1, len(key) + 1)}
+        for cached in [cached for cached in self._cache if cached[0] in prefixes]:
+            del self._cache[cached]
+
+    def suggest(self, query: str, limit: int = 8) -> List[Dict]:
+        """
+        Topics with a word starting with the query, most subscribed first.
+
+        Args:
+            query: What has been typed so far
+            limit: Most suggestions to return
+
+        Returns:
+            [{"topic": name, "subscribers": count}], topics without subscribers left out
+        """
+        prefix = normalize_topic(query)
+        if not prefix:
+            return []
+        with self._lock:
+            cached = self._cache.get((prefix, limit))
+            if cached is not None:
+                return cached
+
+            start = bisect.bisect_left(self._keys, prefix)
+            end = bisect.bisect_left(self._keys, prefix + _PREFIX_END, lo=start)
+            counts = self._counts
+            matches = {topic_id for topic_id in self._topic_ids[start:end] if counts[topic_id] > 0}
+            best = heapq.nsmallest(limit, matches, key=lambda topic_id: (-counts[topic_id], self._names[topic_id]))
+            suggestions = [{"topic": self._names[topic_id], "subscribers": counts[topic_id]} for topic_id in best]
+
+            if len(self._cache) >= self.max_cached:
+                self._cache.clear()
+            self._cache[(prefix, limit)] = suggestions
+            return suggestions
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+topic_suggestions = TopicSuggestions(refresh_seconds=settings.TOPIC_SUGGEST_REFRESH_SECONDS)
@@ -0,0 +1,59 @@
+/**
+ * Topic Suggestions for LearnByEmail
+ *
+ * Offers existing topics, most subscribed first, while a topic is typed into
+ * the subscription form, so subscribers join an existing topic instead of
+ * creating a near-duplicate.
+ */
+
+document.addEventListener('DOMContentLoaded', function() {
+    const topicInput = document.getElementById('topic');
+    const suggestionList = document.getElementById('topic-suggestions');
+    if (!topicInput || !suggestionList) {
+        return;
+    }
+
+    let debounceTimer = null;
+    let lastQuery = '';
+
+    function showSuggestions(suggestions) {
+        suggestionList.innerHTML = '';
+        suggestions.forEach(function(suggestion) {
+            const option = document.createElement('option');
+            option.value = suggestion.topic;
+            option.label = suggestion.subscribers + ' subscriber' + (suggestion.subscribers === 1 ? '' : 's');
+            suggestionList.appendChild(option);
+        });
+    }
+
+    function fetchSuggestions() {
+        const query = topicInput.value.trim();
+        if (query === lastQuery) {
+            return;
+        }
+        lastQuery = query;
+        if (query.length < 2) {
+            showSuggestions([]);
+            return;
+        }
+
+        fetch('/api/v1/topics/suggest?q=' + encodeURIComponent(query))
+            .then(function(response) {
+                return response.ok ? response.json() : [];
+            })
+            .then(function(suggestions) {
+                // Ignore answers for text that has since changed
+                if (topicInput.value.trim() === query) {
+                    showSuggestions(suggestions);
+                }
+            })
+            .catch(function(error) {
+                console.warn('Topic suggestions failed:', error);
+            });
+    }
+
+    topicInput.addEventListener('input', function() {
+        clearTimeout(debounceTimer);
+        debounceTimer = setTimeout(fetchSuggestions, 150);
+    });
+});
@@ -0,0 +1,195 @@
+"""
+Dashboard benchmark for users with hundreds of subscriptions.
+
+Seeds users with --subscriptions subscriptions and --history lessons each,
+then measures:
+
+* loading a user's subscriptions with lesson counts, from the counter
+  columns on the subscriptions, as one grouped query over the history, and
+  as one count query per subscription (what showing the counts through
+  lazy-loaded ``email_history`` amounts to);
+* resolving subscription timezones through the memoized ``get_timezone``
+  versus calling ``pytz.timezone`` per subscription;
+* GET /dashboard end to end against the in-process app, with the number of
+  queries per render.
+
+Usage:
+    python benchmarks/dashboard_render.py [--users 5] [--subscriptions 300] [--history 20] [--renders 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TIMEZONES = ["UTC", "America/New_York", "Europe/London", "Asia/Kolkata", "Australia/Sydney", "America/Los_Angeles"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--subscriptions", type=int, default=300, help="Subscriptions per user")
+    parser.add_argument("--history", type=int, default=20, help="Lessons per subscription")
+    parser.add_argument("--renders", type=int, default=50)
+    return parser.parse_args()
+
+
+def seed(users: int, subscriptions: int, history: int):
+    """Create users with many subscriptions and lesson history; returns (user id, token) pairs."""
+    from app.core.security import create_access_token
+    from app.db.models import Base, User, Subscription, EmailHistory
+    from app.db.session import SessionLocal, engine
+    from app.services.lesson_store import store_lesson_content
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    accounts = []
+    now = datetime.utcnow()
+    try:
+        lesson_hash = store_lesson_content(db, "<p>lesson</p>")
+        for i in range(users):
+            email = f"dashboard{i}@example.com"
+            user = User(email=email, password_hash="", email_confirmed=1)
+            db.add(user)
+            db.flush()
+            for n in range(subscriptions):
+                subscription = Subscription(
+                    email=email, topic=f"Topic {n}", preferred_time=dtime(9, 0),
+                    timezone=TIMEZONES[n % len(TIMEZONES)], user_id=user.id,
+                    last_sent=now - timedelta(days=1) if history else None,
+                    lesson_count=history
+                )
+                db.add(subscription)
+                db.flush()
+                db.add_all([
+                    EmailHistory(subscription_id=subscription.id, content_hash=lesson_hash,
+                                 sent_at=now - timedelta(days=history - d))
+                    for d in range(history)
+                ])
+            accounts.append((user.id, create_access_token(email)))
+        db.commit()
+    finally:
+        db.close()
+    return accounts
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000, 2)
+
+    return f"p50_ms={pct(50)} p95_ms={pct(95)}"
+
+
+async def bench_queries(accounts, repeats: int):
+    """Grouped lesson counts versus a count query per subscription."""
+    from sqlalchemy import func, select
+    from app.db.models import Subscription, EmailHistory
+    from app.db.session import AsyncSessionLocal
+
+    counters, grouped, per_row = [], [], []
+    async with AsyncSessionLocal() as db:
+        for r in range(repeats):
+            user_id = accounts[r % len(accounts)][0]
+
+            started = time.perf_counter()
+            (await db.execute(
+                select(Subscription).where(Subscription.user_id == user_id)
+            )).scalars().all()
+            counters.append(time.perf_counter() - started)
+            db.expunge_all()
+
+            started = time.perf_counter()
+            (await db.execute(
+                select(Subscription, func.count(EmailHistory.id), func.max(EmailHistory.sent_at))
+                .outerjoin(EmailHistory, EmailHistory.subscription_id == Subscription.id)
+                .where(Subscription.user_id == user_id)
+                .group_by(Subscription.id)
+            )).all()
+            grouped.append(time.perf_counter() - started)
+            db.expunge_all()
+
+            started = time.perf_counter()
+            subscriptions = (await db.execute(
+                select(Subscription).where(Subscription.user_id == user_id)
+            )).scalars().all()
+            for subscription in subscriptions:
+                (await db.execute(
+                    select(func.count(EmailHistory.id), func.max(EmailHistory.sent_at))
+                    .where(EmailHistory.subscription_id == subscription.id)
+                )).one()
+            per_row.append(time.perf_counter() - started)
+            db.expunge_all()
+
+    print(f"lesson counts, counter columns:  {summarize(counters)}")
+    print(f"lesson counts, grouped query:    {summarize(grouped)}")
+    print(f"lesson counts, query per row:    {summarize(per_row)}")
+
+
+def bench_timezones(lookups: int):
+    """Memoized timezone table versus pytz.timezone per subscription."""
+    import pytz
+    from app.services.scheduler.dispatcher import get_timezone
+
+    for label, lookup in (("pytz.timezone", pytz.timezone), ("get_timezone (memoized)", get_timezone)):
+        started = time.perf_counter()
+        for n in range(lookups):
+            lookup(TIMEZONES[n % len(TIMEZONES)])
+        elapsed = time.perf_counter() - started
+        print(f"timezone lookups, {label}: {round(elapsed / lookups * 1e6, 2)} us/lookup")
+
+
+async def bench_dashboard(accounts, renders: int):
+    """GET /dashboard against the in-process app."""
+    import httpx
+    from sqlalchemy import event
+    from app.db.session import async_engine
+    from app.main import app
+
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    latencies, errors = [], 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # Warm up the user cache and connection pool
+        await client.get("/dashboard", cookies={"access_token": accounts[0][1]})
+        event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+        for r in range(renders):
+            started = time.perf_counter()
+            response = await client.get("/dashboard", cookies={"access_token": accounts[r % len(accounts)][1]})
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    print(f"GET /dashboard: {summarize(latencies)} errors={errors} "
+          f"queries_per_render={round(counter['queries'] / renders, 1)}")
+
+
+async def main_async(args):
+    accounts = seed(args.users, args.subscriptions, args.history)
+    print(f"{args.users} users x {args.subscriptions} subscriptions x {args.history} lessons")
+    await bench_queries(accounts, args.renders)
+    bench_timezones(args.subscriptions * args.renders)
+    await bench_dashboard(accounts, args.renders)
+
+
+def main():
+    args = parse_args()
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'dashboard.db')}")
+    os.environ.setdefault("API_SECRET_KEY", "benchmark-secret-key-that-is-long-enough-0123456789")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
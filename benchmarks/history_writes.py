@@ -0,0 +1,116 @@
+"""
+Throughput benchmark for recording scheduled sends.
+
+Records --sends delivered lessons, each with its delivery claim already
+committed like the sender does, into fresh database files: once written
+through (history row, counters and claim committed per send, as before the
+write buffer) and once through LessonWriteBuffer for each --batch size.
+Prints sends recorded per second and commits issued for each run.
+
+Usage:
+    python benchmarks/history_writes.py [--sends 5000] [--subscriptions 1000] [--batch 10 100 500]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, User, Subscription, DeliveryClaim
+from app.db.session import create_db_engine
+from app.services.delivery_claims import complete_delivery
+from app.services.lesson_store import record_lesson
+from app.services.scheduler.write_buffer import LessonWriteBuffer, PendingSend
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sends", type=int, default=5000, help="Lessons recorded")
+    parser.add_argument("--subscriptions", type=int, default=1000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[10, 100, 500], help="Buffer batch sizes to compare")
+    return parser.parse_args()
+
+
+def populate(Session, sends: int, subscriptions: int) -> list:
+    """Create subscriptions and one committed claim per send; returns the pending sends."""
+    db = Session()
+    user = User(email="writes@example.com", password_hash="", email_confirmed=1)
+    db.add(user)
+    db.flush()
+    rows = [
+        Subscription(email=user.email, topic=f"Topic {i}", preferred_time=dtime(9, 0), timezone="UTC", user_id=user.id)
+        for i in range(subscriptions)
+    ]
+    db.add_all(rows)
+    db.flush()
+    claims = [
+        DeliveryClaim(subscription_id=rows[n % subscriptions].id, delivery_date=date.fromordinal(730000 + n // subscriptions))
+        for n in range(sends)
+    ]
+    db.add_all(claims)
+    db.commit()
+
+    now = datetime.utcnow()
+    pending = [
+        PendingSend(subscription_id=claim.subscription_id, claim_id=claim.id, body=f"<p>Lesson {n % 50}</p>" * 100,
+                    scheduled_at=now, started_at=now, generated_at=now, sent_at=now)
+        for n, claim in enumerate(claims)
+    ]
+    db.close()
+    return pending
+
+
+def run(path: str, args, batch_size: int) -> dict:
+    """Record every send through one strategy; returns its statistics."""
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    sends = populate(Session, args.sends, args.subscriptions)
+
+    commits = [0]
+    event.listen(engine, "commit", lambda conn: commits.__setitem__(0, commits[0] + 1))
+
+    started = time.perf_counter()
+    if batch_size <= 1:
+        db = Session()
+        for send in sends:
+            record_lesson(db, send.subscription_id, send.body, sent_at=send.sent_at)
+            complete_delivery(db, DeliveryClaim(id=send.claim_id), sent_at=send.sent_at)
+            db.commit()
+        db.close()
+    else:
+        # Sends arrive faster than the flush timer, so only full batches are written
+        buffer = LessonWriteBuffer(batch_size=batch_size, flush_ms=60000, session_factory=Session)
+
+        async def record_all():
+            for send in sends:
+                buffer.add(send)
+            buffer.flush()
+
+        asyncio.run(record_all())
+    seconds = time.perf_counter() - started
+    engine.dispose()
+    return {"sends_per_s": round(len(sends) / seconds), "commits": commits[0]}
+
+
+def main():
+    args = parse_args()
+    tmp = tempfile.mkdtemp()
+    print(f"{args.sends} sends to {args.subscriptions} subscriptions")
+    for batch_size in [1] + args.batch:
+        result = run(os.path.join(tmp, f"batch{batch_size}.db"), args, batch_size)
+        label = "write-through" if batch_size <= 1 else f"batch {batch_size}"
+        print(f"{label}: " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Storage and throughput benchmark for the lesson content store.
+
+Sends --distinct synthetic lessons to cohorts of subscribers, --rows history
+rows in total, into two fresh database files: one with every body inline in
+email_history (how lessons were stored before the content store) and one
+through app.services.lesson_store. Prints for both:
+
+* database file size and bytes spent on lesson bodies;
+* history rows written per second, one commit per send like the sender;
+* history rows read back per second with their content, per subscription
+  like the sender's continuity query.
+
+Also prints compression ratio and speed for each available codec.
+
+Usage:
+    python benchmarks/lesson_storage.py [--rows 20000] [--distinct 200] [--subscriptions 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.compression import ZLIB, ZSTD, ZSTD_AVAILABLE, compress, decompress
+from app.db.models import Base, User, Subscription, EmailHistory
+from app.db.session import create_db_engine
+from app.services.lesson_store import record_lesson
+
+WORDS = (
+    "the of and to in is that for it as was with be by on not he this are or his from at which but have an "
+    "they you were her she there been one all we their has would when if so what up out them into some time "
+    "energy cell theory empire river equation language market signal orbit protein memory algorithm poem"
+).split()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000, help="History rows (lessons sent)")
+    parser.add_argument("--distinct", type=int, default=200, help="Distinct lesson bodies")
+    parser.add_argument("--subscriptions", type=int, default=500)
+    return parser.parse_args()
+
+
+def make_lesson(rng: random.Random, n: int) -> str:
+    """A formatted lesson of roughly 6 KB, shaped like the generator's HTML."""
+    paragraphs = "".join(
+        f"<p>{' '.join(rng.choice(WORDS) for _ in range(80))}.</p>\n"
+        for _ in range(10)
+    )
+    return (
+        f'<h2 style="color: #2c3e50;">Lesson {n}: {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}</h2>\n'
+        f"{paragraphs}"
+        f'<div style="background-color: #f8f9fa; padding: 15px;"><strong>Key takeaway:</strong> '
+        f"{' '.join(rng.choice(WORDS) for _ in range(30))}.</div>"
+    )
+
+
+def populate(engine, subscriptions: int) -> list:
+    """Create the schema and the subscriptions lessons are sent to; returns their ids."""
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user = User(email="storage@example.com", password_hash="", email_confirmed=1)
+    db.add(user)
+    db.flush()
+    rows = [
+        Subscription(email=user.email, topic=f"Topic {i}", preferred_time=dtime(9, 0), timezone="UTC", user_id=user.id)
+        for i in range(subscriptions)
+    ]
+    db.add_all(rows)
+    db.commit()
+    ids = [s.id for s in rows]
+    db.close()
+    return ids
+
+
+def run(path: str, lessons: list, sends: list, subscription_ids: list, stored: bool) -> dict:
+    """Write then read the history through one layout; returns its statistics."""
+    engine = create_db_engine(f"sqlite:///{path}")
+    populate(engine, len(subscription_ids))
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    started = time.perf_counter()
+    for subscription_id, lesson in sends:
+        if stored:
+            record_lesson(db, subscription_id, lessons[lesson])
+        else:
+            db.add(EmailHistory(subscription_id=subscription_id, inline_content=lessons[lesson]))
+        db.commit()
+    write_seconds = time.perf_counter() - started
+
+    body_bytes = db.execute(text(
+        "SELECT COALESCE(SUM(LENGTH(data)), 0) FROM lesson_contents" if stored
+        else "SELECT COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) FROM email_history"
+    )).scalar()
+    db.close()
+
+    db = Session()
+    started = time.perf_counter()
+    read = 0
+    for subscription_id in subscription_ids:
+        history = db.query(EmailHistory).filter(
+            EmailHistory.subscription_id == subscription_id
+        ).order_by(EmailHistory.sent_at.asc()).all()
+        read += sum(1 for h in history if h.content)
+        db.expunge_all()
+    read_seconds = time.perf_counter() - started
+    db.close()
+
+    with engine.connect() as conn:
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    engine.dispose()
+    return {
+        "file_kb": os.path.getsize(path) // 1024,
+        "lesson_kb": body_bytes // 1024,
+        "writes_per_s": round(len(sends) / write_seconds),
+        "reads_per_s": round(read / read_seconds),
+    }
+
+
+def bench_codecs(lessons: list) -> None:
+    """Compression ratio and speed per codec over the distinct lessons."""
+    raw = sum(len(lesson.encode("utf-8")) for lesson in lessons)
+    for codec in (ZLIB, ZSTD):
+        if codec == ZSTD and not ZSTD_AVAILABLE:
+            print("codec zstd: not installed (pip install zstandard)")
+            continue
+        started = time.perf_counter()
+        blobs = [compress(lesson, codec) for lesson in lessons]
+        compress_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        for blob in blobs:
+            decompress(*blob)
+        decompress_seconds = time.perf_counter() - started
+        stored = sum(len(data) for _, data in blobs)
+        print(f"codec {codec}: ratio={round(raw / stored, 2)} "
+              f"compress_mb_s={round(raw / compress_seconds / 1e6, 1)} "
+              f"decompress_mb_s={round(raw / decompress_seconds / 1e6, 1)}")
+
+
+def main():
+    args = parse_args()
+    rng = random.Random(42)
+    lessons = [make_lesson(rng, n) for n in range(args.distinct)]
+    # Each lesson goes to a cohort; a subscription receives several different lessons
+    sends = [(n % args.subscriptions + 1, n % args.distinct) for n in range(args.rows)]
+    subscription_ids = list(range(1, args.subscriptions + 1))
+
+    tmp = tempfile.mkdtemp()
+    print(f"{args.rows} lessons sent, {args.distinct} distinct, to {args.subscriptions} subscriptions")
+    for label, stored in (("inline bodies", False), ("content store", True)):
+        result = run(os.path.join(tmp, f"{'store' if stored else 'inline'}.db"), lessons, sends, subscription_ids, stored)
+        print(f"{label}: " + " ".join(f"{k}={v}" for k, v in result.items()))
+    bench_codecs(lessons)
+
+
+if __name__ == "__main__":
+    main()
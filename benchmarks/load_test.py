@@ -0,0 +1,148 @@
+"""
+Concurrent load test for the authenticated read paths.
+
+Seeds users with subscriptions and lesson history, then keeps --concurrency
+clients busy for --seconds with a mix of GET /api/v1/auth/me,
+GET /api/v1/subscriptions/ and GET /api/v1/subscriptions/{id}/history,
+and prints throughput and latency percentiles.
+
+By default the app runs in-process on a throwaway SQLite database, so the
+event loop serving requests is the one under test: a handler that blocks on
+a synchronous query stalls every other in-flight request. Use --base-url to
+point at a running server instead; its DATABASE_URL must match this
+process's so the seeded users exist.
+
+Usage:
+    python benchmarks/load_test.py [--seconds 10] [--concurrency 50] [--users 50]
+    python benchmarks/load_test.py --base-url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--history", type=int, default=30, help="Lessons per subscription")
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    return parser.parse_args()
+
+
+def seed(users: int, history: int):
+    """Create confirmed users with three subscriptions each and return (tokens, subscription ids)."""
+    from app.core.security import create_access_token
+    from app.db.models import Base, User, Subscription, EmailHistory
+    from app.db.session import SessionLocal, engine
+    from app.services.lesson_store import store_lesson_content
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    tokens, subscription_ids = [], {}
+    try:
+        lesson_hash = store_lesson_content(db, "<p>lesson</p>" * 200)
+        for i in range(users):
+            email = f"loadtest{i}@example.com"
+            user = db.query(User).filter(User.email == email).first()
+            if not user:
+                user = User(email=email, password_hash="", email_confirmed=1)
+                db.add(user)
+                db.flush()
+                for topic in ("History", "Physics", "Poetry"):
+                    subscription = Subscription(
+                        email=email, topic=topic, preferred_time=dtime(9, 0), timezone="UTC", user_id=user.id
+                    )
+                    db.add(subscription)
+                    db.flush()
+                    db.add_all([
+                        EmailHistory(subscription_id=subscription.id, content_hash=lesson_hash)
+                        for _ in range(history)
+                    ])
+            token = create_access_token(email)
+            tokens.append(token)
+            subscription_ids[token] = [s.id for s in db.query(Subscription.id).filter(Subscription.user_id == user.id)]
+        db.commit()
+    finally:
+        db.close()
+    return tokens, subscription_ids
+
+
+async def run(client, tokens, subscription_ids, seconds: float, concurrency: int) -> dict:
+    """Issue requests from concurrent workers until the time is up."""
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker(seed_value: int):
+        nonlocal errors
+        rng = random.Random(seed_value)
+        while time.perf_counter() < deadline:
+            token = rng.choice(tokens)
+            headers = {"Authorization": f"Bearer {token}"}
+            path = rng.choice([
+                "/api/v1/auth/me",
+                "/api/v1/subscriptions/",
+                f"/api/v1/subscriptions/{rng.choice(subscription_ids[token])}/history",
+            ])
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000, 1) if latencies else None
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": round(len(latencies) / seconds, 1),
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+async def main_async(args):
+    import httpx
+
+    tokens, subscription_ids = seed(args.users, args.history)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=30)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=30)
+
+    async with client:
+        # Warm up connections and caches before measuring
+        await run(client, tokens, subscription_ids, min(1.0, args.seconds), args.concurrency)
+        result = await run(client, tokens, subscription_ids, args.seconds, args.concurrency)
+
+    print(f"concurrency={args.concurrency} " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+
+def main():
+    args = parse_args()
+    if not args.base_url:
+        tmp = tempfile.mkdtemp()
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'loadtest.db')}")
+        os.environ.setdefault("API_SECRET_KEY", "loadtest-secret-key-that-is-long-enough-0123456789")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Read/write concurrency benchmark for the SQLite engine profile.
+
+Runs a scheduler-like writer (insert a history row and bump last_sent, one
+commit per send) alongside dashboard-like readers against two fresh database
+files: one with a plain engine (rollback journal, driver defaults) and one
+built by app.db.session.create_db_engine (WAL, synchronous=NORMAL,
+busy_timeout, cache and mmap). Prints throughput, read latency and lock errors
+for both.
+
+Usage:
+    python benchmarks/sqlite_concurrency.py [--seconds 10] [--readers 8] [--subscriptions 2000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, User, Subscription, EmailHistory
+from app.db.session import create_db_engine
+from app.services.lesson_store import record_lesson
+
+
+def populate(engine, subscriptions: int) -> None:
+    """Create the schema and one user per ten subscriptions."""
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    users = [User(email=f"user{i}@example.com", password_hash="", email_confirmed=1)
+             for i in range(subscriptions // 10 + 1)]
+    db.add_all(users)
+    db.flush()
+    db.add_all([
+        Subscription(
+            email=users[i // 10].email,
+            topic=f"Topic {i}",
+            preferred_time=dtime(9, 0),
+            timezone="UTC",
+            user_id=users[i // 10].id
+        )
+        for i in range(subscriptions)
+    ])
+    db.commit()
+    db.close()
+
+
+def run(engine, seconds: float, readers: int, subscriptions: int) -> dict:
+    """Run the writer and readers for a fixed time and collect statistics."""
+    Session = sessionmaker(bind=engine)
+    stop = threading.Event()
+    lock = threading.Lock()
+    stats = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0, "latencies": []}
+    user_count = subscriptions // 10 + 1
+
+    def writer():
+        db = Session()
+        n = 0
+        while not stop.is_set():
+            subscription_id = n % subscriptions + 1
+            try:
+                record_lesson(db, subscription_id, f"<p>lesson {n}</p>" + "x" * 2000)
+                time.sleep(0.002)  # Time spent between the write and the commit
+                db.commit()
+                with lock:
+                    stats["writes"] += 1
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    stats["write_errors"] += 1
+            n += 1
+        db.close()
+
+    def reader(offset: int):
+        db = Session()
+        n = offset
+        while not stop.is_set():
+            user_id = n % user_count + 1
+            started = time.perf_counter()
+            try:
+                subs = db.query(Subscription).filter(Subscription.user_id == user_id).all()
+                for sub in subs:
+                    db.query(EmailHistory.id).filter(EmailHistory.subscription_id == sub.id).count()
+                db.rollback()  # End the read transaction like a finished request
+                elapsed = time.perf_counter() - started
+                with lock:
+                    stats["reads"] += 1
+                    stats["latencies"].append(elapsed)
+            except OperationalError:
+                db.rollback()
+                with lock:
+                    stats["read_errors"] += 1
+            n += 7
+        db.close()
+
+    threads = [threading.Thread(target=writer)] + [
+        threading.Thread(target=reader, args=(i,)) for i in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(stats.pop("latencies")) or [0.0]
+    stats["reads_per_second"] = round(stats["reads"] / seconds, 1)
+    stats["writes_per_second"] = round(stats["writes"] / seconds, 1)
+    stats["read_p50_ms"] = round(latencies[len(latencies) // 2] * 1000, 2)
+    stats["read_p95_ms"] = round(latencies[int(len(latencies) * 0.95)] * 1000, 2)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--subscriptions", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        profiles = {
+            "default": lambda url: create_engine(url, connect_args={"check_same_thread": False}),
+            "tuned": create_db_engine,
+        }
+        for name, make_engine in profiles.items():
+            engine = make_engine(f"sqlite:///{os.path.join(tmp, name + '.db')}")
+            populate(engine, args.subscriptions)
+            with engine.connect() as conn:
+                mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            result = run(engine, args.seconds, args.readers, args.subscriptions)
+            engine.dispose()
+            print(f"{name:8} journal={mode:7} " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Latency benchmark for the POST /subscribe form handler.
+
+Seeds users that already have a few subscriptions, then submits --requests
+new subscriptions from --concurrency clients against the in-process app and
+prints latency percentiles and the number of queries the handler's session
+issued per submission.
+
+By default the form is submitted by signed-in users (redirect to the
+dashboard). --anonymous submits it signed out for existing, partly
+unconfirmed addresses, which takes the account lookup and flash message
+paths and renders the home page.
+
+The immediate welcome lesson is not sent: it calls the content generator
+and would dominate the numbers. Rate limiting is disabled.
+
+Usage:
+    python benchmarks/subscribe_latency.py [--requests 500] [--concurrency 10] [--users 100] [--anonymous]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import time as dtime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--topics", type=int, default=5, help="Existing subscriptions per user")
+    parser.add_argument("--anonymous", action="store_true", help="Submit the form signed out")
+    return parser.parse_args()
+
+
+def seed(users: int, topics: int):
+    """Create users with existing subscriptions; every third one is unconfirmed."""
+    from app.core.security import create_access_token
+    from app.db.models import Base, User, Subscription
+    from app.db.session import SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    accounts = []
+    try:
+        for i in range(users):
+            email = f"subscriber{i}@example.com"
+            user = User(email=email, password_hash="", email_confirmed=0 if i % 3 == 0 else 1)
+            db.add(user)
+            db.flush()
+            db.add_all([
+                Subscription(email=email, topic=f"Existing {t}", preferred_time=dtime(9, 0),
+                             timezone="UTC", user_id=user.id)
+                for t in range(topics)
+            ])
+            accounts.append((email, create_access_token(email)))
+        db.commit()
+    finally:
+        db.close()
+    return accounts
+
+
+def count_queries():
+    """Count statements run through the async engine, i.e. by the handler's own session."""
+    from sqlalchemy import event
+    from app.db.session import async_engine
+
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return counter
+
+
+async def run(client, accounts, requests: int, concurrency: int, anonymous: bool) -> dict:
+    from app.core.csrf import generate_csrf_token
+
+    latencies, errors = [], 0
+    queue = asyncio.Queue()
+    for n in range(requests):
+        queue.put_nowait(n)
+
+    async def worker():
+        nonlocal errors
+        while not queue.empty():
+            n = queue.get_nowait()
+            email, token = accounts[n % len(accounts)]
+            cookies = {} if anonymous else {"access_token": token}
+            form = {
+                "email": email,
+                "topic": f"Benchmark Topic {n}",
+                "preferred_time": "08:30",
+                "timezone": "UTC",
+                "difficulty": "medium",
+                "csrf_token": generate_csrf_token(),
+            }
+            started = time.perf_counter()
+            response = await client.post("/subscribe", data=form, cookies=cookies)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    latencies.sort()
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000, 1) if latencies else None
+
+    return {"requests": len(latencies), "errors": errors, "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99)}
+
+
+async def main_async(args):
+    import httpx
+    import app.services.email_sender as email_sender
+    from app.core.rate_limit import limiter
+    from app.main import app
+
+    async def skip_welcome_email(subscription_id, scheduled_at=None):
+        return False
+
+    email_sender.send_educational_email_task = skip_welcome_email
+    limiter.enabled = False
+
+    accounts = seed(args.users, args.topics)
+    counter = count_queries()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", follow_redirects=False) as client:
+        result = await run(client, accounts, args.requests, args.concurrency, args.anonymous)
+
+    result["queries_per_request"] = round(counter["queries"] / max(1, result["requests"]), 1)
+    mode = "anonymous" if args.anonymous else "signed-in"
+    print(f"mode={mode} concurrency={args.concurrency} " + " ".join(f"{k}={v}" for k, v in result.items()))
+
+
+def main():
+    args = parse_args()
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tmp, 'subscribe.db')}")
+    os.environ.setdefault("API_SECRET_KEY", "benchmark-secret-key-that-is-long-enough-0123456789")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
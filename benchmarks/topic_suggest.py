@@ -0,0 +1,97 @@
+"""
+Topic suggestion benchmark.
+
+Loads --topics synthetic topics of one to three words, with Zipf-like
+subscriber counts, into the in-memory suggestion index and measures:
+
+* building the index;
+* answering prefixes of one to five characters, with the answer cache
+  cleared before every query (the first keystroke after a change) and
+  with it warm (the same prefix typed again);
+* adding subscribers of new topics to the live index.
+
+The database is not involved; reloading it is a single grouped query.
+
+Usage:
+    python benchmarks/topic_suggest.py [--topics 50000] [--queries 5000]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=5000)
+    return parser.parse_args()
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+
+    def pct(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000, 4)
+
+    return f"p50_ms={pct(50)} p95_ms={pct(95)} p99_ms={pct(99)}"
+
+
+def make_topics(count: int):
+    rng = random.Random(42)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))).capitalize()
+
+    return [
+        (topic_id, " ".join(word() for _ in range(rng.randint(1, 3))), int(1000 / topic_id ** 0.8))
+        for topic_id in range(1, count + 1)
+    ]
+
+
+def main():
+    args = parse_args()
+    os.environ.setdefault("API_SECRET_KEY", "benchmark-secret-key-that-is-long-enough-0123456789")
+    from app.services.topic_suggestions import TopicSuggestions
+
+    topics = make_topics(args.topics)
+    suggestions = TopicSuggestions()
+    started = time.perf_counter()
+    suggestions.load(topics)
+    print(f"{args.topics} topics indexed in {round((time.perf_counter() - started) * 1000)} ms")
+
+    rng = random.Random(7)
+    for length in range(1, 6):
+        names = [name.lower() for _, name, _ in rng.sample(topics, min(args.queries, len(topics)))]
+        queries = [name[:length] for name in names]
+
+        cold = []
+        for query in queries:
+            suggestions._cache.clear()
+            started = time.perf_counter()
+            suggestions.suggest(query)
+            cold.append(time.perf_counter() - started)
+
+        warm = []
+        for query in queries:
+            started = time.perf_counter()
+            suggestions.suggest(query)
+            warm.append(time.perf_counter() - started)
+        print(f"prefix length {length}: cold {summarize(cold)} | cached {summarize(warm)}")
+
+    added = []
+    for topic_id in range(args.topics + 1, args.topics + 1 + min(args.queries, 1000)):
+        started = time.perf_counter()
+        suggestions.subscribed(topic_id, f"New topic {topic_id}")
+        added.append(time.perf_counter() - started)
+    print(f"subscriber of a new topic: {summarize(added)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        # delivery_claims is created by create_all; nothing to alter on a fresh database
+        tables = [row[0] for row in db.execute(text("SELECT name FROM sqlite_master WHERE type='table'")).fetchall()]
+        if 'delivery_claims' not in tables:
+            print("delivery_claims table does not exist yet, it will be created on startup.")
+            return
+
+        # Check which timing columns already exist
+        result = db.execute(text("PRAGMA table_info(delivery_claims)")).fetchall()
+        columns = [row[1] for row in result]
+
+        for column in ('scheduled_at', 'generated_at', 'sent_at'):
+            if column not in columns:
+                print(f"Adding {column} column...")
+                db.execute(text(f"ALTER TABLE delivery_claims ADD COLUMN {column} TIMESTAMP"))
+            else:
+                print(f"{column} column already exists.")
+
+        # The metrics endpoint reads recent sends by completion time
+        print("Creating completed_at index...")
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_delivery_claims_completed_at ON delivery_claims (completed_at)"))
+
+        # Commit the changes
+        db.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to add delivery timing fields...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,48 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# (index name, table, columns) for the queries run on every send, dashboard load and subscribe
+INDEXES = [
+    ("ix_email_history_subscription_sent_at", "email_history", "subscription_id, sent_at"),
+    ("ix_subscriptions_user_id", "subscriptions", "user_id"),
+]
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        for name, table, columns in INDEXES:
+            print(f"Creating index {name} on {table} ({columns})...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+
+        # Refresh planner statistics so the new indexes are picked up
+        print("Analyzing tables...")
+        db.execute(text("ANALYZE"))
+
+        # Commit the changes
+        db.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to add hot path indexes...")
+    run_migration()
+    print("Migration finished.")
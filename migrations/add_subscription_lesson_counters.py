@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.models import EmailHistoryArchive
+from app.services.lesson_store import repair_lesson_counters
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        # Check which counter columns already exist
+        result = db.execute(text("PRAGMA table_info(subscriptions)")).fetchall()
+        columns = [row[1] for row in result]
+
+        if 'lesson_count' not in columns:
+            print("Adding lesson_count column...")
+            db.execute(text("ALTER TABLE subscriptions ADD COLUMN lesson_count INTEGER NOT NULL DEFAULT 0"))
+        else:
+            print("lesson_count column already exists.")
+
+        if 'last_history_id' not in columns:
+            print("Adding last_history_id column...")
+            db.execute(text("ALTER TABLE subscriptions ADD COLUMN last_history_id INTEGER"))
+        else:
+            print("last_history_id column already exists.")
+        db.commit()
+
+        # Archived lessons are counted too; the archive table is otherwise created on startup
+        EmailHistoryArchive.__table__.create(bind=engine, checkfirst=True)
+
+        # Fill in the counters from the history; re-run at any time to repair drift
+        print("Counting lessons...")
+        repaired = repair_lesson_counters(db)
+        print(f"Updated the lesson counters of {repaired} subscriptions.")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to add subscription lesson counters...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        # Check which scheduling columns already exist
+        result = db.execute(text("PRAGMA table_info(subscriptions)")).fetchall()
+        columns = [row[1] for row in result]
+
+        # Add next_send_at column if it doesn't exist
+        if 'next_send_at' not in columns:
+            print("Adding next_send_at column...")
+            db.execute(text("ALTER TABLE subscriptions ADD COLUMN next_send_at TIMESTAMP"))
+            # Left NULL on purpose: the scheduler fills it in for active subscriptions on startup
+        else:
+            print("next_send_at column already exists.")
+
+        # Add paused_until column if it doesn't exist
+        if 'paused_until' not in columns:
+            print("Adding paused_until column...")
+            db.execute(text("ALTER TABLE subscriptions ADD COLUMN paused_until TIMESTAMP"))
+        else:
+            print("paused_until column already exists.")
+
+        # Index both columns so the dispatcher's due/resume queries are range scans
+        print("Creating scheduling indexes...")
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_subscriptions_next_send_at ON subscriptions (next_send_at)"))
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_subscriptions_paused_until ON subscriptions (paused_until)"))
+
+        # Commit the changes
+        db.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to add subscription scheduling fields...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,74 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text, update
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.topics import normalize_topic
+from app.db.models import Subscription, Topic, TopicAlias
+from app.services.topic_catalog import resolve_topics
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+BATCH_SIZE = 1000
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        Topic.__table__.create(bind=engine, checkfirst=True)
+        TopicAlias.__table__.create(bind=engine, checkfirst=True)
+
+        # Check if the column already exists
+        result = db.execute(text("PRAGMA table_info(subscriptions)")).fetchall()
+        columns = [row[1] for row in result]
+
+        if 'topic_id' not in columns:
+            print("Adding topic_id column...")
+            db.execute(text("ALTER TABLE subscriptions ADD COLUMN topic_id INTEGER REFERENCES topics(id)"))
+            db.execute(text("CREATE INDEX IF NOT EXISTS ix_subscriptions_topic_id ON subscriptions (topic_id)"))
+        else:
+            print("topic_id column already exists.")
+        db.commit()
+
+        # Point every subscription without a topic at one, a batch at a time
+        total, last_id = 0, 0
+        while True:
+            batch = db.query(Subscription.id, Subscription.topic).filter(
+                Subscription.topic_id == None,  # noqa: E711
+                Subscription.id > last_id
+            ).order_by(Subscription.id).limit(BATCH_SIZE).all()
+            if not batch:
+                break
+            topic_ids = resolve_topics(db, [row.topic for row in batch])
+            updates = [
+                {"id": row.id, "topic_id": topic_ids[normalize_topic(row.topic)]}
+                for row in batch if normalize_topic(row.topic) in topic_ids
+            ]
+            if updates:
+                db.execute(update(Subscription), updates)
+            db.commit()
+            total += len(updates)
+            last_id = batch[-1].id
+
+        topics = db.query(Topic).count()
+        print(f"Linked {total} subscriptions to {topics} topics.")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to add the topic index...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,70 @@
+import sys
+import os
+from collections import Counter
+from datetime import date, datetime
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.models import Subscription, EmailHistory, EmailHistoryArchive, DeliveryRollup
+from app.services.delivery_rollups import SENT, RollupKey, add_counts
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Provider of backfilled rows; the history doesn't say which one sent a lesson
+BACKFILL_PROVIDER = "unknown"
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        DeliveryRollup.__table__.create(bind=engine, checkfirst=True)
+
+        # Days counted by the sender already are left alone; re-running replaces earlier backfills
+        first_live_day = db.query(func.min(DeliveryRollup.day)).filter(
+            DeliveryRollup.provider != BACKFILL_PROVIDER
+        ).scalar()
+        until = first_live_day or datetime.utcnow().date()
+        print(f"Backfilling sent lessons before {until}...")
+        db.query(DeliveryRollup).filter(DeliveryRollup.provider == BACKFILL_PROVIDER).delete(synchronize_session=False)
+
+        for model in (EmailHistory, EmailHistoryArchive):
+            day = func.date(model.sent_at)
+            groups = db.query(
+                day, Subscription.topic, Subscription.difficulty, func.count(model.id)
+            ).join(
+                Subscription, Subscription.id == model.subscription_id
+            ).filter(
+                model.sent_at != None,  # noqa: E711
+                model.sent_at < datetime.combine(until, datetime.min.time())
+            ).group_by(day, Subscription.topic, Subscription.difficulty).all()
+
+            counts = Counter()
+            for sent_day, topic, difficulty, count in groups:
+                sent_day = sent_day if isinstance(sent_day, date) else date.fromisoformat(str(sent_day))
+                counts[RollupKey(sent_day, topic, difficulty or "medium", BACKFILL_PROVIDER, SENT)] += count
+            add_counts(db, counts)
+            print(f"Counted {sum(counts.values())} lessons from {model.__tablename__} in {len(counts)} rollup rows.")
+
+        db.commit()
+        if first_live_day:
+            print(f"Note: {first_live_day} was only counted from the time the sender started keeping rollups.")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to backfill delivery rollups...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,91 @@
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.db.models import LessonContent
+from app.services.lesson_store import store_lesson_content
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+BATCH_SIZE = 500
+
+def move_batch(db, last_id):
+    """Move the inline bodies of the next batch of history rows into the content store; returns the last id seen, or None when done."""
+    rows = db.execute(
+        text(
+            "SELECT id, content FROM email_history "
+            "WHERE id > :last_id AND content_hash IS NULL AND content IS NOT NULL "
+            "ORDER BY id LIMIT :limit"
+        ),
+        {"last_id": last_id, "limit": BATCH_SIZE}
+    ).fetchall()
+    if not rows:
+        return None
+
+    for row in rows:
+        digest = store_lesson_content(db, row.content)
+        # Existing tables keep the NOT NULL constraint on content, so the inline copy is emptied rather than nulled
+        db.execute(
+            text("UPDATE email_history SET content_hash = :hash, content = '' WHERE id = :id"),
+            {"hash": digest, "id": row.id}
+        )
+    return rows[-1].id
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        print("Creating lesson_contents table...")
+        LessonContent.__table__.create(bind=engine, checkfirst=True)
+
+        # Check if the content_hash column already exists
+        result = db.execute(text("PRAGMA table_info(email_history)")).fetchall()
+        columns = [row[1] for row in result]
+        if 'content_hash' not in columns:
+            print("Adding content_hash column...")
+            db.execute(text("ALTER TABLE email_history ADD COLUMN content_hash VARCHAR(64) REFERENCES lesson_contents (hash)"))
+        else:
+            print("content_hash column already exists.")
+        db.execute(text("CREATE INDEX IF NOT EXISTS ix_email_history_content_hash ON email_history (content_hash)"))
+        db.commit()
+
+        inline_bytes = db.execute(text("SELECT COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) FROM email_history")).scalar()
+
+        last_id, batches = 0, 0
+        while True:
+            last_id = move_batch(db, last_id)
+            if last_id is None:
+                break
+            # Commit each batch so senders are never blocked for long
+            db.commit()
+            batches += 1
+            print(f"Moved lessons up to history row {last_id} ({batches} batches)...")
+
+        stored = db.execute(text("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM lesson_contents")).one()
+        print(f"{inline_bytes} bytes of inline lessons are now {stored[1]} bytes in {stored[0]} stored bodies.")
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+    # Hand the freed pages back to the filesystem; VACUUM cannot run inside a transaction
+    print("Vacuuming database...")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+
+if __name__ == "__main__":
+    print("Starting migration to move lesson bodies into the content store...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,80 @@
+import re
+import sys
+import os
+
+# Add the parent directory to the path so we can import from app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.security import hash_token
+
+# Create database connection
+engine = create_engine(settings.DATABASE_URL)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+TOKEN_COLUMNS = ["reset_token", "confirmation_token"]
+BATCH_SIZE = 1000
+
+# Plain tokens are never 64 hex characters, so already hashed rows are skipped when re-run
+HASHED = re.compile(r"^[0-9a-f]{64}$")
+
+def hash_batch(db, last_id):
+    """Hash the plain tokens of the next batch of users; returns the last id seen, or None when done."""
+    rows = db.execute(
+        text(
+            "SELECT id, reset_token, confirmation_token FROM users "
+            "WHERE id > :last_id AND (reset_token IS NOT NULL OR confirmation_token IS NOT NULL) "
+            "ORDER BY id LIMIT :limit"
+        ),
+        {"last_id": last_id, "limit": BATCH_SIZE}
+    ).fetchall()
+    if not rows:
+        return None
+
+    for row in rows:
+        values = {}
+        for column in TOKEN_COLUMNS:
+            token = getattr(row, column)
+            if token and not HASHED.match(token):
+                values[column] = hash_token(token)
+        if values:
+            assignments = ", ".join(f"{column} = :{column}" for column in values)
+            db.execute(text(f"UPDATE users SET {assignments} WHERE id = :id"), {**values, "id": row.id})
+    return rows[-1].id
+
+def run_migration():
+    # Create a database session
+    db = SessionLocal()
+
+    try:
+        last_id, batches = 0, 0
+        while True:
+            last_id = hash_batch(db, last_id)
+            if last_id is None:
+                break
+            # Commit each batch so the users table is never locked for long
+            db.commit()
+            batches += 1
+            print(f"Hashed tokens up to user {last_id} ({batches} batches)...")
+
+        for column in TOKEN_COLUMNS:
+            print(f"Creating index ix_users_{column}...")
+            db.execute(text(f"CREATE INDEX IF NOT EXISTS ix_users_{column} ON users ({column})"))
+
+        # Commit the changes
+        db.commit()
+        print("Migration completed successfully!")
+
+    except Exception as e:
+        db.rollback()
+        print(f"Error during migration: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    print("Starting migration to hash reset and confirmation tokens...")
+    run_migration()
+    print("Migration finished.")
@@ -0,0 +1,72 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, time
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api import exports
+from app.db.base import Base
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive
+from app.db.session import create_async_db_engine
+
+
+def test_export_streams_every_lesson_and_resumes(tmp_path, monkeypatch):
+    """Hot and archived lessons stream in (subscription, sent_at) order, in small chunks, and resume by id."""
+    monkeypatch.setattr(exports, "EXPORT_BATCH_SIZE", 3)
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def collect(subscription_ids, topics, after, export_format):
+        chunks = [chunk async for chunk in exports.stream_lessons(
+            subscription_ids, topics, after, export_format, session_factory=Session
+        )]
+        return chunks
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with Session() as db:
+            user = User(email="export@example.com", password_hash="", email_confirmed=1)
+            db.add(user)
+            await db.flush()
+            subscriptions = [
+                Subscription(email=user.email, topic=topic, preferred_time=time(9, 0), timezone="UTC", user_id=user.id)
+                for topic in ("Rust", "Poetry, modern")
+            ]
+            db.add_all(subscriptions)
+            await db.flush()
+            for s in subscriptions:
+                db.add_all([
+                    EmailHistoryArchive(id=100 * s.id + n, subscription_id=s.id, inline_content=f"<p>{s.id}/{n}</p>",
+                                        sent_at=datetime(2025, 1, 1 + n))
+                    for n in range(1, 3)
+                ] + [
+                    EmailHistory(id=100 * s.id + n, subscription_id=s.id, inline_content=f"<p>{s.id}/{n},\nmore</p>",
+                                 sent_at=datetime(2025, 1, 1 + n))
+                    for n in range(3, 6)
+                ])
+            await db.commit()
+            topics = {s.id: s.topic for s in subscriptions}
+
+        ids = sorted(topics)
+        full = await collect(ids, topics, None, "ndjson")
+        resumed = await collect(ids, topics, (ids[0], datetime(2025, 1, 5), 100 * ids[0] + 4), "ndjson")
+        as_csv = "".join(await collect(ids, topics, None, "csv"))
+        await engine.dispose()
+        return ids, full, resumed, as_csv
+
+    ids, full, resumed, as_csv = asyncio.run(run())
+
+    records = [json.loads(line) for chunk in full for line in chunk.splitlines()]
+    assert len(full) == 4  # 10 lessons in chunks of 3
+    assert [r["id"] for r in records] == [100 * sid + n for sid in ids for n in range(1, 6)]
+    assert records[0]["content"] == f"<p>{ids[0]}/1</p>"
+
+    resumed_ids = [json.loads(line)["id"] for chunk in resumed for line in chunk.splitlines()]
+    assert resumed_ids == [r["id"] for r in records[4:]]
+
+    rows = list(csv.DictReader(io.StringIO(as_csv)))
+    assert [int(row["id"]) for row in rows] == [r["id"] for r in records]
+    assert rows[-1]["topic"] == "Poetry, modern" and rows[-1]["content"] == records[-1]["content"]
@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, time
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.api.subscriptions import get_email_history, get_subscriptions
+from app.db.base import Base
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive
+from app.db.session import create_async_db_engine
+
+
+def test_cursor_round_trip():
+    sent_at = datetime(2025, 3, 10, 9, 0, 0, 123456)
+    assert decode_cursor(encode_cursor(sent_at, 42), datetime, int) == (sent_at, 42)
+
+    with pytest.raises(HTTPException):
+        decode_cursor("not-a-cursor", datetime, int)
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor(42), datetime, int)
+
+
+def test_pages_cover_every_row_once(tmp_path):
+    """Following X-Next-Cursor visits each lesson once, newest first, even when send times tie."""
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'pages.db'}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def page_through(fetch):
+        pages, cursor = [], None
+        while True:
+            response = Response()
+            pages.append(await fetch(response, cursor))
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                return pages
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with Session() as db:
+            user = User(email="pages@example.com", password_hash="", email_confirmed=1)
+            db.add(user)
+            await db.flush()
+            subscriptions = [
+                Subscription(email=user.email, topic=f"Topic {n}", preferred_time=time(9, 0),
+                             timezone="UTC", user_id=user.id)
+                for n in range(5)
+            ]
+            db.add_all(subscriptions)
+            await db.flush()
+            # Pairs of lessons share a send time, so the id breaks ties
+            db.add_all([
+                EmailHistory(subscription_id=subscriptions[0].id, inline_content=f"lesson {n}",
+                             sent_at=datetime(2025, 3, 1 + n // 2, 9, 0))
+                for n in range(7)
+            ])
+            await db.commit()
+
+            history_pages = await page_through(lambda response, cursor: get_email_history(
+                subscriptions[0].id, response, db=db, current_user=user,
+                cursor=cursor, limit=3, fields="id,sent_at", skip=0
+            ))
+            subscription_pages = await page_through(lambda response, cursor: get_subscriptions(
+                response, db=db, current_user=user, cursor=cursor, limit=2, skip=0
+            ))
+        await engine.dispose()
+        return history_pages, subscription_pages, [s.id for s in subscriptions]
+
+    history_pages, subscription_pages, subscription_ids = asyncio.run(run())
+
+    assert [len(page) for page in history_pages] == [3, 3, 1]
+    history = [row for page in history_pages for row in page]
+    assert all("content" not in row for row in history)
+    assert [(row["sent_at"], row["id"]) for row in history] == sorted(
+        ((row["sent_at"], row["id"]) for row in history), reverse=True
+    )
+    assert len({row["id"] for row in history}) == 7
+
+    assert [[s.id for s in page] for page in subscription_pages] == [
+        subscription_ids[0:2], subscription_ids[2:4], subscription_ids[4:5]
+    ]
+
+
+def test_history_pages_continue_into_the_archive(tmp_path):
+    """Archived lessons follow the hot ones on later pages, with their content."""
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'archive_pages.db'}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with Session() as db:
+            user = User(email="archive-pages@example.com", password_hash="", email_confirmed=1)
+            db.add(user)
+            await db.flush()
+            subscription = Subscription(email=user.email, topic="Archived", preferred_time=time(9, 0),
+                                        timezone="UTC", user_id=user.id)
+            db.add(subscription)
+            await db.flush()
+            db.add_all([
+                EmailHistoryArchive(id=n, subscription_id=subscription.id, inline_content=f"lesson {n}",
+                                    sent_at=datetime(2025, 1, 1 + n))
+                for n in range(1, 5)
+            ] + [
+                EmailHistory(id=n, subscription_id=subscription.id, inline_content=f"lesson {n}",
+                             sent_at=datetime(2025, 1, 1 + n))
+                for n in range(5, 8)
+            ])
+            await db.commit()
+
+            pages, cursor = [], None
+            while True:
+                response = Response()
+                pages.append(await get_email_history(
+                    subscription.id, response, db=db, current_user=user,
+                    cursor=cursor, limit=2, fields=None, skip=0
+                ))
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if not cursor:
+                    break
+        await engine.dispose()
+        return pages
+
+    pages = asyncio.run(run())
+
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [row["content"] for page in pages for row in page] == [f"lesson {n}" for n in range(7, 0, -1)]
@@ -0,0 +1,44 @@
+import asyncio
+
+from passlib.hash import bcrypt
+
+from app.core import security
+
+
+def test_password_hash_round_trip(monkeypatch):
+    """Hashing and verifying run on the password pool and agree with each other."""
+    monkeypatch.setattr(security, "pwd_context", security.build_password_context(4))
+
+    async def run():
+        hashed = await security.get_password_hash_async("correct horse")
+        return (
+            await security.verify_and_update_password("correct horse", hashed),
+            await security.verify_and_update_password("wrong", hashed),
+        )
+
+    (valid, new_hash), (invalid, _) = asyncio.run(run())
+    assert valid is True and new_hash is None
+    assert invalid is False
+
+
+def test_hash_is_upgraded_when_rounds_change(monkeypatch):
+    """A valid password stored with a different cost gets a replacement hash."""
+    monkeypatch.setattr(security, "pwd_context", security.build_password_context(5))
+    old_hash = bcrypt.using(rounds=4).hash("correct horse")
+
+    valid, new_hash = asyncio.run(security.verify_and_update_password("correct horse", old_hash))
+
+    assert valid is True
+    assert new_hash is not None and new_hash.startswith("$2b$05$")
+
+
+def test_users_without_password_never_verify():
+    """Users created by subscribing have an empty hash and cannot log in with a password."""
+    assert asyncio.run(security.verify_and_update_password("anything", "")) == (False, None)
+
+
+def test_tokens_are_stored_as_fixed_length_hashes():
+    token = security.generate_reset_token()
+    hashed = security.hash_token(token)
+    assert len(hashed) == 64 and hashed != token
+    assert security.hash_token(token) == hashed
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.signed_tokens import (
+    CONFIRMATION_PURPOSE,
+    UNSUBSCRIBE_PURPOSE,
+    generate_confirmation_token,
+    generate_unsubscribe_token,
+    is_signed_token,
+    verify_signed_token,
+    verify_unsubscribe_token,
+)
+from app.core.config import settings
+from app.core.security import generate_reset_token
+
+
+@pytest.fixture(autouse=True)
+def secret_key(monkeypatch):
+    monkeypatch.setattr(settings, "API_SECRET_KEY", "signed-token-test-secret-key-0123456789")
+
+
+def test_confirmation_token_round_trip():
+    token = generate_confirmation_token("a.b+c@example.com", datetime.utcnow() + timedelta(days=1))
+
+    assert is_signed_token(token)
+    assert verify_signed_token(token, CONFIRMATION_PURPOSE) == "a.b+c@example.com"
+    assert verify_signed_token(token, UNSUBSCRIBE_PURPOSE) is None
+
+
+def test_tampered_or_expired_tokens_are_rejected():
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    token = generate_confirmation_token("victim@example.com", expires_at)
+    purpose, expires, subject, signature = token.split(".")
+    other_subject = generate_confirmation_token("attacker@example.com", expires_at).split(".")[2]
+
+    assert verify_signed_token(f"{purpose}.{expires}.{other_subject}.{signature}", CONFIRMATION_PURPOSE) is None
+    assert verify_signed_token(f"{purpose}.{int(expires) + 60}.{subject}.{signature}", CONFIRMATION_PURPOSE) is None
+
+    expired = generate_confirmation_token("victim@example.com", datetime.utcnow() - timedelta(seconds=1))
+    assert verify_signed_token(expired, CONFIRMATION_PURPOSE) is None
+
+
+def test_unsubscribe_token_names_subscription_and_address():
+    token = generate_unsubscribe_token(42, "reader@example.com", datetime.utcnow() + timedelta(days=365))
+    assert verify_unsubscribe_token(token) == (42, "reader@example.com")
+    assert verify_unsubscribe_token(token.replace(".", "", 1)) is None
+
+
+def test_legacy_tokens_are_not_mistaken_for_signed_ones():
+    """Random tokens stored in the database still go through the stored-hash lookup."""
+    assert not is_signed_token(generate_reset_token())
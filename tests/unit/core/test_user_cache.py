@@ -0,0 +1,83 @@
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import security
+from app.core.user_cache import UserCache
+from app.db.base import Base
+from app.db.models import User
+from app.db.session import create_async_db_engine
+from app.schemas.user import TokenPayload
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_and_stay_bounded():
+    """Users are reused for the TTL only, and the least recently used go first when full."""
+    clock = FakeClock()
+    cache = UserCache(ttl_seconds=30, max_entries=2, clock=clock)
+
+    cache.set("a@example.com", 100, "a")
+    cache.set("b@example.com", 100, "b")
+    assert cache.get("a@example.com", 100) == "a"
+    assert cache.get("a@example.com", 200) is None  # a different token of the same user
+
+    cache.set("c@example.com", 100, "c")
+    assert cache.get("b@example.com", 100) is None
+    assert cache.get("a@example.com", 100) == "a"
+
+    clock.now = 30
+    assert cache.get("a@example.com", 100) is None
+    assert len(cache) == 1
+
+
+def test_invalidate_drops_every_token_of_a_user():
+    cache = UserCache(ttl_seconds=30)
+    cache.set("a@example.com", 100, "a1")
+    cache.set("a@example.com", 200, "a2")
+    cache.set("b@example.com", 100, "b")
+
+    cache.invalidate("a@example.com")
+
+    assert cache.get("a@example.com", 100) is None
+    assert cache.get("a@example.com", 200) is None
+    assert cache.get("b@example.com", 100) == "b"
+
+
+def test_resolved_user_is_reused_across_sessions(tmp_path, monkeypatch):
+    """A second request with the same token gets its own user instance without a query."""
+    monkeypatch.setattr(security, "user_cache", UserCache(ttl_seconds=30))
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    statements = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    token = TokenPayload(sub="cached@example.com", exp=2000000000)
+
+    async def run():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with Session() as db:
+            db.add(User(email="cached@example.com", password_hash="", email_confirmed=1))
+            await db.commit()
+
+        async with Session() as db:
+            first = await security._resolve_token_user(db, token)
+        statements.clear()
+        async with Session() as db:
+            second = await security._resolve_token_user(db, token)
+            in_session = second in db
+        await engine.dispose()
+        return first, second, in_session
+
+    first, second, in_session = asyncio.run(run())
+
+    assert statements == []
+    assert second is not first and in_session
+    assert (second.id, second.email, second.email_confirmed) == (first.id, first.email, 1)
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func
+
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive
+
+
+def query_plan(db, query):
+    """Return the EXPLAIN QUERY PLAN details for an ORM query."""
+    compiled = query.statement.compile(dialect=db.get_bind().dialect)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def assert_no_full_scan(plan):
+    """Fail if any table in the plan is read without an index."""
+    scans = [step for step in plan if step.startswith("SCAN ")]
+    assert not scans, f"Full table scan in query plan: {plan}"
+
+
+HOT_QUERIES = {
+    "login user lookup": lambda db: db.query(User).filter(User.email == "a@example.com"),
+    "confirmation token lookup": lambda db: db.query(User).filter(User.confirmation_token == "0" * 64),
+    "reset token lookup": lambda db: db.query(User).filter(User.reset_token == "0" * 64),
+    "dashboard subscriptions": lambda db: db.query(Subscription).filter(Subscription.user_id == 1),
+    "dashboard lesson counts": lambda db: db.query(
+        Subscription, func.count(EmailHistory.id), func.max(EmailHistory.sent_at)
+    ).outerjoin(EmailHistory, EmailHistory.subscription_id == Subscription.id).filter(
+        Subscription.user_id == 1
+    ).group_by(Subscription.id),
+    "subscribe duplicate check": lambda db: db.query(Subscription).filter(
+        Subscription.email == "a@example.com",
+        Subscription.topic == "History",
+        Subscription.user_id != 1
+    ),
+    "subscribe existing topics": lambda db: db.query(Subscription.topic).filter(
+        Subscription.email == "a@example.com"
+    ).distinct(),
+    "send history": lambda db: db.query(EmailHistory).filter(
+        EmailHistory.subscription_id == 1
+    ).order_by(EmailHistory.sent_at.asc()),
+    "history API page": lambda db: db.query(EmailHistory).filter(
+        EmailHistory.subscription_id == 1
+    ).order_by(EmailHistory.sent_at.desc()).offset(20).limit(20),
+    "archived lesson count": lambda db: db.query(func.count(EmailHistoryArchive.id)).filter(
+        EmailHistoryArchive.subscription_id == 1
+    ),
+    "history archive page": lambda db: db.query(EmailHistoryArchive).filter(
+        EmailHistoryArchive.subscription_id == 1
+    ).order_by(EmailHistoryArchive.sent_at.desc()).limit(20),
+    "due subscriptions": lambda db: db.query(Subscription.id).filter(
+        Subscription.next_send_at != None,  # noqa: E711
+        Subscription.next_send_at <= datetime(2025, 3, 10)
+    ).order_by(Subscription.next_send_at.asc()).limit(500),
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(db_session, name):
+    """Queries run on every send, page load and subscribe must not scan whole tables."""
+    assert_no_full_scan(query_plan(db_session, HOT_QUERIES[name](db_session)))
+
+
+def test_history_order_comes_from_index(db_session):
+    """History reads are ordered by the composite index rather than a sort."""
+    query = HOT_QUERIES["history API page"](db_session)
+    plan = query_plan(db_session, query)
+    assert not any("TEMP B-TREE" in step for step in plan), plan
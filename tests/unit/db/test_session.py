@@ -0,0 +1,46 @@
+import asyncio
+
+from app.core.config import settings
+from app.db.session import async_database_url, create_async_db_engine, create_db_engine, engine_options
+
+
+def test_sqlite_connections_use_engine_profile(tmp_path):
+    """File-backed SQLite connections get WAL and the configured PRAGMAs."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    try:
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar().lower() == settings.SQLITE_JOURNAL_MODE.lower()
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == settings.SQLITE_BUSY_TIMEOUT_MS
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+            assert conn.exec_driver_sql("PRAGMA cache_size").scalar() == -settings.SQLITE_CACHE_SIZE_KB
+            assert conn.exec_driver_sql("PRAGMA foreign_keys").scalar() == 1
+        assert engine.pool.size() == settings.DB_POOL_SIZE
+    finally:
+        engine.dispose()
+
+
+def test_in_memory_sqlite_keeps_default_pool():
+    """Pool sizing only applies to file-backed databases."""
+    options = engine_options("sqlite:///:memory:")
+    assert "pool_size" not in options
+    assert options["connect_args"] == {"check_same_thread": False}
+
+
+def test_async_database_url_picks_async_driver():
+    assert async_database_url("sqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+    assert async_database_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+    # URLs that already name a driver are left alone
+    assert async_database_url("sqlite+aiosqlite:///./app.db") == "sqlite+aiosqlite:///./app.db"
+
+
+def test_async_engine_uses_engine_profile(tmp_path):
+    """The async engine applies the same SQLite PRAGMAs as the sync one."""
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'async.db'}")
+
+    async def journal_mode():
+        async with engine.connect() as conn:
+            mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+        await engine.dispose()
+        return mode
+
+    assert asyncio.run(journal_mode()).lower() == settings.SQLITE_JOURNAL_MODE.lower()
@@ -0,0 +1,223 @@
+import asyncio
+import pytest
+from datetime import datetime, date, time, timedelta
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import User, Subscription
+from app.services.scheduler.apscheduler_service import APSchedulerService
+from app.services.scheduler.catchup import CatchUpProcessor
+from app.services.scheduler.dispatcher import (
+    PAUSED_INDEFINITELY,
+    backfill_next_send_at,
+    claim_due_subscriptions,
+    compute_next_send_at,
+    resume_paused_subscriptions,
+)
+
+
+@pytest.fixture
+def session_factory(test_db_engine):
+    """Session factory bound to the in-memory test database."""
+    return sessionmaker(autocommit=False, autoflush=False, bind=test_db_engine)
+
+
+@pytest.fixture
+def scheduler_service(error_handler, session_factory):
+    """Scheduler service that uses the test database."""
+    return APSchedulerService(error_handler=error_handler, session_factory=session_factory)
+
+
+def make_subscription(db, email, timezone="UTC", preferred_time=time(9, 0)):
+    """Create a confirmed user with one subscription."""
+    user = User(email=email, password_hash="", email_confirmed=1)
+    db.add(user)
+    db.commit()
+    subscription = Subscription(
+        email=email,
+        topic="Python",
+        preferred_time=preferred_time,
+        timezone=timezone,
+        user_id=user.id
+    )
+    db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+    return subscription
+
+
+def test_compute_next_send_at_same_day():
+    """A delivery time later today is scheduled for today."""
+    after = datetime(2025, 3, 10, 8, 0)
+    assert compute_next_send_at(time(9, 30), "UTC", after) == datetime(2025, 3, 10, 9, 30)
+
+
+def test_compute_next_send_at_rolls_over():
+    """A delivery time that already passed is scheduled for tomorrow."""
+    after = datetime(2025, 3, 10, 10, 0)
+    assert compute_next_send_at(time(9, 30), "UTC", after) == datetime(2025, 3, 11, 9, 30)
+
+
+def test_compute_next_send_at_converts_timezone():
+    """Local delivery times are converted to UTC."""
+    after = datetime(2025, 1, 10, 0, 0)
+    # 09:00 in New York (EST, UTC-5) is 14:00 UTC
+    assert compute_next_send_at(time(9, 0), "America/New_York", after) == datetime(2025, 1, 10, 14, 0)
+
+
+def test_schedule_sets_next_send_at(scheduler_service, db_session):
+    """Scheduling stores the next delivery time on the subscription."""
+    subscription = make_subscription(db_session, "schedule@example.com")
+
+    result = scheduler_service.schedule_email_job(subscription.id, "09:00", "UTC")
+
+    assert result["success"] is True
+    db_session.refresh(subscription)
+    assert subscription.next_send_at is not None
+    assert subscription.next_send_at > datetime.utcnow()
+
+
+def test_unconfirmed_users_are_scheduled_once_confirmed(scheduler_service, db_session):
+    """Subscriptions of unconfirmed users stay unscheduled until the user confirms."""
+    subscription = make_subscription(db_session, "unconfirmed@example.com")
+    user = db_session.get(User, subscription.user_id)
+    user.email_confirmed = 0
+    db_session.commit()
+
+    result = scheduler_service.schedule_email_job(subscription.id, "09:00", "UTC")
+    assert result["unconfirmed"] is True
+    assert backfill_next_send_at(db_session, user_id=user.id) == 0
+    db_session.refresh(subscription)
+    assert subscription.next_send_at is None
+
+    user.email_confirmed = 1
+    db_session.commit()
+    assert backfill_next_send_at(db_session, user_id=user.id) == 1
+    db_session.refresh(subscription)
+    assert subscription.next_send_at is not None
+
+
+def test_pause_excludes_from_due_query(scheduler_service, db_session):
+    """Paused subscriptions are not claimed by the dispatcher."""
+    subscription = make_subscription(db_session, "pause@example.com")
+    db_session.query(Subscription).filter(Subscription.id == subscription.id).update(
+        {"next_send_at": datetime.utcnow() - timedelta(minutes=5)}
+    )
+    db_session.commit()
+
+    result = scheduler_service.pause_jobs_for_subscription(subscription.id)
+
+    assert result["success"] is True
+    assert result["paused_until"] is None
+    db_session.refresh(subscription)
+    assert subscription.next_send_at is None
+    assert subscription.paused_until == PAUSED_INDEFINITELY
+    assert subscription.id not in [sid for sid, _ in claim_due_subscriptions(db_session)]
+
+    # Scheduling a paused subscription must not put it back in the queue
+    scheduler_service.schedule_email_job(subscription.id, "09:00", "UTC")
+    db_session.refresh(subscription)
+    assert subscription.next_send_at is None
+
+
+def test_pause_rejects_past_resume_date(scheduler_service, db_session):
+    """Resume dates in the past are rejected."""
+    subscription = make_subscription(db_session, "pastpause@example.com")
+
+    result = scheduler_service.pause_jobs_for_subscription(subscription.id, "2000-01-01")
+
+    assert result["success"] is False
+
+
+def test_dispatcher_resumes_expired_pause(scheduler_service, db_session):
+    """The dispatcher resumes subscriptions once their resume date has passed."""
+    subscription = make_subscription(db_session, "autoresume@example.com")
+    resume_on = date.today() + timedelta(days=2)
+    scheduler_service.pause_jobs_for_subscription(subscription.id, resume_on.isoformat())
+
+    # Nothing to resume yet
+    assert resume_paused_subscriptions(db_session, datetime.utcnow()) == 0
+
+    later = datetime.combine(resume_on, time(12, 0))
+    assert resume_paused_subscriptions(db_session, later) >= 1
+
+    db_session.refresh(subscription)
+    assert subscription.paused_until is None
+    assert subscription.next_send_at > later
+
+
+def test_resume_schedules_next_delivery(scheduler_service, db_session):
+    """Resuming clears the pause and schedules the next delivery."""
+    subscription = make_subscription(db_session, "resume@example.com")
+    scheduler_service.pause_jobs_for_subscription(subscription.id)
+
+    result = scheduler_service.resume_jobs_for_subscription(subscription.id)
+
+    assert result["success"] is True
+    db_session.refresh(subscription)
+    assert subscription.paused_until is None
+    assert subscription.next_send_at is not None
+
+
+def test_claim_advances_due_subscription_once(db_session):
+    """A due subscription is claimed once and moved to its next slot."""
+    subscription = make_subscription(db_session, "claim@example.com")
+    now = datetime.utcnow()
+    db_session.query(Subscription).filter(Subscription.id == subscription.id).update(
+        {"next_send_at": now - timedelta(minutes=1)}
+    )
+    db_session.commit()
+
+    assert subscription.id in [sid for sid, _ in claim_due_subscriptions(db_session, now)]
+    assert subscription.id not in [sid for sid, _ in claim_due_subscriptions(db_session, now)]
+
+    db_session.refresh(subscription)
+    assert subscription.next_send_at > now
+
+
+def test_claim_orders_oldest_overdue_first(db_session):
+    """Overdue subscriptions are claimed oldest first, up to the limit."""
+    now = datetime.utcnow()
+    newer = make_subscription(db_session, "newer@example.com")
+    older = make_subscription(db_session, "older@example.com")
+    db_session.query(Subscription).filter(Subscription.id == newer.id).update(
+        {"next_send_at": now - timedelta(hours=1)}
+    )
+    db_session.query(Subscription).filter(Subscription.id == older.id).update(
+        {"next_send_at": now - timedelta(hours=5)}
+    )
+    db_session.commit()
+
+    claimed = claim_due_subscriptions(db_session, now, limit=1)
+
+    assert [sid for sid, _ in claimed] == [older.id]
+
+
+def test_catchup_processor_bounds_concurrency_and_dedupes():
+    """The processor caps concurrent sends and never runs one subscription twice at once."""
+    running = set()
+    peak = 0
+    started = []
+
+    async def fake_send(subscription_id, scheduled_at):
+        nonlocal peak
+        assert subscription_id not in running
+        running.add(subscription_id)
+        started.append(subscription_id)
+        peak = max(peak, len(running))
+        await asyncio.sleep(0.01)
+        running.discard(subscription_id)
+        return True
+
+    async def run():
+        processor = CatchUpProcessor(fake_send, max_concurrency=2, max_per_minute=0)
+        assert processor.submit([(1, None), (2, None), (3, None), (4, None)]) == 4
+        # Already queued subscriptions are rejected
+        assert processor.submit([(2, None), (5, None)]) == 1
+        await processor.drain()
+        return processor
+
+    processor = asyncio.run(run())
+
+    assert peak <= 2
+    assert started == [1, 2, 3, 4, 5]
+    assert processor.backlog == 0
@@ -0,0 +1,94 @@
+from datetime import datetime, date, time, timedelta
+
+from app.db.models import User, Subscription, DeliveryClaim
+from app.services.delivery_claims import (
+    claim_delivery,
+    complete_delivery,
+    delivery_date_for,
+    release_delivery,
+    release_send,
+    reserve_send,
+)
+
+
+def make_subscription(db, email):
+    """Create a confirmed user with one subscription."""
+    user = User(email=email, password_hash="", email_confirmed=1)
+    db.add(user)
+    db.commit()
+    subscription = Subscription(
+        email=email,
+        topic="History",
+        preferred_time=time(9, 0),
+        timezone="UTC",
+        user_id=user.id
+    )
+    db.add(subscription)
+    db.commit()
+    return subscription
+
+
+def test_delivery_date_uses_subscription_timezone():
+    """The delivery date is the local date, not the UTC date."""
+    now = datetime(2025, 3, 10, 2, 0)  # 02:00 UTC is still March 9th in Los Angeles
+    assert delivery_date_for("UTC", now) == date(2025, 3, 10)
+    assert delivery_date_for("America/Los_Angeles", now) == date(2025, 3, 9)
+
+
+def test_second_claim_for_same_day_is_rejected(db_session):
+    """Only one run can claim a subscription's lesson for a given day."""
+    subscription = make_subscription(db_session, "claim-once@example.com")
+    day = date(2025, 3, 10)
+
+    first = claim_delivery(db_session, subscription.id, day)
+    second = claim_delivery(db_session, subscription.id, day)
+
+    assert first is not None
+    assert second is None
+    # A different day can still be claimed
+    assert claim_delivery(db_session, subscription.id, date(2025, 3, 11)) is not None
+
+
+def test_released_claim_can_be_retried(db_session):
+    """Releasing a failed delivery lets a later run claim it again."""
+    subscription = make_subscription(db_session, "claim-retry@example.com")
+    day = date(2025, 3, 10)
+
+    claim = claim_delivery(db_session, subscription.id, day)
+    release_delivery(db_session, claim)
+
+    assert claim_delivery(db_session, subscription.id, day) is not None
+
+
+def test_completed_claim_is_not_released(db_session):
+    """Sent deliveries stay claimed even if release is called afterwards."""
+    subscription = make_subscription(db_session, "claim-sent@example.com")
+    day = date(2025, 3, 10)
+
+    claim = claim_delivery(db_session, subscription.id, day)
+    complete_delivery(db_session, claim)
+    db_session.commit()
+    release_delivery(db_session, claim)
+
+    stored = db_session.query(DeliveryClaim).filter(DeliveryClaim.id == claim.id).first()
+    assert stored is not None
+    assert stored.status == "sent"
+    assert claim_delivery(db_session, subscription.id, day) is None
+
+
+def test_sends_within_the_interval_are_refused(db_session):
+    """A send reserves last_sent, so an overlapping send is refused until the reservation is released."""
+    subscription = make_subscription(db_session, "reserve@example.com")
+    now = datetime(2025, 3, 10, 9, 0)
+
+    reserved_at = reserve_send(db_session, subscription.id, now=now)
+    assert reserved_at == now
+    assert reserve_send(db_session, subscription.id, now=now + timedelta(minutes=5)) is None
+
+    release_send(db_session, subscription.id, reserved_at, None)
+    db_session.commit()
+    db_session.refresh(subscription)
+    assert subscription.last_sent is None
+    assert reserve_send(db_session, subscription.id, now=now + timedelta(minutes=5)) is not None
+    # Once the interval has passed, the next send goes ahead
+    assert reserve_send(db_session, subscription.id, now=now + timedelta(hours=2)) is not None
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+
+from app.db.models import DeliveryRollup
+from app.services.delivery_rollups import (
+    FAILED,
+    GENERATION_FAILED,
+    SENT,
+    record_attempts,
+    rollup_key,
+    summarize_rollups,
+)
+
+
+def test_attempts_accumulate_and_summarize(db_session):
+    """Repeated keys add up in one row; the summary reads only the rollups."""
+    day_one, day_two = datetime(2031, 5, 1, 9), datetime(2031, 5, 2, 9)
+    record_attempts(db_session, [
+        rollup_key("Rollup Rust", "easy", "sendgrid", SENT, at=day_one),
+        rollup_key("Rollup Rust", "easy", "sendgrid", SENT, at=day_one),
+        rollup_key("Rollup Go", "hard", "sendgrid", FAILED, at=day_one),
+        rollup_key("Rollup Go", "hard", "smtp", SENT, at=day_one),
+    ])
+    db_session.commit()
+    record_attempts(db_session, [
+        rollup_key("Rollup Rust", "easy", "sendgrid", SENT, at=day_two),
+        rollup_key("Rollup Rust", "easy", "sendgrid", SENT, at=day_one),
+        rollup_key("Rollup Go", None, None, GENERATION_FAILED, at=day_two),
+    ])
+    db_session.commit()
+
+    row = db_session.get(DeliveryRollup, (date(2031, 5, 1), "Rollup Rust", "easy", "sendgrid", SENT))
+    assert row.count == 3
+
+    summary = summarize_rollups(db_session, date(2031, 5, 1))
+    assert summary["days"] == [
+        {"date": "2031-05-01", SENT: 4, FAILED: 1, GENERATION_FAILED: 0},
+        {"date": "2031-05-02", SENT: 1, FAILED: 0, GENERATION_FAILED: 1},
+    ]
+    assert summary["providers"]["sendgrid"] == {SENT: 4, FAILED: 1, "failure_rate": 0.2}
+    assert summary["providers"]["smtp"] == {SENT: 1, FAILED: 0, "failure_rate": 0.0}
+    assert "none" not in summary["providers"]
+    assert summary["top_topics"] == [{"topic": "Rollup Rust", "sent": 4}, {"topic": "Rollup Go", "sent": 1}]
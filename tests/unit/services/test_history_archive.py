@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta, time
+
+from app.core.config import settings
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive
+from app.services.lesson_store import record_lesson
+from app.services.scheduler.archive import archive_history
+
+
+def test_old_lessons_move_to_the_archive(db_session, monkeypatch):
+    """Lessons past the horizon are archived, except the latest few kept for continuity."""
+    monkeypatch.setattr(settings, "HISTORY_ARCHIVE_AFTER_DAYS", 30)
+    monkeypatch.setattr(settings, "HISTORY_HOT_LESSONS", 3)
+    now = datetime(2025, 6, 1, 9, 0)
+
+    user = User(email="archive@example.com", password_hash="", email_confirmed=1)
+    db_session.add(user)
+    db_session.flush()
+    daily, lapsed = [
+        Subscription(email=user.email, topic=topic, preferred_time=time(9, 0), timezone="UTC", user_id=user.id)
+        for topic in ("Daily", "Lapsed")
+    ]
+    db_session.add_all([daily, lapsed])
+    db_session.flush()
+    # One lesson a day for 60 days, and 5 lessons that all stopped 100 days ago
+    for day in range(60):
+        record_lesson(db_session, daily.id, f"<p>daily {day}</p>", sent_at=now - timedelta(days=day))
+    for day in range(5):
+        record_lesson(db_session, lapsed.id, f"<p>lapsed {day}</p>", sent_at=now - timedelta(days=100 + day))
+    db_session.commit()
+    daily_id, lapsed_id = daily.id, lapsed.id
+
+    archived = archive_history(db_session, now=now)
+
+    hot = {
+        subscription_id: db_session.query(EmailHistory).filter(EmailHistory.subscription_id == subscription_id).count()
+        for subscription_id in (daily_id, lapsed_id)
+    }
+    assert hot == {daily_id: 31, lapsed_id: 3}  # Day 30 is exactly on the horizon
+    assert archived == 29 + 2
+    oldest = db_session.query(EmailHistoryArchive).filter(
+        EmailHistoryArchive.subscription_id == daily_id
+    ).order_by(EmailHistoryArchive.sent_at).first()
+    assert oldest.content == "<p>daily 59</p>"
+
+    # Nothing left to move on the next run
+    assert archive_history(db_session, now=now) == 0
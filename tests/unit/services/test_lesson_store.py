@@ -0,0 +1,81 @@
+from datetime import time
+
+from sqlalchemy import func
+
+from app.core.compression import ZLIB, compress, decompress
+from app.db.models import User, Subscription, EmailHistory, LessonContent
+from app.services.lesson_store import record_lesson, repair_lesson_counters
+
+
+def make_subscriptions(db, email, count):
+    """Create a confirmed user with several subscriptions."""
+    user = User(email=email, password_hash="", email_confirmed=1)
+    db.add(user)
+    db.flush()
+    subscriptions = [
+        Subscription(email=email, topic=f"Topic {n}", preferred_time=time(9, 0),
+                     timezone="UTC", user_id=user.id)
+        for n in range(count)
+    ]
+    db.add_all(subscriptions)
+    db.flush()
+    return subscriptions
+
+
+def test_compress_round_trip():
+    body = "<h2>Photosynthesis</h2><p>Plants turn light into sugar. ✓</p>" * 20
+    codec, data = compress(body)
+    assert len(data) < len(body.encode("utf-8"))
+    assert decompress(codec, data) == body
+    assert decompress(*compress(body, ZLIB)) == body
+
+
+def test_identical_lessons_are_stored_once(db_session):
+    """A lesson sent to a whole cohort is one stored body, read back transparently."""
+    subscription_ids = [s.id for s in make_subscriptions(db_session, "cohort@example.com", 3)]
+    shared = "<p>The same lesson for everyone</p>" * 50
+
+    for subscription_id in subscription_ids:
+        record_lesson(db_session, subscription_id, shared)
+    record_lesson(db_session, subscription_ids[0], "<p>A different lesson</p>")
+    db_session.commit()
+    db_session.expunge_all()
+
+    history = db_session.query(EmailHistory).filter(
+        EmailHistory.subscription_id.in_(subscription_ids)
+    ).order_by(EmailHistory.id).all()
+    assert [h.content for h in history] == [shared, shared, shared, "<p>A different lesson</p>"]
+    assert len({h.content_hash for h in history}) == 2
+    stored = db_session.query(LessonContent).filter(LessonContent.hash == history[0].content_hash).one()
+    assert stored.size == len(shared) and len(stored.data) < stored.size
+
+
+def test_rows_written_before_the_store_still_read(db_session):
+    subscription = make_subscriptions(db_session, "legacy-body@example.com", 1)[0]
+    db_session.add(EmailHistory(subscription_id=subscription.id, inline_content="<p>old lesson</p>"))
+    db_session.commit()
+
+    history = db_session.query(EmailHistory).filter(EmailHistory.subscription_id == subscription.id).one()
+    assert history.content == "<p>old lesson</p>"
+
+
+def test_lesson_counters_follow_inserts_and_can_be_repaired(db_session):
+    subscription = make_subscriptions(db_session, "counters@example.com", 1)[0]
+    subscription_id = subscription.id
+    for n in range(3):
+        last = record_lesson(db_session, subscription_id, f"<p>lesson {n}</p>")
+    db_session.commit()
+
+    subscription = db_session.get(Subscription, subscription_id)
+    assert (subscription.lesson_count, subscription.last_history_id) == (3, last.id)
+    assert subscription.last_sent == last.sent_at
+
+    # Drift, e.g. from history written without record_lesson
+    db_session.add(EmailHistory(subscription_id=subscription_id, inline_content="<p>written directly</p>"))
+    subscription.lesson_count = 7
+    db_session.commit()
+    latest_id = db_session.query(func.max(EmailHistory.id)).scalar()
+
+    assert repair_lesson_counters(db_session) >= 1
+    db_session.refresh(subscription)
+    assert (subscription.lesson_count, subscription.last_history_id) == (4, latest_id)
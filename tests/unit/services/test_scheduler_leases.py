@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from app.db.models import SchedulerLease
+from app.services.scheduler.leases import ShardLeaseManager, try_acquire_lease
+
+
+def test_lease_is_exclusive_until_it_expires(db_session):
+    """A live lease can only be renewed by its owner; an expired one can be taken over."""
+    now = datetime(2025, 3, 10, 12, 0)
+    expires_at = now + timedelta(minutes=3)
+
+    assert try_acquire_lease(db_session, "test-lease", "worker-a", expires_at, now) is True
+    assert try_acquire_lease(db_session, "test-lease", "worker-a", expires_at, now) is True
+    assert try_acquire_lease(db_session, "test-lease", "worker-b", expires_at, now) is False
+
+    later = expires_at + timedelta(seconds=1)
+    assert try_acquire_lease(db_session, "test-lease", "worker-b", later + timedelta(minutes=3), later) is True
+    lease = db_session.query(SchedulerLease).filter(SchedulerLease.name == "test-lease").first()
+    assert lease.owner == "worker-b"
+
+
+def test_shards_are_rebalanced_between_workers(db_session):
+    """A second worker gets its fair share once the first gives up extra shards."""
+    now = datetime(2030, 1, 1, 12, 0)
+    first = ShardLeaseManager(shard_count=4, ttl_seconds=180, owner="first")
+    second = ShardLeaseManager(shard_count=4, ttl_seconds=180, owner="second")
+
+    assert first.heartbeat(db_session, now) == [0, 1, 2, 3]
+
+    # The second worker starts while the first still holds every shard
+    assert second.heartbeat(db_session, now) == []
+
+    # Seeing two live workers, the first keeps half and releases the rest
+    assert first.heartbeat(db_session, now + timedelta(seconds=60)) == [0, 1]
+    assert second.heartbeat(db_session, now + timedelta(seconds=60)) == [2, 3]
+
+    # Once the first worker shuts down, the second takes over all shards
+    first.release_all(db_session)
+    assert second.heartbeat(db_session, now + timedelta(seconds=120)) == [0, 1, 2, 3]
+
+    second.release_all(db_session)
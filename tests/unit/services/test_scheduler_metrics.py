@@ -0,0 +1,82 @@
+from datetime import datetime, date, time, timedelta
+
+from app.db.models import User, Subscription
+from app.services.delivery_claims import claim_delivery, complete_delivery
+from app.services.scheduler.metrics import (
+    SendMetrics,
+    SendTiming,
+    load_timings,
+    percentile,
+    summarize_timings,
+)
+
+
+def make_timing(scheduled_at, lag_seconds):
+    """Build a send that committed lag_seconds after it was scheduled."""
+    committed_at = scheduled_at + timedelta(seconds=lag_seconds)
+    return SendTiming(
+        scheduled_at=scheduled_at,
+        started_at=committed_at - timedelta(seconds=3),
+        generated_at=committed_at - timedelta(seconds=1),
+        sent_at=committed_at,
+        committed_at=committed_at
+    )
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([], 50) is None
+
+
+def test_summary_reports_lag_and_throughput():
+    """Lag percentiles cover scheduled sends; throughput counts every send."""
+    base = datetime(2025, 3, 10, 9, 0)
+    timings = [make_timing(base, lag) for lag in range(1, 11)]
+    timings.append(SendTiming(None, base, base, base, base))  # Welcome email, no schedule
+
+    summary = summarize_timings(timings, window_seconds=300)
+
+    assert summary["sends"] == 11
+    assert summary["scheduled_sends"] == 10
+    assert summary["sends_per_minute"] == 2.2
+    assert summary["lag_seconds"] == {"p50": 5.0, "p95": 10.0, "p99": 10.0}
+    assert summary["generate_seconds"]["p50"] == 2.0
+
+
+def test_rolling_window_drops_old_sends():
+    metrics = SendMetrics(window_seconds=60)
+    now = datetime(2025, 3, 10, 9, 0)
+    metrics.record(make_timing(now - timedelta(minutes=10), 5))
+    metrics.record(make_timing(now - timedelta(seconds=40), 20))
+
+    assert metrics.snapshot(now)["sends"] == 1
+
+
+def test_send_timings_are_stored_on_the_claim(db_session):
+    """Completed claims carry the timings the metrics endpoint reads."""
+    user = User(email="timings@example.com", password_hash="", email_confirmed=1)
+    db_session.add(user)
+    db_session.commit()
+    subscription = Subscription(
+        email=user.email, topic="History", preferred_time=time(9, 0), timezone="UTC", user_id=user.id
+    )
+    db_session.add(subscription)
+    db_session.commit()
+
+    scheduled_at = datetime(2031, 5, 1, 9, 0)
+    claim = claim_delivery(db_session, subscription.id, date(2031, 5, 1), scheduled_at=scheduled_at)
+    complete_delivery(
+        db_session, claim,
+        generated_at=scheduled_at + timedelta(seconds=20),
+        sent_at=scheduled_at + timedelta(seconds=25),
+        completed_at=scheduled_at + timedelta(seconds=26)
+    )
+    db_session.commit()
+
+    timings = load_timings(db_session, since=scheduled_at)
+
+    assert len(timings) == 1
+    assert timings[0].lag_seconds == 26.0
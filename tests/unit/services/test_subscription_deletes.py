@@ -0,0 +1,85 @@
+from datetime import date, time
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import User, Subscription, EmailHistory, EmailHistoryArchive, DeliveryClaim
+from app.db.session import create_db_engine
+from app.services.subscription_deletes import delete_subscriptions, sweep_orphans
+
+
+def make_subscriptions(db, email, count):
+    """Create a user with subscriptions that each have history, an archived lesson and a claim."""
+    user = User(email=email, password_hash="", email_confirmed=1)
+    db.add(user)
+    db.flush()
+    subscriptions = [
+        Subscription(email=email, topic=f"Topic {n}", preferred_time=time(9, 0), timezone="UTC", user_id=user.id)
+        for n in range(count)
+    ]
+    db.add_all(subscriptions)
+    db.flush()
+    for subscription in subscriptions:
+        db.add_all([
+            EmailHistory(subscription_id=subscription.id, inline_content="<p>lesson</p>"),
+            EmailHistory(subscription_id=subscription.id, inline_content="<p>lesson</p>"),
+            DeliveryClaim(subscription_id=subscription.id, delivery_date=date(2025, 3, 10)),
+        ])
+    db.flush()
+    db.add_all([
+        EmailHistoryArchive(id=10_000 + subscription.id, subscription_id=subscription.id,
+                            inline_content="<p>old lesson</p>")
+        for subscription in subscriptions
+    ])
+    db.commit()
+    return [subscription.id for subscription in subscriptions]
+
+
+def remaining(db, subscription_ids):
+    return {
+        model.__tablename__: db.query(model).filter(model.subscription_id.in_(subscription_ids)).count()
+        for model in (EmailHistory, EmailHistoryArchive, DeliveryClaim)
+    }
+
+
+def test_delete_removes_subscriptions_with_their_rows(db_session):
+    deleted_ids = make_subscriptions(db_session, "bulk-delete@example.com", 3)
+    kept_ids = make_subscriptions(db_session, "bulk-keep@example.com", 1)
+
+    assert delete_subscriptions(db_session, deleted_ids) == 3
+    db_session.commit()
+
+    assert db_session.query(Subscription).filter(Subscription.id.in_(deleted_ids)).count() == 0
+    assert remaining(db_session, deleted_ids) == {"email_history": 0, "email_history_archive": 0, "delivery_claims": 0}
+    assert remaining(db_session, kept_ids) == {"email_history": 2, "email_history_archive": 1, "delivery_claims": 1}
+
+
+def test_sweep_purges_rows_of_deleted_subscriptions(db_session):
+    orphaned_ids = make_subscriptions(db_session, "orphaned@example.com", 2)
+    kept_ids = make_subscriptions(db_session, "not-orphaned@example.com", 1)
+    # Delete the subscriptions the way older code did, leaving their rows behind
+    db_session.execute(delete(Subscription).where(Subscription.id.in_(orphaned_ids)))
+    db_session.commit()
+
+    assert sweep_orphans(db_session, chunk_size=3) >= 4 + 2 + 2
+    assert remaining(db_session, orphaned_ids) == {"email_history": 0, "email_history_archive": 0, "delivery_claims": 0}
+    assert remaining(db_session, kept_ids) == {"email_history": 2, "email_history_archive": 1, "delivery_claims": 1}
+
+
+def test_database_cascades_subscription_deletes(tmp_path):
+    """Fresh schemas delete history and claims with the subscription, with foreign keys enforced."""
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'cascade.db'}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        subscription_ids = make_subscriptions(db, "cascade@example.com", 2)
+
+        db.execute(delete(Subscription).where(Subscription.id == subscription_ids[0]))
+        db.commit()
+
+        assert remaining(db, subscription_ids[:1]) == {"email_history": 0, "email_history_archive": 0, "delivery_claims": 0}
+        assert remaining(db, subscription_ids[1:]) == {"email_history": 2, "email_history_archive": 1, "delivery_claims": 1}
+    finally:
+        db.close()
+        engine.dispose()
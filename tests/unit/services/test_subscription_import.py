@@ -0,0 +1,55 @@
+import io
+from datetime import time
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import User, Subscription
+from app.services.subscription_import import import_subscriptions
+
+
+@pytest.fixture(autouse=True)
+def secret_key(monkeypatch):
+    """Confirmation tokens for new users are signed."""
+    monkeypatch.setattr(settings, "API_SECRET_KEY", "import-test-secret-key-0123456789")
+
+
+def test_import_upserts_in_batches_and_reports_bad_rows(db_session):
+    existing_user = User(email="import-0@example.com", password_hash="", email_confirmed=1)
+    db_session.add(existing_user)
+    db_session.flush()
+    db_session.add(Subscription(email=existing_user.email, topic="Algebra", preferred_time=time(7, 0),
+                                timezone="UTC", user_id=existing_user.id))
+    db_session.commit()
+
+    rows = [f"import-{n}@example.com,Algebra,08:30,Europe/Berlin,easy" for n in range(5)] + [
+        "not-an-email,Algebra,08:30,UTC,",
+        "import-9@example.com,<script>,08:30,UTC,",
+        "import-9@example.com,Algebra,8h30,UTC,",
+        "import-9@example.com,Algebra,08:30,Nowhere/City,",
+        "import-1@example.com,Algebra,09:00,UTC,",
+    ]
+    upload = io.BytesIO("﻿Email,Topic,Preferred_Time,Timezone,Difficulty\n".encode() + "\n".join(rows).encode())
+
+    report, confirmations = import_subscriptions(db_session, upload, batch_size=2)
+
+    assert (report.rows, report.created, report.updated, report.users_created) == (10, 4, 1, 4)
+    assert [error["row"] for error in report.errors] == [6, 7, 8, 9, 10]
+    assert report.errors[-1]["error"] == "Duplicate of row 2"
+    assert sorted(email for email, _ in confirmations) == [f"import-{n}@example.com" for n in range(1, 5)]
+
+    subscriptions = db_session.query(Subscription).filter(
+        Subscription.email.like("import-%@example.com")
+    ).order_by(Subscription.email).all()
+    assert len(subscriptions) == 5
+    # Only the confirmed user's subscription is scheduled; the new users' wait for confirmation
+    assert [s.next_send_at is not None for s in subscriptions] == [True, False, False, False, False]
+    # The existing subscription took the imported settings
+    assert (subscriptions[0].preferred_time, subscriptions[0].timezone, subscriptions[0].difficulty) == (
+        time(8, 30), "Europe/Berlin", "easy"
+    )
+
+
+def test_import_rejects_a_header_without_required_columns(db_session):
+    with pytest.raises(ValueError, match="preferred_time, timezone"):
+        import_subscriptions(db_session, io.BytesIO(b"email,topic\na@example.com,Algebra\n"))
@@ -0,0 +1,35 @@
+from datetime import time
+
+from app.core.topics import normalize_topic, topic_error
+from app.db.models import User, Subscription, Topic
+from app.services.topic_catalog import add_topic_alias, resolve_topic, resolve_topics
+
+
+def test_spellings_of_a_topic_share_one_key():
+    assert normalize_topic("  Node.JS ") == normalize_topic("node-js") == normalize_topic("Node   js") == "node js"
+    assert normalize_topic("C++") != normalize_topic("C")
+    assert topic_error("- -") is not None
+
+
+def test_topics_resolve_to_one_row_and_aliases_merge_cohorts(db_session):
+    topic_ids = resolve_topics(db_session, ["Catalog Python", "catalog  python ", "Catalog Python programming"])
+    assert len(topic_ids) == 2
+    python_id = topic_ids["catalog python"]
+    assert db_session.get(Topic, python_id).name == "Catalog Python"
+    assert resolve_topic(db_session, "CATALOG_PYTHON") == python_id
+
+    user = User(email="catalog@example.com", password_hash="", email_confirmed=1)
+    db_session.add(user)
+    db_session.flush()
+    subscription = Subscription(email=user.email, topic="Catalog Python programming", preferred_time=time(9, 0),
+                                timezone="UTC", user_id=user.id, topic_id=topic_ids["catalog python programming"])
+    db_session.add(subscription)
+    db_session.commit()
+
+    assert add_topic_alias(db_session, python_id, "Catalog Python Programming") == 1
+    db_session.commit()
+
+    db_session.refresh(subscription)
+    assert subscription.topic_id == python_id
+    assert resolve_topic(db_session, "catalog python programming") == python_id
+    assert db_session.query(Topic).filter(Topic.key.like("catalog python%")).count() == 1
@@ -0,0 +1,75 @@
+from datetime import datetime, time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import User, Subscription
+from app.db.session import create_db_engine
+from app.services.topic_catalog import add_topic_alias, resolve_topics
+from app.services.topic_suggestions import TopicSuggestions
+
+
+def test_prefixes_match_any_word_and_rank_by_subscribers():
+    suggestions = TopicSuggestions()
+    suggestions.load(
+        [(1, "Python", 5), (2, "Machine Learning", 9), (3, "Pythagoras", 2), (4, "Learning Spanish", 9), (5, "Pyramids", 0)],
+        aliases=[("ml", 2)]
+    )
+
+    assert suggestions.suggest("py") == [
+        {"topic": "Python", "subscribers": 5}, {"topic": "Pythagoras", "subscribers": 2}
+    ]
+    assert [s["topic"] for s in suggestions.suggest(" LEARN")] == ["Learning Spanish", "Machine Learning"]
+    assert [s["topic"] for s in suggestions.suggest("ml")] == ["Machine Learning"]
+    assert suggestions.suggest("py", limit=1) == [{"topic": "Python", "subscribers": 5}]
+    assert suggestions.suggest("--") == []
+
+    # Subscriptions made through this process show up without a reload
+    suggestions.subscribed(5, "Pyramids")
+    suggestions.subscribed(6, "Pygame")
+    assert [s["topic"] for s in suggestions.suggest("py")] == ["Python", "Pythagoras", "Pygame", "Pyramids"]
+
+    # So do unsubscribes and merges
+    suggestions.unsubscribed(3, 2)
+    suggestions.merged(1, "pygame")
+    assert suggestions.suggest("py") == [
+        {"topic": "Python", "subscribers": 6}, {"topic": "Pyramids", "subscribers": 1}
+    ]
+    assert suggestions.suggest("pyg") == [{"topic": "Python", "subscribers": 6}]
+
+
+def test_reload_counts_subscribers_per_topic(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'suggest.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    try:
+        user = User(email="suggest@example.com", password_hash="", email_confirmed=1)
+        unconfirmed = User(email="unconfirmed@example.com", password_hash="", email_confirmed=0)
+        db.add_all([user, unconfirmed])
+        db.flush()
+        topic_ids = resolve_topics(db, ["Rust", "Rust lang", "Ruby"])
+        db.add_all([
+            Subscription(email=f"suggest-{n}@example.com", topic=topic, preferred_time=time(9, 0), timezone="UTC",
+                         user_id=user.id, topic_id=topic_ids[topic.lower()])
+            for n, topic in enumerate(["Rust", "Rust lang", "Rust lang", "Ruby"])
+        ])
+        # Neither unconfirmed users nor paused subscriptions are counted
+        db.add_all([
+            Subscription(email=unconfirmed.email, topic="Ruby", preferred_time=time(9, 0), timezone="UTC",
+                         user_id=unconfirmed.id, topic_id=topic_ids["ruby"]),
+            Subscription(email="suggest-paused@example.com", topic="Ruby", preferred_time=time(9, 0), timezone="UTC",
+                         user_id=user.id, topic_id=topic_ids["ruby"], paused_until=datetime(9999, 12, 31)),
+        ])
+        add_topic_alias(db, topic_ids["rust"], "Rust lang")
+        db.commit()
+
+        suggestions = TopicSuggestions()
+        suggestions.reload(Session)
+        assert suggestions.suggest("ru") == [
+            {"topic": "Rust", "subscribers": 3}, {"topic": "Ruby", "subscribers": 1}
+        ]
+        assert suggestions.suggest("lang") == [{"topic": "Rust", "subscribers": 3}]
+    finally:
+        db.close()
+        engine.dispose()
@@ -0,0 +1,105 @@
+import asyncio
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.orm import sessionmaker
+
+from app.db.base import Base
+from app.db.models import User, Subscription, EmailHistory, DeliveryClaim, DeliveryRollup
+from app.db.session import create_db_engine
+from app.services.delivery_rollups import SENT, rollup_key
+from app.services.scheduler.write_buffer import LessonWriteBuffer, PendingSend
+
+
+def make_claimed_sends(db, email, count):
+    """Create subscriptions with a committed claim each; returns their pending sends."""
+    user = User(email=email, password_hash="", email_confirmed=1)
+    db.add(user)
+    db.flush()
+    subscriptions = [
+        Subscription(email=email, topic=f"Topic {n}", preferred_time=time(9, 0), timezone="UTC", user_id=user.id)
+        for n in range(count)
+    ]
+    db.add_all(subscriptions)
+    db.flush()
+    claims = [DeliveryClaim(subscription_id=s.id, delivery_date=date(2025, 3, 10)) for s in subscriptions]
+    db.add_all(claims)
+    db.commit()
+
+    sent_at = datetime(2025, 3, 10, 9, 0)
+    return [
+        PendingSend(
+            subscription_id=claim.subscription_id,
+            claim_id=claim.id,
+            body=f"<p>lesson {n % 2}</p>",
+            scheduled_at=sent_at,
+            started_at=sent_at,
+            generated_at=sent_at,
+            sent_at=sent_at + timedelta(seconds=n),
+            attempts=[rollup_key("Buffered", "medium", "smtp", SENT, at=sent_at)]
+        )
+        for n, claim in enumerate(claims)
+    ]
+
+
+def make_buffer(tmp_path, batch_size, flush_ms=50):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'buffer.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    return LessonWriteBuffer(batch_size=batch_size, flush_ms=flush_ms, session_factory=Session), Session, engine
+
+
+def test_buffered_sends_are_written_in_one_batch(tmp_path):
+    """A full batch or the flush timer writes history, counters and claims together."""
+    buffer, Session, engine = make_buffer(tmp_path, batch_size=3)
+    db = Session()
+    try:
+        sends = make_claimed_sends(db, "batch@example.com", 4)
+
+        async def run():
+            for send in sends[:3]:
+                buffer.add(send)
+            assert buffer.pending == 0  # Batch full
+            buffer.add(sends[3])
+            assert buffer.pending == 1
+            await asyncio.sleep(0.2)  # Timer flush
+            assert buffer.pending == 0
+
+        asyncio.run(run())
+
+        db.expire_all()
+        for send in sends:
+            subscription = db.get(Subscription, send.subscription_id)
+            history = db.query(EmailHistory).filter(EmailHistory.subscription_id == send.subscription_id).one()
+            assert history.content == send.body
+            assert (subscription.lesson_count, subscription.last_history_id) == (1, history.id)
+            assert subscription.last_sent == send.sent_at
+            assert db.get(DeliveryClaim, send.claim_id).status == "sent"
+        assert db.query(DeliveryRollup.count).filter(DeliveryRollup.topic == "Buffered").scalar() == 4
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def test_one_bad_send_does_not_lose_the_batch(tmp_path):
+    """A subscription deleted before the flush only drops its own row."""
+    buffer, Session, engine = make_buffer(tmp_path, batch_size=10)
+    db = Session()
+    try:
+        sends = make_claimed_sends(db, "partial@example.com", 3)
+        gone = sends[1]
+        db.query(DeliveryClaim).filter(DeliveryClaim.id == gone.claim_id).delete()
+        db.query(Subscription).filter(Subscription.id == gone.subscription_id).delete()
+        db.commit()
+
+        async def run():
+            for send in sends:
+                buffer.add(send)
+            return buffer.flush()
+
+        assert asyncio.run(run()) == 2
+        assert db.query(EmailHistory).filter(
+            EmailHistory.subscription_id.in_([s.subscription_id for s in sends])
+        ).count() == 2
+    finally:
+        db.close()
+        engine.dispose()